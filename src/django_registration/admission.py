@@ -0,0 +1,257 @@
+"""
+Admission control: automatically closing registration while the
+services it depends on are overloaded.
+
+The registration view consults the admission controller configured by
+the ``REGISTRATION_ADMISSION_CONTROLLER`` setting before handling each
+request, and reports to it how long each registration took and whether
+it failed.
+
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from .cache import get_cache, increment, make_key
+
+
+class AdmissionController:
+    """
+    Base class for admission controllers. This implementation admits
+    every request, and ignores the signups reported to it.
+
+    """
+
+    def __init__(self, **options):
+        pass
+
+    def admit(self, request):  # pylint: disable=unused-argument
+        """
+        Return whether registration should be allowed for the request.
+
+        """
+        return True
+
+    def record(self, duration, failed=False):
+        """
+        Record a registration attempt which took ``duration`` seconds,
+        and either succeeded or (if ``failed``) raised an exception.
+
+        """
+
+
+class LoadSheddingController(AdmissionController):
+    """
+    Admission controller which closes registration while any of a set
+    of load signals exceeds its threshold, and reopens it once all of
+    them have recovered.
+
+    Each threshold is a 2-tuple of ``(close_above, reopen_below)``.
+    Keeping the second value below the first gives hysteresis: a signal
+    hovering around a single threshold would otherwise open and close
+    registration on alternate checks.
+
+    The signals are:
+
+    * The result of calling ``queue_depth``, a callable (or the dotted
+      path of one) returning the length of a queue, such as the backlog
+      of outgoing email, compared against ``max_queue_depth``.
+
+    * The mean time taken to register an account, in seconds, compared
+      against ``max_latency``.
+
+    * The fraction of registrations raising an exception, compared
+      against ``max_error_rate``.
+
+    The latency and error rate are measured over the last ``window`` to
+    two ``window`` seconds, in counters shared through the cache, and
+    are ignored until at least ``min_samples`` registrations have been
+    recorded. The decision to close or reopen is shared through the
+    cache, and each process re-evaluates it at most once every
+    ``check_interval`` seconds.
+
+    Closing registration stops registrations being recorded, so while it
+    is closed, a signal which can no longer be measured keeps its last
+    measured value, and up to ``probes`` clients (by default
+    ``min_samples``) in each window are admitted anyway, so that their
+    registrations show when the latency and error rate have recovered.
+
+    """
+
+    # pylint: disable=too-many-instance-attributes,too-many-arguments
+
+    def __init__(
+        self,
+        *,
+        queue_depth=None,
+        max_queue_depth=None,
+        max_latency=None,
+        max_error_rate=None,
+        window=60,
+        min_samples=10,
+        check_interval=5.0,
+        probes=None,
+        **options,
+    ):
+        super().__init__(**options)
+        if isinstance(queue_depth, str):
+            queue_depth = import_string(queue_depth)
+        self.queue_depth = queue_depth
+        self.thresholds = {
+            "queue_depth": max_queue_depth,
+            "latency": max_latency,
+            "error_rate": max_error_rate,
+        }
+        self.window = window
+        self.min_samples = min_samples
+        self.check_interval = check_interval
+        self.probes = min_samples if probes is None else probes
+        self._lock = threading.Lock()
+        self._admitting = True
+        self._next_check = 0.0
+
+    def get_key(self, name, window):
+        """
+        Return the cache key of a counter for a window.
+
+        """
+        return make_key("admission", name, self.window, window)
+
+    def record(self, duration, failed=False):
+        """
+        Count the registration, its duration and any failure in the
+        current window's counters.
+
+        """
+        window = int(time.time() // self.window)
+        timeout = self.window * 2
+        increment(self.get_key("count", window), timeout=timeout)
+        increment(self.get_key("milliseconds", window), round(duration * 1000), timeout)
+        if failed:
+            increment(self.get_key("failures", window), timeout=timeout)
+
+    def get_signals(self):
+        """
+        Return a dict of the current value of each signal, or ``None``
+        for a signal which cannot currently be measured.
+
+        """
+        window = int(time.time() // self.window)
+        names = ("count", "milliseconds", "failures")
+        keys = {
+            self.get_key(name, window - offset): name
+            for name in names
+            for offset in (0, 1)
+        }
+        totals = dict.fromkeys(names, 0)
+        for key, value in get_cache().get_many(keys).items():
+            totals[keys[key]] += value
+        count = totals["count"]
+        measured = count >= self.min_samples
+        return {
+            "queue_depth": self.queue_depth() if self.queue_depth else None,
+            "latency": totals["milliseconds"] / count / 1000 if measured else None,
+            "error_rate": totals["failures"] / count if measured else None,
+        }
+
+    def evaluate(self):
+        """
+        Decide, from the current signals, whether registration should be
+        open, and return that decision.
+
+        """
+        cache = get_cache()
+        key = make_key("admission", "shedding")
+        # While registration is closed, the signals last measured.
+        last_signals = cache.get(key)
+        signals = self.get_signals()
+        if last_signals is not None:
+            signals = {
+                name: last_signals[name] if value is None else value
+                for name, value in signals.items()
+            }
+        limits = [
+            (signals[name], threshold)
+            for name, threshold in self.thresholds.items()
+            if threshold is not None and signals[name] is not None
+        ]
+        if last_signals is not None:
+            shedding = any(value >= reopen for value, (_, reopen) in limits)
+        else:
+            shedding = any(value > close for value, (close, _) in limits)
+        cache.set(key, signals if shedding else None, None)
+        return not shedding
+
+    def admit(self, request):
+        """
+        Return whether registration is open, re-evaluating the signals if
+        ``check_interval`` has passed since this process last did, or
+        whether the request is from a probe client.
+
+        """
+        now = time.monotonic()
+        if now >= self._next_check:
+            with self._lock:
+                if now >= self._next_check:
+                    self._admitting = self.evaluate()
+                    self._next_check = now + self.check_interval
+        return self._admitting or self.admit_probe(request)
+
+    def admit_probe(self, request):
+        """
+        Return whether to admit a request while registration is closed,
+        because it is from one of the ``probes`` clients admitted in the
+        current window. A client, once admitted, remains so for two
+        windows, so that it can complete its registration.
+
+        """
+        if not self.probes:
+            return False
+        cache = get_cache()
+        client_key = make_key(
+            "admission", "probe", self.window, request.META.get("REMOTE_ADDR")
+        )
+        if cache.get(client_key):
+            return True
+        window = int(time.time() // self.window)
+        timeout = self.window * 2
+        if increment(self.get_key("probes", window), timeout=timeout) > self.probes:
+            return False
+        cache.set(client_key, True, timeout)
+        return True
+
+
+_controller = None  # pylint: disable=invalid-name
+
+
+def get_admission_controller():
+    """
+    Return the admission controller configured by the
+    ``REGISTRATION_ADMISSION_CONTROLLER`` setting.
+
+    """
+    global _controller  # pylint: disable=global-statement
+    if _controller is None:
+        config = getattr(settings, "REGISTRATION_ADMISSION_CONTROLLER", None) or {}
+        backend = config.get(
+            "BACKEND", "django_registration.admission.AdmissionController"
+        )
+        _controller = import_string(backend)(**config.get("OPTIONS", {}))
+    return _controller
+
+
+@receiver(setting_changed)
+def reset_admission_controller(*, setting, **kwargs):  # pylint: disable=unused-argument
+    """
+    Discard the configured admission controller when the setting
+    changes, as it does in tests.
+
+    """
+    global _controller  # pylint: disable=global-statement
+    if setting == "REGISTRATION_ADMISSION_CONTROLLER":
+        _controller = None
@@ -0,0 +1,26 @@
+"""
+Application configuration for django-registration.
+
+"""
+
+from django.apps import AppConfig
+from django.utils.translation import gettext_lazy as _
+
+
+class DjangoRegistrationConfig(AppConfig):
+    """
+    Application configuration for django-registration.
+
+    """
+
+    default_auto_field = "django.db.models.AutoField"
+    name = "django_registration"
+    verbose_name = _("Registration")
+
+    def ready(self):
+        """
+        Register the system checks and signal receivers.
+
+        """
+        # pylint: disable=import-outside-toplevel,unused-import
+        from . import checks, receivers  # noqa: F401
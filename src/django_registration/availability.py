@@ -0,0 +1,70 @@
+"""
+Cached lookups of whether usernames are taken, for checking the
+availability of a username as it is typed.
+
+If the ``REGISTRATION_AVAILABILITY_CACHE_TIMEOUT`` setting is
+configured, whether a username is taken is cached for that long, so
+repeated checks of the same name (from each keystroke, or from many
+people trying the same name) cost at most one query in that time, and
+saving a user account forgets the cached answer for its username. If an
+identifier filter is in use, usernames it shows to be free are not
+looked up at all. Registration itself never uses the cached answers.
+
+"""
+
+import hashlib
+import unicodedata
+
+from django.conf import settings
+
+from . import identifier_filter
+from .cache import get_cache, make_key
+
+
+def normalize(username):
+    """
+    Return the normalized form of a username compared for uniqueness.
+
+    """
+    return unicodedata.normalize("NFKC", username).casefold()
+
+
+def get_cache_key(model, username):
+    """
+    Return the cache key under which whether a username is taken is
+    stored.
+
+    """
+    # pylint: disable=protected-access
+    digest = hashlib.sha256(normalize(username).encode("utf-8")).hexdigest()
+    return make_key("username_taken", model._meta.label_lower, digest)
+
+
+def is_taken(model, username):
+    """
+    Return whether a username is taken, case-insensitively, by an
+    account of the given user model.
+
+    """
+    # pylint: disable=protected-access
+    if not identifier_filter.might_be_taken(model, model.USERNAME_FIELD, username):
+        return False
+    timeout = getattr(settings, "REGISTRATION_AVAILABILITY_CACHE_TIMEOUT", None)
+    cache = get_cache()
+    key = get_cache_key(model, username)
+    taken = None if timeout is None else cache.get(key)
+    if taken is None:
+        taken = model._default_manager.filter(
+            **{f"{model.USERNAME_FIELD}__iexact": normalize(username)}
+        ).exists()
+        if timeout is not None:
+            cache.set(key, taken, timeout)
+    return taken
+
+
+def forget(model, username):
+    """
+    Forget whether a username is taken.
+
+    """
+    get_cache().delete(get_cache_key(model, username))
@@ -7,6 +7,8 @@ HMAC activation workflow.
 from django.urls import path
 from django.views.generic.base import TemplateView
 
+from django_registration.views import FieldValidationView, UsernameAvailabilityView
+
 from . import views
 
 urlpatterns = [
@@ -27,6 +29,16 @@ urlpatterns = [
         views.RegistrationView.as_view(),
         name="django_registration_register",
     ),
+    path(
+        "register/available/",
+        UsernameAvailabilityView.as_view(),
+        name="django_registration_username_available",
+    ),
+    path(
+        "register/validate/",
+        FieldValidationView.as_view(),
+        name="django_registration_validate_field",
+    ),
     path(
         "register/complete/",
         TemplateView.as_view(
@@ -13,9 +13,11 @@ from django.template.loader import render_to_string
 from django.urls import reverse_lazy
 from django.utils.translation import gettext_lazy as _
 
-from django_registration import signals
+from django_registration import mail, signals
+from django_registration.concurrency import hashing_slot
 from django_registration.exceptions import ActivationError
 from django_registration.views import ActivationView as BaseActivationView
+from django_registration.views import JSONActivationMixin, JSONRegistrationMixin
 from django_registration.views import RegistrationView as BaseRegistrationView
 
 REGISTRATION_SALT = getattr(settings, "REGISTRATION_SALT", "registration")
@@ -53,9 +55,10 @@ class RegistrationView(BaseRegistrationView):
         activation instructions.
 
         """
-        new_user = form.save(commit=False)
-        new_user.is_active = False
-        new_user.save()
+        with hashing_slot():
+            new_user = form.save(commit=False)
+            new_user.is_active = False
+            new_user.save()
 
         self.send_activation_email(new_user)
 
@@ -103,7 +106,7 @@ class RegistrationView(BaseRegistrationView):
             context=context,
             request=self.request,
         )
-        user.email_user(subject, message, settings.DEFAULT_FROM_EMAIL)
+        mail.email_user(user, subject, message, settings.DEFAULT_FROM_EMAIL)
 
 
 class ActivationView(BaseActivationView):
@@ -133,6 +136,14 @@ class ActivationView(BaseActivationView):
         user.save()
         return user
 
+    def check_activation(self, *args, **kwargs):
+        """
+        Verify the activation key's signature and age, without touching
+        the database.
+
+        """
+        self.validate_key(kwargs.get("activation_key"))
+
     def validate_key(self, activation_key):
         """
         Verify that the activation key is valid and within the
@@ -175,3 +186,19 @@ class ActivationView(BaseActivationView):
             return user
         except User.DoesNotExist:
             raise ActivationError(self.BAD_USERNAME_MESSAGE, code="bad_username")
+
+
+class JSONRegistrationView(JSONRegistrationMixin, RegistrationView):
+    """
+    The registration view of the activation workflow, taking and
+    returning JSON.
+
+    """
+
+
+class JSONActivationView(JSONActivationMixin, ActivationView):
+    """
+    The activation view of the activation workflow, taking and
+    returning JSON.
+
+    """
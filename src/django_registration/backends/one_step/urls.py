@@ -7,6 +7,8 @@ workflow.
 from django.urls import path
 from django.views.generic.base import TemplateView
 
+from django_registration.views import FieldValidationView, UsernameAvailabilityView
+
 from . import views
 
 urlpatterns = [
@@ -15,6 +17,16 @@ urlpatterns = [
         views.RegistrationView.as_view(),
         name="django_registration_register",
     ),
+    path(
+        "register/available/",
+        UsernameAvailabilityView.as_view(),
+        name="django_registration_username_available",
+    ),
+    path(
+        "register/validate/",
+        FieldValidationView.as_view(),
+        name="django_registration_validate_field",
+    ),
     path(
         "register/closed/",
         TemplateView.as_view(
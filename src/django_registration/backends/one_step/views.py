@@ -8,6 +8,8 @@ from django.contrib.auth import authenticate, get_user_model, login
 from django.urls import reverse_lazy
 
 from django_registration import signals
+from django_registration.concurrency import hashing_slot
+from django_registration.views import JSONRegistrationMixin
 from django_registration.views import RegistrationView as BaseRegistrationView
 
 User = get_user_model()
@@ -28,15 +30,24 @@ class RegistrationView(BaseRegistrationView):
         Register the new user account and immediately log it in.
 
         """
-        new_user = form.save()
-        new_user = authenticate(
-            **{
-                User.USERNAME_FIELD: new_user.get_username(),
-                "password": form.cleaned_data["password1"],
-            }
-        )
+        # Both saving the account and authenticating it hash the password.
+        with hashing_slot():
+            new_user = form.save()
+            new_user = authenticate(
+                **{
+                    User.USERNAME_FIELD: new_user.get_username(),
+                    "password": form.cleaned_data["password1"],
+                }
+            )
         login(self.request, new_user)
         signals.user_registered.send(
             sender=self.__class__, user=new_user, request=self.request
         )
         return new_user
+
+
+class JSONRegistrationView(JSONRegistrationMixin, RegistrationView):
+    """
+    The one-step registration view, taking and returning JSON.
+
+    """
@@ -0,0 +1,419 @@
+"""
+The registration form classes, independent of any user model.
+
+These are the bases from which the forms in
+``django_registration.forms`` are built, for the configured user model
+or, with ``registration_form_factory()``, for any other. Use those
+rather than these.
+
+"""
+
+import copy
+import threading
+
+from django import forms
+from django.conf import settings
+from django.contrib.auth import password_validation
+from django.contrib.auth.forms import UserCreationForm
+from django.core.exceptions import ValidationError
+from django.forms.utils import ErrorDict
+from django.utils.translation import gettext_lazy as _
+
+from . import identifier_filter, validators
+from .password_validation import BreachedPasswordValidator
+
+_install_lock = threading.Lock()
+
+
+class RegistrationForm(UserCreationForm):
+    """
+    Form for registering a new user account.
+
+    Validates that the requested username is not already in use, and
+    requires the password to be entered twice to catch typos.
+
+    Subclasses should feel free to add any additional validation they
+    need, but should take care when overriding ``save()`` to respect
+    the ``commit=False`` argument, as several registration workflows
+    will make use of it to create inactive user accounts.
+
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    error_css_class = "error"
+    email_domain_policy = None
+    required_css_class = "required"
+
+    def __init__(self, *args, **kwargs):
+        # pylint: disable=no-member
+        self.install_validators()
+        super().__init__(*args, **kwargs)
+        self._deferred_validators = None
+        if getattr(settings, "REGISTRATION_DISPOSABLE_EMAIL_DOMAINS_FILE", None):
+            self.fields[self._meta.model.get_email_field_name()].validators.append(
+                validators.DisposableEmailValidator()
+            )
+
+    @classmethod
+    def install_validators(cls):
+        """
+        Install the validators configured by configure_fields() into
+        the form class's base fields, the first time the class is
+        instantiated, so that each instance shares them instead of
+        constructing its own.
+
+        """
+        if "_validators_installed" not in cls.__dict__:
+            with _install_lock:
+                if "_validators_installed" not in cls.__dict__:
+                    # Fields may be shared with a parent class, so configure copies.
+                    fields = copy.deepcopy(cls.base_fields)
+                    cls.configure_fields(fields)
+                    cls.base_fields = fields
+                    cls._validators_installed = True
+
+    @classmethod
+    def configure_fields(cls, fields):
+        """
+        Add the validators for registration to a copy of the form's base
+        fields. Called once for each form class; subclasses adding
+        validators should extend this.
+
+        """
+        # pylint: disable=no-member
+        user_model = cls._meta.model
+        email_field = user_model.get_email_field_name()
+        reserved_names = getattr(
+            cls, "reserved_names", validators.DEFAULT_RESERVED_NAMES
+        )
+        fields[user_model.USERNAME_FIELD].validators.extend(
+            [
+                validators.ReservedNameValidator(reserved_names),
+                validators.validate_confusables,
+            ]
+        )
+        # django-registration's email validation is significantly stricter than Django's
+        # default email validation, which means that leaving Django's default validation
+        # on only causes confusion due to duplicate error messages (see GitHub issue
+        # #238). So we apply only the django-registration validators, not the default
+        # Django validator, on the email field.
+        fields[email_field].validators = [
+            validators.HTML5EmailValidator(),
+            validators.validate_confusables_email,
+        ]
+        if cls.email_domain_policy is not None:
+            fields[email_field].validators.append(cls.email_domain_policy)
+        fields[email_field].required = True
+
+    def full_clean(self):
+        """
+        Set the expensive validators aside before cleaning, so that
+        ``_post_clean()`` can run them in stages.
+
+        """
+        self._defer_validators()
+        super().full_clean()
+
+    def clean_username(self):
+        """
+        Return the username, leaving the case-insensitive uniqueness check
+        which ``UserCreationForm`` makes here (from Django 4.2) to the
+        database stage of validation.
+
+        """
+        return self.cleaned_data.get("username")
+
+    def _defer_validators(self):
+        """
+        Take validators more expensive than pure string checks out of the
+        fields, so that they can be run in order of cost once the fields
+        have passed the cheap checks.
+
+        """
+        if self._deferred_validators is None:
+            self._deferred_validators = []
+            for name, field in self.fields.items():
+                self._deferred_validators.extend(
+                    (validators.get_cost(validator), name, validator)
+                    for validator in field.validators
+                    if validators.get_cost(validator) != validators.COST_STRING
+                )
+                field.validators = [
+                    validator
+                    for validator in field.validators
+                    if validators.get_cost(validator) == validators.COST_STRING
+                ]
+
+    def _post_clean(self):
+        """
+        Run the expensive stages of validation in increasing order of cost,
+        skipping each stage if the form is already known to be invalid, so
+        that submissions failing cheap checks cost little to reject.
+
+        """
+        # pylint: disable=protected-access
+        self._run_stages(
+            [
+                lambda: self._run_deferred_validators(validators.COST_DATASET),
+                self._validate_breached_password,
+                lambda: self._run_deferred_validators(validators.COST_DATABASE),
+                self._validate_username_case_insensitively,
+                # The model's validation, including the username uniqueness check.
+                lambda: forms.ModelForm._post_clean(self),
+                self._validate_password,
+            ]
+        )
+
+    def _run_stages(self, stages):
+        """
+        Run stages of validation in order, until one finds an error.
+
+        """
+        for stage in stages:
+            if self._errors:
+                return
+            stage()
+
+    def validate_field(self, name):
+        """
+        Validate only the named field of a bound form, and return its
+        errors.
+
+        The field is checked by its own validators, in increasing order
+        of cost, and its ``clean_<name>()`` method, and ``password2``
+        also by the password validators, as in full validation. Checks
+        involving other fields, such as whether the two passwords match
+        and the model's validation, are skipped.
+
+        """
+        # pylint: disable=attribute-defined-outside-init
+        self._defer_validators()
+        self._errors = ErrorDict()
+        self.cleaned_data = {}
+        field = self.fields[name]
+        try:
+            self.cleaned_data[name] = field.clean(
+                field.widget.value_from_datadict(
+                    self.data, self.files, self.add_prefix(name)
+                )
+            )
+            if hasattr(self, f"clean_{name}"):
+                self.cleaned_data[name] = getattr(self, f"clean_{name}")()
+        except ValidationError as error:
+            self.add_error(name, error)
+        self._run_stages(
+            [
+                lambda: self._run_deferred_validators(validators.COST_DATASET),
+                self._validate_breached_password,
+                lambda: self._run_deferred_validators(validators.COST_DATABASE),
+                self._validate_username_case_insensitively,
+                self._validate_password,
+            ]
+        )
+        return self._errors.get(name, self.error_class())
+
+    def _run_deferred_validators(self, cost):
+        """
+        Run the fields' validators of the given cost.
+
+        """
+        for validator_cost, name, validator in self._deferred_validators:
+            if (
+                validator_cost != cost
+                or name not in self.cleaned_data
+                or self.cleaned_data[name] in self.fields[name].empty_values
+            ):
+                continue
+            try:
+                validator(self.cleaned_data[name])
+            except ValidationError as error:
+                self.add_error(name, error)
+
+    def _validate_username_case_insensitively(self):
+        """
+        Make the case-insensitive uniqueness check of the username which
+        ``UserCreationForm`` makes from Django 4.2, unless the identifier
+        filter shows the username to be free or the form already checks
+        it with ``CaseInsensitiveUnique``.
+
+        """
+        # pylint: disable=no-member
+        username = self.cleaned_data.get("username")
+        clean_username = getattr(super(), "clean_username", None)
+        if (
+            clean_username is None
+            or not isinstance(username, str)
+            or any(
+                name == "username"
+                and isinstance(validator, validators.CaseInsensitiveUnique)
+                for _, name, validator in self._deferred_validators
+            )
+            or not identifier_filter.might_be_taken(
+                self._meta.model, "username", username
+            )
+        ):
+            return
+        clean_username()
+
+    def validate_unique(self):
+        """
+        Run the model's uniqueness checks, skipping that of the username
+        if the identifier filter shows it to be free.
+
+        """
+        # pylint: disable=no-member
+        exclude = self._get_validation_exclusions()
+        username_field = self._meta.model.USERNAME_FIELD
+        username = self.cleaned_data.get(username_field)
+        if isinstance(username, str) and not identifier_filter.might_be_taken(
+            self._meta.model, username_field, username
+        ):
+            exclude = {*exclude, username_field}
+        try:
+            self.instance.validate_unique(exclude=exclude)
+        except ValidationError as error:
+            self._update_errors(error)
+
+    def _validate_breached_password(self):
+        """
+        Check the password against the corpus of breached passwords, if
+        one is configured.
+
+        """
+        password = self.cleaned_data.get("password2")
+        if password and getattr(settings, "REGISTRATION_BREACHED_PASSWORDS_FILE", None):
+            try:
+                BreachedPasswordValidator().validate(password, self.instance)
+            except ValidationError as error:
+                self.add_error("password2", error)
+
+    def _validate_password(self):
+        """
+        Run the configured password validators, as ``UserCreationForm``
+        does.
+
+        """
+        password = self.cleaned_data.get("password2")
+        if password:
+            try:
+                password_validation.validate_password(password, self.instance)
+            except ValidationError as error:
+                self.add_error("password2", error)
+
+
+class RegistrationFormCaseInsensitive(RegistrationForm):
+    """
+    Subclass of ``RegistrationForm`` enforcing case-insensitive
+    uniqueness of usernames.
+
+    """
+
+    @classmethod
+    def configure_fields(cls, fields):
+        """
+        Add a validator checking the uniqueness of the username,
+        case-insensitively.
+
+        """
+        # pylint: disable=no-member
+        super().configure_fields(fields)
+        user_model = cls._meta.model
+        fields[user_model.USERNAME_FIELD].validators.append(
+            validators.CaseInsensitiveUnique(
+                user_model, user_model.USERNAME_FIELD, validators.DUPLICATE_USERNAME
+            )
+        )
+
+
+class RegistrationFormTermsOfService(RegistrationForm):
+    """
+    Subclass of ``RegistrationForm`` which adds a required checkbox
+    for agreeing to a site's Terms of Service.
+
+    """
+
+    tos = forms.BooleanField(
+        widget=forms.CheckboxInput,
+        label=_("I have read and agree to the Terms of Service"),
+        error_messages={"required": validators.TOS_REQUIRED},
+    )
+
+
+class RegistrationFormNoFreeEmail(RegistrationForm):
+    """
+    Subclass of ``RegistrationForm`` which disallows registration with
+    email addresses from popular free webmail services.
+
+    """
+
+    email_domain_policy = validators.DomainPolicyValidator(
+        deny=validators.FREE_EMAIL_DOMAINS
+    )
+
+
+class RegistrationFormUniqueSkeleton(RegistrationForm):
+    """
+    Subclass of ``RegistrationForm`` which disallows usernames visually
+    confusable with the username of an existing account.
+
+    """
+
+    @classmethod
+    def configure_fields(cls, fields):
+        """
+        Add a validator checking that the username's confusable skeleton
+        is not that of an existing account.
+
+        """
+        # pylint: disable=no-member
+        super().configure_fields(fields)
+        fields[cls._meta.model.USERNAME_FIELD].validators.append(
+            validators.ConfusableSkeletonUnique()
+        )
+
+
+class RegistrationFormUniqueEmail(RegistrationForm):
+    """
+    Subclass of ``RegistrationForm`` which enforces uniqueness of
+    email addresses.
+
+    """
+
+    @classmethod
+    def configure_fields(cls, fields):
+        """
+        Add a validator checking the uniqueness of the email address,
+        case-insensitively.
+
+        """
+        # pylint: disable=no-member
+        super().configure_fields(fields)
+        user_model = cls._meta.model
+        email_field = user_model.get_email_field_name()
+        fields[email_field].validators.append(
+            validators.CaseInsensitiveUnique(
+                user_model, email_field, validators.DUPLICATE_EMAIL
+            )
+        )
+
+
+class RegistrationFormUniqueCanonicalEmail(RegistrationForm):
+    """
+    Subclass of ``RegistrationForm`` which enforces uniqueness of the
+    canonical forms of email addresses.
+
+    """
+
+    @classmethod
+    def configure_fields(cls, fields):
+        """
+        Add a validator checking that the canonical form of the email
+        address is not that of an existing account.
+
+        """
+        # pylint: disable=no-member
+        super().configure_fields(fields)
+        fields[cls._meta.model.get_email_field_name()].validators.append(
+            validators.CanonicalEmailUnique()
+        )
@@ -0,0 +1,45 @@
+"""
+Access to the cache used by django-registration's cache-backed
+features.
+
+"""
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+
+KEY_PREFIX = "django_registration"
+
+
+def get_cache():
+    """
+    Return the cache selected by the ``REGISTRATION_CACHE_ALIAS``
+    setting, or the default cache.
+
+    """
+    return caches[getattr(settings, "REGISTRATION_CACHE_ALIAS", DEFAULT_CACHE_ALIAS)]
+
+
+def make_key(*parts):
+    """
+    Build a cache key, namespaced to django-registration, from the
+    given parts.
+
+    """
+    return ":".join((KEY_PREFIX, *map(str, parts)))
+
+
+def increment(key, delta=1, timeout=None):
+    """
+    Atomically add ``delta`` to the counter at ``key``, creating it with
+    the given timeout if it does not exist, and return the new value.
+
+    """
+    cache = get_cache()
+    if cache.add(key, delta, timeout):
+        return delta
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        # The counter expired between the add() and the incr().
+        cache.add(key, delta, timeout)
+        return delta
@@ -0,0 +1,107 @@
+"""
+Stateless proof-of-work challenges for registration submissions.
+
+A challenge is a random nonce, a difficulty and an issue time, signed
+with the site's secret key, so any server can verify it without shared
+state. To solve it, the client must find a string ``solution`` for
+which the SHA-256 digest of ``"<challenge>:<solution>"`` begins with at
+least ``difficulty`` zero bits, which takes about ``2 ** difficulty``
+attempts to find but a single hash to check. The cache is used only to
+reject reuse of a solved challenge, and to measure the recent rate of
+submissions, from which the difficulty of new challenges is scaled.
+
+"""
+
+import hashlib
+import math
+import secrets
+import time
+
+from django.core import signing
+
+from .cache import get_cache, increment, make_key
+
+CHALLENGE_SALT = "django_registration.challenges"
+
+# How long, in seconds, a challenge may be solved and submitted after being issued.
+CHALLENGE_MAX_AGE = 60 * 60
+
+# The length, in seconds, of the windows over which submissions are counted.
+RATE_WINDOW = 60
+
+
+def issue_challenge(difficulty):
+    """
+    Return a new signed challenge of the given difficulty.
+
+    """
+    payload = f"{secrets.token_hex(16)}:{difficulty}:{int(time.time())}"
+    return signing.Signer(salt=CHALLENGE_SALT).sign(payload)
+
+
+def leading_zero_bits(digest):
+    """
+    Return the number of leading zero bits in a digest.
+
+    """
+    return len(digest) * 8 - int.from_bytes(digest, "big").bit_length()
+
+
+def verify_solution(challenge, solution):
+    """
+    Return whether ``solution`` solves ``challenge``, which must be
+    genuine, unexpired and not previously used.
+
+    """
+    try:
+        nonce, difficulty, issued = (
+            signing.Signer(salt=CHALLENGE_SALT).unsign(challenge).split(":")
+        )
+        difficulty, issued = int(difficulty), int(issued)
+    except (signing.BadSignature, ValueError):
+        return False
+    if not 0 <= time.time() - issued <= CHALLENGE_MAX_AGE:
+        return False
+    digest = hashlib.sha256(f"{challenge}:{solution}".encode("utf-8")).digest()
+    if leading_zero_bits(digest) < difficulty:
+        return False
+    # Each challenge may be used once.
+    return get_cache().add(make_key("challenge", nonce), True, CHALLENGE_MAX_AGE)
+
+
+def record_submission():
+    """
+    Count a submission towards the recent rate of submissions.
+
+    """
+    window = int(time.time() // RATE_WINDOW)
+    increment(make_key("challenge_rate", window), timeout=RATE_WINDOW * 2)
+
+
+def get_submission_rate():
+    """
+    Return the number of submissions counted over roughly the last
+    ``RATE_WINDOW`` seconds.
+
+    """
+    now = time.time()
+    window, elapsed = divmod(now, RATE_WINDOW)
+    current = make_key("challenge_rate", int(window))
+    previous = make_key("challenge_rate", int(window) - 1)
+    counts = get_cache().get_many([current, previous])
+    return counts.get(previous, 0) * (1 - elapsed / RATE_WINDOW) + counts.get(
+        current, 0
+    )
+
+
+def get_difficulty(base, maximum, baseline_rate):
+    """
+    Return the difficulty for new challenges: ``base`` while the recent
+    rate of submissions is at most ``baseline_rate``, and one more for
+    each doubling of the rate beyond that, up to ``maximum``.
+
+    """
+    rate = get_submission_rate()
+    if rate <= baseline_rate:
+        return base
+    return min(maximum, base + math.ceil(math.log2(rate / baseline_rate)))
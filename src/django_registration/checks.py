@@ -0,0 +1,87 @@
+"""
+System checks for django-registration.
+
+"""
+
+from django.conf import settings
+from django.core import checks
+from django.urls import URLPattern, URLResolver, get_resolver
+
+
+def iter_views(patterns):
+    """
+    Yield the class-based views, with their initialization arguments,
+    routed to by a list of URL patterns.
+
+    """
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_views(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern):
+            view_class = getattr(pattern.callback, "view_class", None)
+            if view_class is not None:
+                yield view_class, getattr(pattern.callback, "view_initkwargs", {})
+
+
+@checks.register(checks.Tags.urls)
+def check_registration_views(app_configs, **kwargs):
+    """
+    Check that the form class of each routed registration, username
+    availability or field validation view is a form for the configured
+    user model, and that a form checking the stored identifier indexes
+    has them maintained.
+
+    """
+    # pylint: disable=import-outside-toplevel,protected-access,unused-argument
+    from .validators import CanonicalEmailUnique, ConfusableSkeletonUnique
+    from .views import (
+        FieldValidationView,
+        RegistrationView,
+        UsernameAvailabilityView,
+        form_matches_user_model,
+    )
+
+    if not getattr(settings, "ROOT_URLCONF", None):
+        return []
+    errors = []
+    for view_class, initkwargs in iter_views(get_resolver().url_patterns):
+        if not issubclass(
+            view_class,
+            (RegistrationView, UsernameAvailabilityView, FieldValidationView),
+        ):
+            continue
+        form_class = initkwargs.get("form_class", view_class.form_class)
+        if not form_matches_user_model(form_class, settings.AUTH_USER_MODEL):
+            errors.append(
+                checks.Error(
+                    f"The form class {form_class.__qualname__} of the view "
+                    f"{view_class.__qualname__} is for the model "
+                    f"{form_class._meta.model._meta.label}, not the user model "
+                    f"{settings.AUTH_USER_MODEL}.",
+                    hint=(
+                        "Specify a registration form class for your custom user "
+                        "model; see django-registration's documentation on custom "
+                        "user models."
+                    ),
+                    obj=view_class,
+                    id="django_registration.E001",
+                )
+            )
+            continue
+        form_class.install_validators()
+        if not getattr(settings, "REGISTRATION_IDENTIFIER_INDEXES", False) and any(
+            isinstance(validator, (CanonicalEmailUnique, ConfusableSkeletonUnique))
+            for field in form_class.base_fields.values()
+            for validator in field.validators
+        ):
+            errors.append(
+                checks.Error(
+                    f"The form class {form_class.__qualname__} of the view "
+                    f"{view_class.__qualname__} checks the stored identifier "
+                    "indexes, which are not maintained.",
+                    hint="Set REGISTRATION_IDENTIFIER_INDEXES to True.",
+                    obj=view_class,
+                    id="django_registration.E002",
+                )
+            )
+    return errors
@@ -0,0 +1,145 @@
+"""
+Bounded concurrency for the CPU-intensive stage of registration, in
+which the new account's password is hashed.
+
+A burst of signups would otherwise start as many password hashes at
+once as there are worker threads, saturating every core and slowing
+down all other traffic. Instead, each hash must first take a slot: one
+of a fixed number per process and, optionally, one of a fixed number
+shared through the cache by every process. A registration which cannot
+get a slot within a timeout is turned away, quickly and cheaply, to try
+again later.
+
+"""
+
+import contextlib
+import random
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+
+from .cache import get_cache, make_key
+from .exceptions import RegistrationBusy
+
+BUSY = _("Too many registrations are in progress. Please try again shortly.")
+
+# How long, in seconds, a slot shared through the cache is held before expiring,
+# in case the process holding it dies without releasing it.
+CLUSTER_SLOT_TIMEOUT = 60
+
+# How long, in seconds, to wait between attempts to take a slot shared through the
+# cache, at first and at most; the wait doubles after each attempt.
+CLUSTER_POLL_INTERVAL = 0.05
+CLUSTER_MAX_POLL_INTERVAL = 0.4
+
+_semaphores = {}
+_semaphores_lock = threading.Lock()
+
+
+def get_limits():
+    """
+    Return the configured limits as a tuple of (slots per process,
+    slots across all processes, timeout in seconds), where either
+    number of slots may be ``None`` for no limit.
+
+    """
+    config = getattr(settings, "REGISTRATION_HASHING_CONCURRENCY", None) or {}
+    return (
+        config.get("process"),
+        config.get("cluster"),
+        config.get("timeout", 1.0),
+    )
+
+
+def get_semaphore(limit):
+    """
+    Return this process's semaphore for the given number of slots.
+
+    """
+    try:
+        return _semaphores[limit]
+    except KeyError:
+        with _semaphores_lock:
+            return _semaphores.setdefault(limit, threading.BoundedSemaphore(limit))
+
+
+def acquire_cluster_slot(limit, deadline, token):
+    """
+    Take one of ``limit`` slots shared through the cache, marked as held
+    by ``token``, waiting until the ``time.monotonic()`` value
+    ``deadline`` for one to become free. Return the cache key of the
+    slot taken, or ``None`` if none was.
+
+    Every slot is tried once at first. After that, a single random slot
+    is tried after each wait, and the waits grow, so that registrations
+    waiting for a slot add little load to the cache however many of
+    them there are.
+
+    """
+    cache = get_cache()
+    # Start from a random slot, so that processes do not all contend for the
+    # first few.
+    start = random.randrange(limit)  # nosec: B311
+    for offset in range(limit):
+        key = make_key("hashing_slot", limit, (start + offset) % limit)
+        if cache.add(key, token, CLUSTER_SLOT_TIMEOUT):
+            return key
+    interval = CLUSTER_POLL_INTERVAL
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        # Jitter the wait, so that waiting processes do not poll in step.
+        time.sleep(min(interval * random.uniform(0.5, 1), remaining))  # nosec: B311
+        interval = min(interval * 2, CLUSTER_MAX_POLL_INTERVAL)
+        key = make_key("hashing_slot", limit, random.randrange(limit))  # nosec: B311
+        if cache.add(key, token, CLUSTER_SLOT_TIMEOUT):
+            return key
+
+
+def release_cluster_slot(key, token):
+    """
+    Release a slot shared through the cache, if it is still held by
+    ``token``.
+
+    A slot held for longer than ``CLUSTER_SLOT_TIMEOUT`` expires, and may
+    then be taken by another process, whose slot must not be released.
+    The cache API has no atomic compare-and-delete, so another process
+    can still take the slot between the comparison and the deletion,
+    but only if the slot expires in that instant.
+
+    """
+    cache = get_cache()
+    if cache.get(key) == token:
+        cache.delete(key)
+
+
+@contextlib.contextmanager
+def hashing_slot():
+    """
+    Context manager which holds a password-hashing slot for the
+    duration of the block, as configured by the
+    ``REGISTRATION_HASHING_CONCURRENCY`` setting.
+
+    Raises ``RegistrationBusy`` if no slot becomes free within the
+    configured timeout.
+
+    """
+    process_limit, cluster_limit, timeout = get_limits()
+    deadline = time.monotonic() + timeout
+    with contextlib.ExitStack() as stack:
+        if process_limit is not None:
+            semaphore = get_semaphore(process_limit)
+            if not semaphore.acquire(timeout=timeout):
+                raise RegistrationBusy(BUSY, code="busy")
+            stack.callback(semaphore.release)
+        if cluster_limit is not None:
+            token = uuid.uuid4().hex
+            key = acquire_cluster_slot(cluster_limit, deadline, token)
+            if key is None:
+                raise RegistrationBusy(BUSY, code="busy")
+            stack.callback(release_cluster_slot, key, token)
+        yield
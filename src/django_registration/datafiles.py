@@ -0,0 +1,437 @@
+"""
+Compact on-disk data files for fast lookups against very large
+datasets.
+
+Files are opened with ``mmap``, so every process on a machine shares a
+single copy of the data through the operating system's page cache, and
+are searched in place (by binary search, for the sorted formats), so no
+per-process copy of the data is ever built. A file which is replaced on
+disk is picked up without a restart.
+
+"""
+
+import contextlib
+import logging
+import math
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+
+LN2 = math.log(2)
+
+logger = logging.getLogger(__name__)
+
+
+class MappedFile:
+    """
+    Base class for a read-only, memory-mapped data file which is
+    reloaded when the file on disk changes.
+
+    To let readers carry on using the old data while a new file is
+    written, files should be replaced atomically (as ``write_atomic()``
+    does) rather than modified in place.
+
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    # Identifies the file format; the first bytes of every file of this type.
+    magic = None
+
+    # How often, in seconds, to check whether the file has changed on disk.
+    check_interval = 5.0
+
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        self._lock = threading.Lock()
+        self._data = None
+        self._signature = None
+        self._next_check = 0.0
+
+    def _stat_signature(self):
+        """
+        Return a value which changes whenever the file is replaced or
+        modified.
+
+        """
+        stat = os.stat(self.path)
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def _open(self):
+        """
+        Map the file and validate its header, returning the mapping.
+
+        """
+        with open(self.path, "rb") as data_file:
+            data = mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if data[: len(self.magic)] != self.magic:
+            raise ValueError(f"{self.path} is not a valid {type(self).__name__}.")
+        return data
+
+    def get_data(self):
+        """
+        Return the mapping of the current version of the file,
+        reloading it if it has changed on disk.
+
+        """
+        now = time.monotonic()
+        if self._data is not None and now < self._next_check:
+            return self._data
+        with self._lock:
+            if self._data is None or now >= self._next_check:
+                try:
+                    signature = self._stat_signature()
+                except OSError:
+                    # The file is missing, perhaps only momentarily. Keep serving
+                    # the existing data if there is any.
+                    if self._data is None:
+                        raise
+                    signature = self._signature
+                if signature != self._signature:
+                    # The previous mapping is not closed explicitly, since other
+                    # threads may still be reading from it; it is closed when the
+                    # last reference to it goes away.
+                    try:
+                        self._data = self._open()
+                    except (OSError, ValueError):
+                        # The replacement is unreadable or corrupt. Keep serving
+                        # the existing data if there is any, and try again at the
+                        # next check.
+                        if self._data is None:
+                            raise
+                        logger.exception("Could not reload %s.", self.path)
+                    else:
+                        self._signature = signature
+                self._next_check = now + self.check_interval
+        return self._data
+
+
+class SortedSetFile(MappedFile):
+    """
+    A memory-mapped, sorted set of byte strings.
+
+    The file consists of a header (magic number and item count), a
+    table of ``count + 1`` offsets marking where each item starts and
+    the last one ends, and the items themselves, concatenated in sorted
+    order.
+
+    """
+
+    magic = b"DJREGSS1"
+    _header = struct.Struct("<8sQ")
+    _offset = struct.Struct("<Q")
+
+    @classmethod
+    def write(cls, path, items):
+        """
+        Write an iterable of byte strings as a sorted set file,
+        atomically replacing any existing file at ``path``.
+
+        """
+        items = sorted(set(items))
+        offsets = [0]
+        for item in items:
+            offsets.append(offsets[-1] + len(item))
+        write_atomic(
+            path,
+            [
+                cls._header.pack(cls.magic, len(items)),
+                *(cls._offset.pack(offset) for offset in offsets),
+                *items,
+            ],
+        )
+
+    def __contains__(self, item):
+        data = self.get_data()
+        _, count = self._header.unpack_from(data, 0)
+        table = self._header.size
+        items = table + (count + 1) * self._offset.size
+
+        def item_at(index):
+            start, end = struct.unpack_from(
+                "<2Q", data, table + index * self._offset.size
+            )
+            return data[items + start : items + end]
+
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            if item_at(middle) < item:
+                low = middle + 1
+            else:
+                high = middle
+        return low < count and item_at(low) == item
+
+
+class DigestFile(MappedFile):
+    """
+    A memory-mapped, sorted set of fixed-length binary digests, such as
+    a corpus of password hashes.
+
+    The file consists of a header (magic number, digest size and
+    count), a prefix table of 65,537 entries giving the index of the
+    first digest beginning with each possible two-byte prefix, and the
+    digests themselves in sorted order. The prefix table narrows each
+    search to the digests sharing the first two bytes, so lookups touch
+    only a few pages of even a very large file.
+
+    """
+
+    magic = b"DJREGDG1"
+    _header = struct.Struct("<8sIQ")
+    _index = struct.Struct("<Q")
+    _prefixes = 65536
+
+    @classmethod
+    def write(cls, path, digests, digest_size):
+        """
+        Write an iterable of digests, which must already be sorted, as
+        a digest file, atomically replacing any existing file at
+        ``path``. Duplicate digests are skipped.
+
+        Digests are streamed to disk, so the input may be much larger
+        than available memory. Raises ``ValueError`` if the digests are
+        not sorted or not all of ``digest_size`` bytes.
+
+        """
+        table_size = (cls._prefixes + 1) * cls._index.size
+        # Number of digests starting with each prefix.
+        prefix_counts = [0] * cls._prefixes
+        count = 0
+        previous = None
+        with atomic_output(path) as output:
+            output.seek(cls._header.size + table_size)
+            for digest in digests:
+                if len(digest) != digest_size:
+                    raise ValueError(f"Digest {digest.hex()} is the wrong size.")
+                if previous is not None and digest <= previous:
+                    if digest == previous:
+                        continue
+                    raise ValueError("Digests must be written in sorted order.")
+                output.write(digest)
+                prefix_counts[int.from_bytes(digest[:2], "big")] += 1
+                count += 1
+                previous = digest
+            output.seek(0)
+            output.write(cls._header.pack(cls.magic, digest_size, count))
+            start = 0
+            for prefix_count in prefix_counts:
+                output.write(cls._index.pack(start))
+                start += prefix_count
+            output.write(cls._index.pack(start))
+
+    def __contains__(self, digest):
+        data = self.get_data()
+        _, digest_size, _ = self._header.unpack_from(data, 0)
+        if len(digest) != digest_size:
+            return False
+        table = self._header.size
+        digests = table + (self._prefixes + 1) * self._index.size
+        prefix = int.from_bytes(digest[:2], "big")
+        low, high = struct.unpack_from("<2Q", data, table + prefix * self._index.size)
+        while low < high:
+            middle = (low + high) // 2
+            position = digests + middle * digest_size
+            if data[position : position + digest_size] < digest:
+                low = middle + 1
+            else:
+                high = middle
+        position = digests + low * digest_size
+        return data[position : position + digest_size] == digest
+
+
+class RangeFile(MappedFile):
+    """
+    A memory-mapped, sorted table of non-overlapping ranges of
+    fixed-width, big-endian unsigned integers, such as blocks of IP
+    addresses.
+
+    The file consists of a header (magic number, integer width and
+    range count) and the ranges in sorted order, each stored as its
+    first and last values. A lookup is a binary search for the last
+    range starting at or before the value.
+
+    """
+
+    magic = b"DJREGRT1"
+    _header = struct.Struct("<8sIQ")
+
+    @classmethod
+    def write(cls, path, ranges, width):
+        """
+        Write an iterable of inclusive ``(first, last)`` ranges of
+        integers as a range file, with each integer stored in ``width``
+        bytes, atomically replacing any existing file at ``path``.
+        Overlapping and adjacent ranges are merged.
+
+        The ranges are sorted in memory, in a compact packed form. Raises
+        ``ValueError`` if a range is empty or does not fit in ``width``
+        bytes.
+
+        """
+        packed = []
+        for first, last in ranges:
+            if not 0 <= first <= last < 256**width:
+                raise ValueError(f"Invalid range {first}-{last}.")
+            packed.append(first.to_bytes(width, "big") + last.to_bytes(width, "big"))
+        packed.sort()
+        merged = []
+        for record in packed:
+            if merged and int.from_bytes(record[:width], "big") <= (
+                int.from_bytes(merged[-1][width:], "big") + 1
+            ):
+                if record[width:] > merged[-1][width:]:
+                    merged[-1] = merged[-1][:width] + record[width:]
+            else:
+                merged.append(record)
+        write_atomic(path, [cls._header.pack(cls.magic, width, len(merged)), *merged])
+
+    def __contains__(self, value):
+        data = self.get_data()
+        _, width, count = self._header.unpack_from(data, 0)
+        if len(value) != width:
+            return False
+        ranges = self._header.size
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            position = ranges + middle * 2 * width
+            if data[position : position + width] <= value:
+                low = middle + 1
+            else:
+                high = middle
+        if low == 0:
+            return False
+        position = ranges + (low - 1) * 2 * width
+        return value <= data[position + width : position + 2 * width]
+
+
+class BloomFilterFile(MappedFile):
+    """
+    A memory-mapped Bloom filter of 16-byte digests.
+
+    The file consists of a header (magic number, generation, bit count
+    and hash count) and the filter's bits. A digest not in the filter
+    was certainly not added to it; a digest in the filter probably was,
+    with a false-positive rate fixed when the file is written. The
+    generation is an arbitrary number identifying the build of the
+    filter.
+
+    """
+
+    magic = b"DJREGBF1"
+    _header = struct.Struct("<8sQQI")
+    digest_size = 16
+
+    @classmethod
+    def write(cls, path, digests, count, false_positive_rate, generation=0):
+        """
+        Write an iterable of digests as a Bloom filter sized for
+        ``count`` digests at the given false-positive rate, atomically
+        replacing any existing file at ``path``.
+
+        The digests are streamed, but the filter's bits are built in
+        memory: about 1.2 bytes per digest at a rate of 1 percent.
+
+        """
+        if not 0 < false_positive_rate < 1:
+            raise ValueError(f"Invalid false-positive rate {false_positive_rate}.")
+        count = max(count, 1)
+        optimal_bits = -count * math.log(false_positive_rate) / LN2**2
+        hash_count = max(1, round(optimal_bits / count * LN2))
+        bit_count = max(64, math.ceil(optimal_bits))
+        bits = bytearray(math.ceil(bit_count / 8))
+        for digest in digests:
+            for position in cls._positions(digest, bit_count, hash_count):
+                bits[position >> 3] |= 1 << (position & 7)
+        write_atomic(
+            path,
+            [cls._header.pack(cls.magic, generation, bit_count, hash_count), bits],
+        )
+
+    @classmethod
+    def _positions(cls, digest, bit_count, hash_count):
+        """
+        Return the positions of the bits for a digest, derived from its
+        two halves by double hashing.
+
+        """
+        if len(digest) != cls.digest_size:
+            raise ValueError(f"Digest {digest.hex()} is the wrong size.")
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + index * second) % bit_count for index in range(hash_count)]
+
+    @property
+    def generation(self):
+        """
+        The generation of the current version of the file.
+
+        """
+        return self._header.unpack_from(self.get_data(), 0)[1]
+
+    def __contains__(self, digest):
+        if len(digest) != self.digest_size:
+            return False
+        data = self.get_data()
+        _, _, bit_count, hash_count = self._header.unpack_from(data, 0)
+        bits = self._header.size
+        return all(
+            data[bits + (position >> 3)] & (1 << (position & 7))
+            for position in self._positions(digest, bit_count, hash_count)
+        )
+
+
+_mapped_files = {}
+_mapped_files_lock = threading.Lock()
+
+
+def get_mapped_file(file_class, path):
+    """
+    Return the shared instance of ``file_class`` for ``path``, so that
+    each file is mapped only once per process.
+
+    """
+    key = (file_class, os.fspath(path))
+    try:
+        return _mapped_files[key]
+    except KeyError:
+        with _mapped_files_lock:
+            return _mapped_files.setdefault(key, file_class(path))
+
+
+@contextlib.contextmanager
+def atomic_output(path, mode=0o644):
+    """
+    Context manager yielding a binary file object whose contents
+    atomically replace any existing file at ``path`` once the block
+    completes successfully, so that processes reading the old file are
+    not disturbed. The file is given the permissions ``mode``.
+
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    descriptor, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(descriptor, "w+b") as temp_file:
+            yield temp_file
+        # mkstemp() creates files readable only by their owner, but data files are
+        # usually read by other processes.
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def write_atomic(path, chunks):
+    """
+    Write a sequence of byte strings to ``path``, atomically replacing
+    any existing file.
+
+    """
+    with atomic_output(path) as output:
+        for chunk in chunks:
+            output.write(chunk)
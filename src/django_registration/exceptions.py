@@ -22,3 +22,11 @@ class ActivationError(RegistrationError):
     Base class for account-activation errors.
 
     """
+
+
+class RegistrationBusy(RegistrationError):
+    """
+    Exception raised when a registration cannot proceed because too
+    many others are in progress.
+
+    """
@@ -7,111 +7,105 @@ significantly different, you may need to write your own form class;
 see the documentation for notes on custom user models with
 django-registration.
 
+The form classes are built on first access, rather than when this
+module is imported, so that importing it does not require the app
+registry to be ready. Forms for other user models can be built with
+registration_form_factory().
+
 """
 
-from django import forms
+import functools
+import typing
+
 from django.contrib.auth import get_user_model
-from django.contrib.auth.forms import UserCreationForm
-from django.utils.translation import gettext_lazy as _
 
-from . import validators
+if typing.TYPE_CHECKING:  # pragma: no cover
+    # For static analysis, which cannot see the classes __getattr__() builds.
+    from .base_forms import (  # noqa: F401
+        RegistrationForm,
+        RegistrationFormCaseInsensitive,
+        RegistrationFormNoFreeEmail,
+        RegistrationFormTermsOfService,
+        RegistrationFormUniqueCanonicalEmail,
+        RegistrationFormUniqueEmail,
+        RegistrationFormUniqueSkeleton,
+    )
 
-User = get_user_model()
+FORM_CLASSES = (
+    "RegistrationForm",
+    "RegistrationFormCaseInsensitive",
+    "RegistrationFormTermsOfService",
+    "RegistrationFormNoFreeEmail",
+    "RegistrationFormUniqueSkeleton",
+    "RegistrationFormUniqueEmail",
+    "RegistrationFormUniqueCanonicalEmail",
+)
 
 
-class RegistrationForm(UserCreationForm):
+def __getattr__(name):
     """
-    Form for registering a new user account.
-
-    Validates that the requested username is not already in use, and
-    requires the password to be entered twice to catch typos.
-
-    Subclasses should feel free to add any additional validation they
-    need, but should take care when overriding ``save()`` to respect
-    the ``commit=False`` argument, as several registration workflows
-    will make use of it to create inactive user accounts.
+    Build the form classes for the configured user model on first
+    access.
 
     """
-
-    # pylint: disable=too-few-public-methods
-
-    class Meta(UserCreationForm.Meta):
-        fields = [
-            User.USERNAME_FIELD,
-            User.get_email_field_name(),
-            "password1",
-            "password2",
-        ]
-
-    error_css_class = "error"
-    required_css_class = "required"
-
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        email_field = User.get_email_field_name()
-        if hasattr(self, "reserved_names"):
-            reserved_names = self.reserved_names
-        else:
-            reserved_names = validators.DEFAULT_RESERVED_NAMES
-        username_validators = [
-            validators.ReservedNameValidator(reserved_names),
-            validators.validate_confusables,
-        ]
-        self.fields[User.USERNAME_FIELD].validators.extend(username_validators)
-        # django-registration's email validation is significantly stricter than Django's
-        # default email validation, which means that leaving Django's default validation
-        # on only causes confusion due to duplicate error messages (see GitHub issue
-        # #238). So we apply only the django-registration validators, not the default
-        # Django validator, on the email field.
-        self.fields[email_field].validators = [
-            validators.HTML5EmailValidator(),
-            validators.validate_confusables_email,
-        ]
-        self.fields[email_field].required = True
+    if name in FORM_CLASSES:
+        form_class = registration_form_factory(None, name)
+        globals()[name] = form_class
+        return form_class
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
-class RegistrationFormCaseInsensitive(RegistrationForm):
+def registration_form_factory(user_model, name="RegistrationForm"):
     """
-    Subclass of ``RegistrationForm`` enforcing case-insensitive
-    uniqueness of usernames.
-
-    """
-
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.fields[User.USERNAME_FIELD].validators.append(
-            validators.CaseInsensitiveUnique(
-                User, User.USERNAME_FIELD, validators.DUPLICATE_USERNAME
-            )
-        )
+    Return the registration form class of the given name for a user
+    model, building it the first time it is requested. Every class other
+    than ``RegistrationForm`` is a subclass of the ``RegistrationForm``
+    built for the same user model.
 
+    With a ``user_model`` of ``None``, the form takes its fields from
+    the configured user model but keeps the model of Django's
+    ``UserCreationForm``, so that using it with a custom user model is
+    reported as a misconfiguration rather than silently accepted.
 
-class RegistrationFormTermsOfService(RegistrationForm):
     """
-    Subclass of ``RegistrationForm`` which adds a required checkbox
-    for agreeing to a site's Terms of Service.
-
-    """
-
-    tos = forms.BooleanField(
-        widget=forms.CheckboxInput,
-        label=_("I have read and agree to the Terms of Service"),
-        error_messages={"required": validators.TOS_REQUIRED},
-    )
+    # The arguments are passed positionally, since lru_cache() caches calls
+    # differing only in how their arguments are passed separately.
+    return _build_form_class(user_model, name)
 
 
-class RegistrationFormUniqueEmail(RegistrationForm):
+@functools.lru_cache(maxsize=None)
+def _build_form_class(user_model, name):
     """
-    Subclass of ``RegistrationForm`` which enforces uniqueness of
-    email addresses.
+    Build the registration form class of the given name for a user
+    model.
 
     """
-
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        email_field = User.get_email_field_name()
-        self.fields[email_field].validators.append(
-            validators.CaseInsensitiveUnique(
-                User, email_field, validators.DUPLICATE_EMAIL
-            )
-        )
+    # pylint: disable=import-outside-toplevel
+    from . import base_forms
+
+    base = getattr(base_forms, name)
+    fields_model = user_model or get_user_model()
+    meta_attrs = {
+        "fields": [
+            fields_model.USERNAME_FIELD,
+            fields_model.get_email_field_name(),
+            "password1",
+            "password2",
+        ]
+    }
+    if user_model is not None:
+        meta_attrs["model"] = user_model
+    bases = (base,)
+    if name != "RegistrationForm":
+        # Each variant also subclasses the built RegistrationForm, so that it is
+        # still a subclass of this module's RegistrationForm.
+        bases += (registration_form_factory(user_model),)
+    return type(
+        name,
+        bases,
+        {
+            "Meta": type("Meta", (base.Meta,), meta_attrs),
+            "__doc__": base.__doc__,
+            "__module__": __name__,
+        },
+    )
@@ -0,0 +1,85 @@
+"""
+Idempotency keys for registration submissions.
+
+Each rendering of the registration form carries a random key, and the
+outcome of the first submission completed with a key is stored in the
+cache. A repeated submission with the same key (from a double click,
+or a client retrying over a flaky connection) receives the stored
+outcome instead of registering again, and a submission arriving while
+the first is still in progress is turned away at once, to try again
+shortly, rather than holding a worker while it waits.
+
+"""
+
+import hashlib
+import secrets
+
+from .cache import get_cache, make_key
+
+# The value stored for a key while its first submission is in progress.
+PENDING = "pending"
+
+# How long, in seconds, a key is held for a submission in progress, in case the
+# process handling it dies without releasing it.
+PENDING_TIMEOUT = 60
+
+# How long, in seconds, the outcome of a completed submission is stored.
+OUTCOME_TIMEOUT = 24 * 60 * 60
+
+# The longest key accepted from a client.
+MAX_KEY_LENGTH = 128
+
+
+def new_key():
+    """
+    Return a new idempotency key.
+
+    """
+    return secrets.token_urlsafe(16)
+
+
+def get_cache_key(key):
+    """
+    Return the cache key under which the outcome for an idempotency key
+    is stored.
+
+    """
+    return make_key("idempotency", hashlib.sha256(key.encode("utf-8")).hexdigest())
+
+
+def begin(key):
+    """
+    Claim an idempotency key for a submission. Return ``True`` if this is
+    the first submission with the key, and ``False`` if not.
+
+    """
+    return get_cache().add(get_cache_key(key), PENDING, PENDING_TIMEOUT)
+
+
+def complete(key, url):
+    """
+    Store the URL redirected to by the completed submission with an
+    idempotency key.
+
+    """
+    get_cache().set(get_cache_key(key), url, OUTCOME_TIMEOUT)
+
+
+def abandon(key):
+    """
+    Release an idempotency key whose submission did not complete, so
+    that it can be submitted again.
+
+    """
+    get_cache().delete(get_cache_key(key))
+
+
+def get_outcome(key):
+    """
+    Return the URL redirected to by the completed submission with an
+    idempotency key, or ``None`` if no submission with the key has
+    completed.
+
+    """
+    outcome = get_cache().get(get_cache_key(key))
+    return None if outcome == PENDING else outcome
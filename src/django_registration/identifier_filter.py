@@ -0,0 +1,154 @@
+"""
+A probabilistic pre-filter of the identifiers taken by user accounts,
+letting uniqueness checks skip the database for identifiers which are
+certainly free.
+
+The ``compile_identifier_filter`` management command writes a Bloom
+filter of the normalized usernames and email addresses of every user
+account to the file named by the ``REGISTRATION_IDENTIFIER_FILTER_FILE``
+setting. An identifier absent from the filter is certainly not taken,
+unless it was stored after the filter was built; one present may or may
+not be taken, so is checked against the database as usual.
+
+Identifiers stored after the filter was built are recorded in the
+cache, under the filter's generation, split into shards so that each
+check reads only a few entries. Each shard is a counter of the
+identifiers recorded in it, plus one entry per identifier. If a shard's
+counter or any of its entries is missing from the cache (because it
+expired or was evicted, or is still being written), nothing is
+concluded from the filter, and the database is checked. Rebuild the
+filter regularly, since recorded identifiers accumulate until then and
+expire after ``RECORD_TIMEOUT``.
+
+"""
+
+import hashlib
+import time
+import unicodedata
+
+from django.conf import settings
+
+from . import datafiles
+from .cache import get_cache, make_key
+
+# The number of shards the identifiers recorded since the filter was built are
+# split into.
+SHARDS = 1024
+
+# How long, in seconds, identifiers recorded since the filter was built are kept.
+RECORD_TIMEOUT = 7 * 24 * 60 * 60
+
+# The cache key naming the generation of the most recently started build of the
+# filter.
+LATEST_KEY = make_key("identifier_filter", "latest")
+
+
+def get_digest(model, field_name, value):
+    """
+    Return the digest representing an identifier, the value of the
+    named field of the given user model, in the filter.
+
+    """
+    # pylint: disable=protected-access
+    value = unicodedata.normalize("NFKC", value).casefold()
+    return hashlib.blake2b(
+        f"{model._meta.label_lower}.{field_name}:{value}".encode("utf-8"),
+        digest_size=datafiles.BloomFilterFile.digest_size,
+    ).digest()
+
+
+def get_filter():
+    """
+    Return the filter named by the ``REGISTRATION_IDENTIFIER_FILTER_FILE``
+    setting, or ``None`` if it is not set or the file has not been built
+    yet.
+
+    """
+    path = getattr(settings, "REGISTRATION_IDENTIFIER_FILTER_FILE", None)
+    if path is None:
+        return None
+    bloom_filter = datafiles.get_mapped_file(datafiles.BloomFilterFile, path)
+    try:
+        bloom_filter.get_data()
+    except FileNotFoundError:
+        return None
+    return bloom_filter
+
+
+def get_shard_key(generation, digest):
+    """
+    Return the cache key of the counter of the shard in which a digest
+    is recorded for a generation of the filter. The shard's entries are
+    stored under this key suffixed with their numbers.
+
+    """
+    shard = int.from_bytes(digest[:4], "big") % SHARDS
+    return make_key("identifier_filter", generation, shard)
+
+
+def start_generation():
+    """
+    Start a new generation of the filter, before reading the user
+    accounts to build it from, and return it.
+
+    From then on, identifiers are recorded both in this generation and
+    in the generation of the filter in place, so that none stored while
+    the new filter is being built and distributed is missed.
+
+    """
+    generation = time.time_ns()
+    cache = get_cache()
+    cache.set_many(
+        {
+            make_key("identifier_filter", generation, shard): 0
+            for shard in range(SHARDS)
+        },
+        RECORD_TIMEOUT,
+    )
+    cache.set(LATEST_KEY, generation, RECORD_TIMEOUT)
+    return generation
+
+
+def might_be_taken(model, field_name, value):
+    """
+    Return ``False`` if an identifier is certainly not taken, and
+    ``True`` if it might be.
+
+    """
+    bloom_filter = get_filter()
+    if bloom_filter is None:
+        return True
+    digest = get_digest(model, field_name, value)
+    if digest in bloom_filter:
+        return True
+    cache = get_cache()
+    shard_key = get_shard_key(bloom_filter.generation, digest)
+    count = cache.get(shard_key)
+    if count is None:
+        return True
+    entries = cache.get_many([f"{shard_key}:{index}" for index in range(1, count + 1)])
+    return len(entries) < count or digest in entries.values()
+
+
+def record(model, field_name, value):
+    """
+    Record a newly-stored identifier in the generations of the filter in
+    place and most recently started, if a filter is in use.
+
+    """
+    if getattr(settings, "REGISTRATION_IDENTIFIER_FILTER_FILE", None) is None:
+        return
+    cache = get_cache()
+    generations = {cache.get(LATEST_KEY)}
+    bloom_filter = get_filter()
+    if bloom_filter is not None:
+        generations.add(bloom_filter.generation)
+    digest = get_digest(model, field_name, value)
+    for generation in generations - {None}:
+        shard_key = get_shard_key(generation, digest)
+        try:
+            index = cache.incr(shard_key)
+        except ValueError:
+            # The shard has expired, so checks against it go to the database.
+            continue
+        cache.set(f"{shard_key}:{index}", digest, RECORD_TIMEOUT)
@@ -0,0 +1,263 @@
+"""
+Delivery of registration email through a circuit breaker, which diverts
+messages to a local spool while the mail server is failing.
+
+Without this, a stalled mail server makes every registration wait for
+a socket timeout, and a burst of signups can tie up every worker. With
+the ``REGISTRATION_EMAIL_SPOOL_DIR`` setting configured, repeated
+delivery failures open the circuit: further messages are written to the
+spool directory at once, without contacting the mail server, until a
+single probe message succeeds. Spooled messages are sent later by the
+``send_spooled_email`` management command.
+
+"""
+
+import contextlib
+import json
+import logging
+import os
+import smtplib
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from .datafiles import atomic_output
+
+SPOOL_SUFFIX = ".json"
+
+# The file whose existence marks the spool as being sent from.
+SPOOL_LOCK = ".lock"
+
+# The subdirectory of the spool to which messages are moved once the mail server
+# has rejected them MAX_ATTEMPTS times.
+FAILED_DIR = "failed"
+MAX_ATTEMPTS = 5
+
+# Errors with which the mail server rejects a particular message, rather than
+# being unavailable.
+MESSAGE_ERRORS = (
+    smtplib.SMTPDataError,
+    smtplib.SMTPRecipientsRefused,
+    smtplib.SMTPSenderRefused,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """
+    A per-process circuit breaker.
+
+    The circuit opens after ``failure_threshold`` consecutive failures.
+    Once it has been open for ``reset_timeout`` seconds it becomes
+    half-open, allowing a single probe through: if the probe succeeds
+    the circuit closes, and if it fails the circuit opens again. A probe
+    whose outcome is never recorded (because it raised an exception the
+    caller did not handle) is abandoned after another ``reset_timeout``
+    seconds, and a new one allowed.
+
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probe_started_at = None
+
+    def allow(self):
+        """
+        Return whether an attempt may be made now.
+
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            now = time.monotonic()
+            if now < self._opened_at + self.reset_timeout:
+                return False
+            if self._probe_started_at is not None and now < (
+                self._probe_started_at + self.reset_timeout
+            ):
+                return False
+            self._probe_started_at = now
+            return True
+
+    def succeeded(self):
+        """
+        Record a successful attempt, closing the circuit.
+
+        """
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probe_started_at = None
+
+    def failed(self):
+        """
+        Record a failed attempt, opening the circuit if it was half-open
+        or has now failed too many times in a row.
+
+        """
+        with self._lock:
+            self._failures += 1
+            self._probe_started_at = None
+            if self._opened_at is not None or (
+                self._failures >= self.failure_threshold
+            ):
+                self._opened_at = time.monotonic()
+
+
+_breaker = None  # pylint: disable=invalid-name
+
+
+def get_circuit_breaker():
+    """
+    Return the circuit breaker configured by the
+    ``REGISTRATION_EMAIL_CIRCUIT_BREAKER`` setting.
+
+    """
+    global _breaker  # pylint: disable=global-statement
+    if _breaker is None:
+        _breaker = CircuitBreaker(
+            **(getattr(settings, "REGISTRATION_EMAIL_CIRCUIT_BREAKER", None) or {})
+        )
+    return _breaker
+
+
+@receiver(setting_changed)
+def reset_circuit_breaker(*, setting, **kwargs):  # pylint: disable=unused-argument
+    """
+    Discard the configured circuit breaker when the setting changes, as
+    it does in tests.
+
+    """
+    global _breaker  # pylint: disable=global-statement
+    if setting == "REGISTRATION_EMAIL_CIRCUIT_BREAKER":
+        _breaker = None
+
+
+def write_spooled(path, spooled):
+    """
+    Durably write a spooled message to ``path``. Messages may contain
+    activation keys, so are readable only by their owner.
+
+    """
+    with atomic_output(path, mode=0o600) as output:
+        output.write(json.dumps(spooled).encode("utf-8"))
+        output.flush()
+        os.fsync(output.fileno())
+
+
+def spool_message(directory, subject, message, from_email, recipient_list):
+    """
+    Write a message to the spool directory, to be sent later.
+
+    """
+    name = f"{time.time_ns():020d}-{uuid.uuid4().hex}{SPOOL_SUFFIX}"
+    write_spooled(
+        os.path.join(directory, name),
+        {
+            "subject": subject,
+            "message": message,
+            "from_email": from_email,
+            "recipient_list": recipient_list,
+        },
+    )
+
+
+@contextlib.contextmanager
+def lock_spool(directory):
+    """
+    Context manager holding the lock file of the spool directory, so
+    that only one process sends spooled messages at a time. Raises
+    ``FileExistsError`` if the lock file already exists.
+
+    The lock file is removed when the block exits, but not if the
+    process dies, in which case it must be removed by hand.
+
+    """
+    path = os.path.join(directory, SPOOL_LOCK)
+    os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600))
+    try:
+        yield
+    finally:
+        os.unlink(path)
+
+
+def send_spooled(directory):
+    """
+    Send the messages in the spool directory, oldest first, removing
+    each once it has been sent. Return the number sent and the number
+    rejected.
+
+    A message the mail server rejects is kept, with a count of its
+    attempts, and moved to the ``failed`` subdirectory after
+    ``MAX_ATTEMPTS`` of them, and the later messages are still sent.
+    Any other failure means the mail server is unavailable, so stops at,
+    and raises, the error, leaving that and any later messages in the
+    spool.
+
+    """
+    sent = rejected = 0
+    with lock_spool(directory):
+        names = sorted(
+            name for name in os.listdir(directory) if name.endswith(SPOOL_SUFFIX)
+        )
+        for name in names:
+            path = os.path.join(directory, name)
+            with open(path, encoding="utf-8") as spooled_file:
+                spooled = json.load(spooled_file)
+            attempts = spooled.pop("attempts", 0) + 1
+            try:
+                send_mail(**spooled)
+            except MESSAGE_ERRORS:
+                logger.exception("Spooled message %s was rejected.", name)
+                rejected += 1
+                if attempts < MAX_ATTEMPTS:
+                    write_spooled(path, {**spooled, "attempts": attempts})
+                else:
+                    failed_dir = os.path.join(directory, FAILED_DIR)
+                    os.makedirs(failed_dir, mode=0o700, exist_ok=True)
+                    os.replace(path, os.path.join(failed_dir, name))
+                continue
+            os.unlink(path)
+            sent += 1
+    return sent, rejected
+
+
+def email_user(user, subject, message, from_email=None):
+    """
+    Email a user through the circuit breaker, spooling the message if
+    the circuit is open or delivery fails.
+
+    Without the ``REGISTRATION_EMAIL_SPOOL_DIR`` setting, this is
+    equivalent to calling ``user.email_user()``.
+
+    """
+    directory = getattr(settings, "REGISTRATION_EMAIL_SPOOL_DIR", None)
+    if directory is None:
+        user.email_user(subject, message, from_email)
+        return
+    breaker = get_circuit_breaker()
+    if breaker.allow():
+        try:
+            user.email_user(subject, message, from_email)
+        except (smtplib.SMTPException, OSError):
+            breaker.failed()
+        else:
+            breaker.succeeded()
+            return
+    spool_message(
+        directory,
+        subject,
+        message,
+        from_email,
+        [getattr(user, user.get_email_field_name())],
+    )
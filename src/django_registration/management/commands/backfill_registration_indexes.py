@@ -0,0 +1,83 @@
+"""
+Management command to populate django-registration's precomputed
+identifier indexes for existing user accounts.
+
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from django_registration.models import INDEX_MODELS
+
+
+class Command(BaseCommand):
+    """
+    Populate the identifier indexes for every existing user account.
+
+    """
+
+    help = (
+        "Compute and store django-registration's indexed identifier values "
+        "for all existing user accounts."
+    )
+
+    def add_arguments(self, parser):
+        """
+        Add the ``--batch-size`` option.
+
+        """
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of user accounts to process per batch (default: 1000).",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Backfill the indexes, a batch of user accounts at a time, in order
+        of primary key.
+
+        """
+        # pylint: disable=invalid-name,no-member,protected-access
+        User = get_user_model()
+        batch_size = options["batch_size"]
+        queryset = User._default_manager.order_by("pk")
+        processed = 0
+        last_pk = None
+        while True:
+            # Keyset pagination keeps each batch an indexed range scan, no matter how
+            # far into the table it is.
+            batch_queryset = queryset
+            if last_pk is not None:
+                batch_queryset = queryset.filter(pk__gt=last_pk)
+            users = list(batch_queryset[:batch_size])
+            if not users:
+                break
+            self.backfill(users)
+            processed += len(users)
+            last_pk = users[-1].pk
+            if options["verbosity"] > 1:
+                self.stdout.write(f"Processed {processed} user accounts.")
+        self.stdout.write(
+            self.style.SUCCESS(f"Backfilled indexes for {processed} user accounts.")
+        )
+
+    def backfill(self, users):
+        """
+        Replace the stored index values for a batch of user accounts.
+
+        """
+        # pylint: disable=protected-access
+        user_pks = [user.pk for user in users]
+        with transaction.atomic():
+            for model in INDEX_MODELS:
+                model._default_manager.filter(user__in=user_pks).delete()
+                model._default_manager.bulk_create(
+                    [
+                        instance
+                        for instance in map(model.from_user, users)
+                        if instance is not None
+                    ]
+                )
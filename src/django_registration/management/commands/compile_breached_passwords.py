@@ -0,0 +1,63 @@
+"""
+Management command to compile a list of SHA-1 password hashes into the
+memory-mapped format read by ``BreachedPasswordValidator``.
+
+"""
+
+import hashlib
+
+from django.core.management.base import BaseCommand, CommandError
+
+from django_registration.datafiles import DigestFile
+
+
+class Command(BaseCommand):
+    """
+    Compile a breached password corpus for ``BreachedPasswordValidator``.
+
+    """
+
+    help = (
+        "Compile a sorted text file of SHA-1 password hashes, one per line and "
+        "optionally followed by ':' and a count (as distributed by Have I Been "
+        "Pwned), into the format read by BreachedPasswordValidator."
+    )
+
+    def add_arguments(self, parser):
+        """
+        Add the source and destination file arguments.
+
+        """
+        parser.add_argument("source", help="Sorted text file of hashes to read.")
+        parser.add_argument("destination", help="Compiled file to write.")
+
+    def handle(self, *args, **options):
+        """
+        Read the hashes, dropping any counts, and write them as a digest
+        file, reporting a source which is not sorted SHA-1 hashes as an
+        error.
+
+        """
+        # pylint: disable=no-member
+        digest_size = hashlib.sha1().digest_size  # nosec: B303,B324
+        with open(options["source"], encoding="ascii") as source:
+            try:
+                DigestFile.write(
+                    options["destination"],
+                    (
+                        bytes.fromhex(line.split(":", 1)[0].strip())
+                        for line in source
+                        if line.strip()
+                    ),
+                    digest_size,
+                )
+            except ValueError as error:
+                raise CommandError(
+                    f"Could not compile {options['source']}: {error} The source "
+                    "must contain one hexadecimal SHA-1 hash per line, in sorted order."
+                ) from error
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Compiled {options['source']} into {options['destination']}."
+            )
+        )
@@ -0,0 +1,49 @@
+"""
+Management command to compile a plain-text list of email domains into
+the memory-mapped format read by ``DisposableEmailValidator``.
+
+"""
+
+from django.core.management.base import BaseCommand
+
+from django_registration.datafiles import SortedSetFile
+
+
+class Command(BaseCommand):
+    """
+    Compile a list of email domains for ``DisposableEmailValidator``.
+
+    """
+
+    help = (
+        "Compile a plain-text list of email domains, one per line, into the "
+        "format read by DisposableEmailValidator."
+    )
+
+    def add_arguments(self, parser):
+        """
+        Add the source and destination file arguments.
+
+        """
+        parser.add_argument("source", help="Plain-text file of domains to read.")
+        parser.add_argument("destination", help="Compiled file to write.")
+
+    def handle(self, *args, **options):
+        """
+        Read the domains, ignoring comments, blank lines, case and trailing
+        dots, and write them as a sorted set.
+
+        """
+        # pylint: disable=no-member
+        domains = set()
+        with open(options["source"], encoding="utf-8") as source:
+            for line in source:
+                domain = line.split("#", 1)[0].strip().lower().rstrip(".")
+                if domain:
+                    domains.add(domain.encode())
+        SortedSetFile.write(options["destination"], domains)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Compiled {len(domains)} domains into {options['destination']}."
+            )
+        )
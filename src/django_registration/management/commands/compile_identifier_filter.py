@@ -0,0 +1,87 @@
+"""
+Management command to compile a Bloom filter of the usernames and email
+addresses of all user accounts, consulted by uniqueness checks before
+the database.
+
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from django_registration import identifier_filter
+from django_registration.datafiles import BloomFilterFile
+
+
+class Command(BaseCommand):
+    """
+    Compile a Bloom filter of the identifiers of all user accounts.
+
+    """
+
+    help = (
+        "Compile a Bloom filter of the usernames and email addresses of all user "
+        "accounts, in the format read by REGISTRATION_IDENTIFIER_FILTER_FILE."
+    )
+
+    def add_arguments(self, parser):
+        """
+        Add the destination argument and the options sizing the filter and
+        the batches of accounts read.
+
+        """
+        parser.add_argument("destination", help="Compiled file to write.")
+        parser.add_argument(
+            "--false-positive-rate",
+            type=float,
+            default=0.01,
+            help="Rate of false positives to size the filter for (default: 0.01).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10000,
+            help="Number of user accounts to read per query (default: 10000).",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Start a new generation of recorded identifiers, then write the
+        filter of every account's username and email address.
+
+        """
+        # pylint: disable=invalid-name,no-member,protected-access
+        User = get_user_model()
+        if not 0 < options["false_positive_rate"] < 1:
+            raise CommandError("The false-positive rate must be between 0 and 1.")
+        fields = [User.USERNAME_FIELD, User.get_email_field_name()]
+        # The generation is started before any account is read, so that accounts
+        # stored while the filter is being built are recorded for it.
+        generation = identifier_filter.start_generation()
+        accounts = User._default_manager.count()
+        BloomFilterFile.write(
+            options["destination"],
+            self.digests(User, fields, options["batch_size"]),
+            accounts * len(fields),
+            options["false_positive_rate"],
+            generation,
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Compiled the identifiers of {accounts} user accounts into "
+                f"{options['destination']}."
+            )
+        )
+
+    def digests(self, user_model, fields, batch_size):
+        """
+        Yield the digests of the identifiers of all user accounts.
+
+        """
+        # pylint: disable=protected-access
+        for field_name in fields:
+            values = user_model._default_manager.values_list(
+                field_name, flat=True
+            ).iterator(chunk_size=batch_size)
+            for value in values:
+                if value:
+                    yield identifier_filter.get_digest(user_model, field_name, value)
@@ -0,0 +1,64 @@
+"""
+Management command to compile a plain-text list of IP networks into the
+memory-mapped format read by ``REGISTRATION_IP_BLOCKLIST_FILE``.
+
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from django_registration.datafiles import RangeFile
+from django_registration.reputation import ADDRESS_WIDTH, network_range
+
+
+class Command(BaseCommand):
+    """
+    Compile lists of networks for ``REGISTRATION_IP_BLOCKLIST_FILE``.
+
+    """
+
+    help = (
+        "Compile plain-text lists of IPv4 and IPv6 networks in CIDR notation, or "
+        "single addresses, one per line, into the format read by "
+        "REGISTRATION_IP_BLOCKLIST_FILE."
+    )
+
+    def add_arguments(self, parser):
+        """
+        Add the arguments naming the source files and the destination.
+
+        """
+        parser.add_argument(
+            "sources", nargs="+", help="Plain-text files of networks to read."
+        )
+        parser.add_argument("destination", help="Compiled file to write.")
+
+    def read_networks(self, sources):
+        """
+        Yield the range of each network listed in the source files.
+
+        """
+        for path in sources:
+            with open(path, encoding="utf-8") as source:
+                for number, line in enumerate(source, 1):
+                    network = line.split("#", 1)[0].strip()
+                    if not network:
+                        continue
+                    try:
+                        yield network_range(network)
+                    except ValueError as error:
+                        raise CommandError(f"{path}, line {number}: {error}") from error
+
+    def handle(self, *args, **options):
+        """
+        Write the ranges of the listed networks as a range file.
+
+        """
+        # pylint: disable=no-member
+        RangeFile.write(
+            options["destination"],
+            self.read_networks(options["sources"]),
+            ADDRESS_WIDTH,
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Compiled networks into {options['destination']}.")
+        )
@@ -0,0 +1,82 @@
+"""
+Management command to open or close registration, immediately or for a
+scheduled period, without changing settings or restarting processes.
+
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from django_registration.models import RegistrationPeriod
+
+
+class Command(BaseCommand):
+    """
+    Schedule a period during which registration is open or closed.
+
+    """
+
+    help = (
+        "Open or close registration, from now or a given time, until further "
+        "notice or a given time."
+    )
+
+    def add_arguments(self, parser):
+        """
+        Add the state argument and the options choosing the site and the
+        period's start and end.
+
+        """
+        parser.add_argument("state", choices=["open", "close"])
+        parser.add_argument(
+            "--site-id",
+            type=int,
+            help="Apply only to the site with this ID, rather than all sites.",
+        )
+        parser.add_argument(
+            "--start", help="Date and time at which to start (default: now)."
+        )
+        parser.add_argument(
+            "--end", help="Date and time at which to end (default: never)."
+        )
+
+    def parse_datetime(self, value):
+        """
+        Parse a date and time given on the command line, interpreting it
+        in the current time zone if it does not specify one.
+
+        """
+        try:
+            parsed = parse_datetime(value)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise CommandError(f"Invalid date and time {value!r}.")
+        if settings.USE_TZ and timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
+
+    def handle(self, *args, **options):
+        """
+        Create the registration period, checking that it ends after it
+        starts.
+
+        """
+        # pylint: disable=no-member
+        starts_at = timezone.now()
+        if options["start"]:
+            starts_at = self.parse_datetime(options["start"])
+        ends_at = None
+        if options["end"]:
+            ends_at = self.parse_datetime(options["end"])
+            if ends_at <= starts_at:
+                raise CommandError("The end must be after the start.")
+        period = RegistrationPeriod.objects.create(
+            site_id=options["site_id"],
+            is_open=options["state"] == "open",
+            starts_at=starts_at,
+            ends_at=ends_at,
+        )
+        self.stdout.write(self.style.SUCCESS(f"Scheduled registration {period}."))
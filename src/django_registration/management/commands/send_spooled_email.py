@@ -0,0 +1,50 @@
+"""
+Management command to send registration email spooled while the mail
+server was failing.
+
+"""
+
+import os
+import smtplib
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from django_registration.mail import SPOOL_LOCK, send_spooled
+
+
+class Command(BaseCommand):
+    """
+    Send the email spooled while the mail server was failing.
+
+    """
+
+    help = (
+        "Send registration email spooled to REGISTRATION_EMAIL_SPOOL_DIR while "
+        "the mail server was failing."
+    )
+
+    def handle(self, *args, **options):
+        """
+        Send the spooled messages, reporting how many were sent and how
+        many the mail server rejected.
+
+        """
+        # pylint: disable=no-member
+        directory = getattr(settings, "REGISTRATION_EMAIL_SPOOL_DIR", None)
+        if directory is None:
+            raise CommandError("REGISTRATION_EMAIL_SPOOL_DIR is not set.")
+        try:
+            sent, rejected = send_spooled(directory)
+        except FileExistsError as error:
+            raise CommandError(
+                f"Spooled email is already being sent. If it is not, remove "
+                f"{os.path.join(directory, SPOOL_LOCK)}."
+            ) from error
+        except (smtplib.SMTPException, OSError) as error:
+            raise CommandError(f"Failed to send spooled email: {error}") from error
+        self.stdout.write(self.style.SUCCESS(f"Sent {sent} spooled messages."))
+        if rejected:
+            self.stdout.write(
+                self.style.WARNING(f"{rejected} spooled messages were rejected.")
+            )
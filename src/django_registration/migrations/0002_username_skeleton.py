@@ -0,0 +1,40 @@
+# pylint: disable=invalid-name
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("django_registration", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UsernameSkeleton",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="+",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="user",
+                    ),
+                ),
+                (
+                    "skeleton",
+                    models.CharField(
+                        db_index=True, max_length=255, verbose_name="skeleton"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "username skeleton",
+                "verbose_name_plural": "username skeletons",
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# pylint: disable=invalid-name
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("django_registration", "0002_username_skeleton"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CanonicalEmail",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="+",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="user",
+                    ),
+                ),
+                (
+                    "email",
+                    models.CharField(
+                        db_index=True,
+                        max_length=254,
+                        verbose_name="canonical email address",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "canonical email address",
+                "verbose_name_plural": "canonical email addresses",
+            },
+        ),
+    ]
@@ -0,0 +1,60 @@
+# pylint: disable=invalid-name
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("django_registration", "0003_canonical_email"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RegistrationPeriod",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "site_id",
+                    models.PositiveIntegerField(
+                        blank=True,
+                        help_text="Leave blank to apply to all sites.",
+                        null=True,
+                        verbose_name="site ID",
+                    ),
+                ),
+                (
+                    "is_open",
+                    models.BooleanField(verbose_name="registration open"),
+                ),
+                (
+                    "starts_at",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="Leave blank to start immediately.",
+                        null=True,
+                        verbose_name="starts at",
+                    ),
+                ),
+                (
+                    "ends_at",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="Leave blank to continue indefinitely.",
+                        null=True,
+                        verbose_name="ends at",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "registration period",
+                "verbose_name_plural": "registration periods",
+            },
+        ),
+    ]
@@ -0,0 +1,226 @@
+"""
+Models storing precomputed, indexed forms of user-account identifiers,
+so that registration validation can check them with a single indexed
+lookup rather than by normalizing values at query time.
+
+"""
+
+from django.conf import settings
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from . import validators
+
+
+class UserIdentifierIndex(models.Model):
+    """
+    Abstract base class for a normalized form of one of a user account's
+    identifiers, stored in an indexed column.
+
+    Subclasses must define the indexed field, named by ``value_field``,
+    and implement ``get_source_field()`` and ``normalize()``.
+
+    """
+
+    # The indexed field holding the normalized value. Values longer than the field's
+    # max_length are truncated, so that all supported databases can index it.
+    value_field = None
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="+",
+        verbose_name=_("user"),
+    )
+
+    class Meta:
+        # pylint: disable=too-few-public-methods
+
+        abstract = True
+
+    def __str__(self):
+        return getattr(self, self.value_field)
+
+    @classmethod
+    def get_source_field(cls, user):
+        """
+        Return the name of the field of the user model from which the
+        indexed value is computed.
+
+        """
+        raise NotImplementedError
+
+    @classmethod
+    def normalize(cls, value):
+        """
+        Return the normalized form of the given value, suitable for
+        storing in or querying against the indexed field.
+
+        """
+        raise NotImplementedError
+
+    @classmethod
+    def max_length(cls):
+        """
+        Return the maximum length of the indexed field.
+
+        """
+        # pylint: disable=no-member
+        return cls._meta.get_field(cls.value_field).max_length
+
+    @classmethod
+    def from_user(cls, user):
+        """
+        Return an unsaved instance for the given user, or ``None`` if
+        the user's source value is not a non-empty string.
+
+        """
+        value = getattr(user, cls.get_source_field(user))
+        if not isinstance(value, str) or not value:
+            return None
+        return cls(user=user, **{cls.value_field: cls.normalize(value)})
+
+    @classmethod
+    def update_for_user(cls, user, update_fields=None):
+        """
+        Store the normalized value for the given user, unless
+        ``update_fields`` shows the source field was not changed.
+
+        """
+        if update_fields is not None and cls.get_source_field(user) not in (
+            update_fields
+        ):
+            return
+        instance = cls.from_user(user)
+        if instance is None:
+            cls._default_manager.filter(user=user).delete()
+            return
+        cls._default_manager.update_or_create(
+            user=user, defaults={cls.value_field: getattr(instance, cls.value_field)}
+        )
+
+
+class UsernameSkeleton(UserIdentifierIndex):
+    """
+    The confusable skeleton of a user account's username.
+
+    """
+
+    value_field = "skeleton"
+
+    skeleton = models.CharField(_("skeleton"), max_length=255, db_index=True)
+
+    class Meta:
+        # pylint: disable=too-few-public-methods
+
+        verbose_name = _("username skeleton")
+        verbose_name_plural = _("username skeletons")
+
+    @classmethod
+    def get_source_field(cls, user):
+        """
+        Return the name of the username field of the user account's model.
+
+        """
+        return user.USERNAME_FIELD
+
+    @classmethod
+    def normalize(cls, value):
+        """
+        Return the confusable skeleton of a username, truncated to the
+        length of the indexed field.
+
+        """
+        return validators.confusable_skeleton(value)[: cls.max_length()]
+
+
+class CanonicalEmail(UserIdentifierIndex):
+    """
+    The canonical form of a user account's email address.
+
+    """
+
+    value_field = "email"
+
+    email = models.CharField(
+        _("canonical email address"), max_length=254, db_index=True
+    )
+
+    class Meta:
+        # pylint: disable=too-few-public-methods
+
+        verbose_name = _("canonical email address")
+        verbose_name_plural = _("canonical email addresses")
+
+    @classmethod
+    def get_source_field(cls, user):
+        """
+        Return the name of the email field of the user account's model.
+
+        """
+        return user.get_email_field_name()
+
+    @classmethod
+    def normalize(cls, value):
+        """
+        Return the canonical form of an email address, truncated to
+        the length of the indexed field.
+
+        """
+        return validators.canonical_email(value)[: cls.max_length()]
+
+
+# All identifier indexes, in the order they are maintained.
+INDEX_MODELS = (UsernameSkeleton, CanonicalEmail)
+
+
+class RegistrationPeriod(models.Model):
+    """
+    A period during which registration is open or closed, overriding the
+    ``REGISTRATION_OPEN`` setting.
+
+    Where several periods apply at once, a period for a particular site
+    takes precedence over one for all sites, and otherwise the period
+    which started most recently takes precedence.
+
+    """
+
+    site_id = models.PositiveIntegerField(
+        _("site ID"),
+        null=True,
+        blank=True,
+        help_text=_("Leave blank to apply to all sites."),
+    )
+    is_open = models.BooleanField(_("registration open"))
+    starts_at = models.DateTimeField(
+        _("starts at"),
+        null=True,
+        blank=True,
+        help_text=_("Leave blank to start immediately."),
+    )
+    ends_at = models.DateTimeField(
+        _("ends at"),
+        null=True,
+        blank=True,
+        help_text=_("Leave blank to continue indefinitely."),
+    )
+
+    class Meta:
+        # pylint: disable=too-few-public-methods
+
+        verbose_name = _("registration period")
+        verbose_name_plural = _("registration periods")
+
+    def __str__(self):
+        state = _("open") if self.is_open else _("closed")
+        return f"{state}: {self.starts_at or '-'} to {self.ends_at or '-'}"
+
+    def is_current(self, now):
+        """
+        Return whether the period includes the given time.
+
+        """
+        return (self.starts_at is None or self.starts_at <= now) and (
+            self.ends_at is None or now < self.ends_at
+        )
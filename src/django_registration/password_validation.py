@@ -0,0 +1,57 @@
+"""
+Password validators for use during registration.
+
+These follow the interface of Django's password validators, so they
+can also be listed in the ``AUTH_PASSWORD_VALIDATORS`` setting to apply
+them wherever Django validates passwords.
+
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.utils.translation import gettext as _
+
+from . import datafiles, validators
+
+
+class BreachedPasswordValidator:
+    """
+    Validate that a password does not appear in a locally-stored corpus
+    of passwords exposed in data breaches.
+
+    The corpus is a compiled file of the SHA-1 hashes of breached
+    passwords, which is memory-mapped and binary-searched, so checks
+    make no network requests and take microseconds even with a corpus
+    of many gigabytes.
+
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+
+    def validate(self, password, user=None):  # pylint: disable=unused-argument
+        """
+        Raise ``ValidationError`` if the password appears in the
+        corpus.
+
+        """
+        path = self.path
+        if path is None:
+            path = settings.REGISTRATION_BREACHED_PASSWORDS_FILE
+        corpus = datafiles.get_mapped_file(datafiles.DigestFile, path)
+        # SHA-1 is used only because breach corpora are distributed as SHA-1 hashes;
+        # it is not used to protect anything.
+        digest = hashlib.sha1(password.encode("utf-8")).digest()  # nosec: B303,B324
+        if digest in corpus:
+            raise ValidationError(
+                validators.BREACHED_PASSWORD, code="password_breached"
+            )
+
+    def get_help_text(self):
+        """
+        Return help text describing this validator's requirement.
+
+        """
+        return _("Your password can’t be one that has appeared in a data breach.")
@@ -0,0 +1,92 @@
+"""
+Signal receivers keeping django-registration's precomputed identifier
+indexes, identifier filter and cached username availability in step
+with the user model, and its cached registration schedule in step with
+the database.
+
+"""
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import availability, identifier_filter, schedule
+from .models import INDEX_MODELS, RegistrationPeriod
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def update_identifier_indexes(
+    sender, instance, raw=False, update_fields=None, **kwargs
+):
+    """
+    Store the normalized identifiers of a user account whenever it is
+    saved with possibly-changed identifiers, if the
+    ``REGISTRATION_IDENTIFIER_INDEXES`` setting enables the indexes.
+
+    """
+    # pylint: disable=unused-argument
+    if raw or not getattr(settings, "REGISTRATION_IDENTIFIER_INDEXES", False):
+        return
+    for model in INDEX_MODELS:
+        model.update_for_user(instance, update_fields=update_fields)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def forget_username_availability(sender, instance, using, raw=False, **kwargs):
+    """
+    Forget the cached availability of a user account's username once the
+    transaction saving it commits, if availability is cached.
+
+    """
+    # pylint: disable=unused-argument
+    if (
+        raw
+        or getattr(settings, "REGISTRATION_AVAILABILITY_CACHE_TIMEOUT", None) is None
+    ):
+        return
+    username = instance.get_username()
+    transaction.on_commit(lambda: availability.forget(sender, username), using=using)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def record_filtered_identifiers(sender, instance, using, update_fields=None, **kwargs):
+    """
+    Record a user account's username and email address as taken in the
+    identifier filter once the transaction saving them commits, if a
+    filter is in use.
+
+    """
+    # pylint: disable=unused-argument
+    if getattr(settings, "REGISTRATION_IDENTIFIER_FILTER_FILE", None) is None:
+        return
+    # Accounts loaded from fixtures are recorded too: leaving any out of the filter
+    # would let their identifiers be registered again.
+    fields = {sender.USERNAME_FIELD, sender.get_email_field_name()}
+    if update_fields is not None:
+        fields &= set(update_fields)
+    values = {field_name: getattr(instance, field_name, None) for field_name in fields}
+
+    def record():
+        """
+        Record the saved identifiers as taken.
+
+        """
+        for field_name, value in values.items():
+            if value:
+                identifier_filter.record(sender, field_name, value)
+
+    transaction.on_commit(record, using=using)
+
+
+@receiver(post_save, sender=RegistrationPeriod)
+@receiver(post_delete, sender=RegistrationPeriod)
+def clear_registration_schedule(sender, using, **kwargs):
+    """
+    Clear the cached registration schedule once the transaction changing
+    it commits, so that no process can cache the old schedule after the
+    change.
+
+    """
+    # pylint: disable=unused-argument
+    transaction.on_commit(schedule.clear_cache, using=using)
@@ -0,0 +1,56 @@
+"""
+Lookups of client IP addresses in a compiled blocklist of address
+ranges, such as those distributed by IP-reputation feeds.
+
+IPv4 addresses are stored as IPv4-mapped IPv6 addresses, so a single
+table of 16-byte ranges covers both address families.
+
+"""
+
+import ipaddress
+
+from django.conf import settings
+
+from . import datafiles
+
+ADDRESS_WIDTH = 16
+
+
+def to_ipv6(address):
+    """
+    Return an address as an IPv6 address, mapping IPv4 addresses into
+    the IPv4-mapped IPv6 range.
+
+    """
+    if address.version == 4:
+        return ipaddress.IPv6Address(f"::ffff:{address}")
+    return address
+
+
+def network_range(network):
+    """
+    Return the inclusive range of integers covered by a network, given
+    as a string in CIDR notation or as a single address.
+
+    """
+    network = ipaddress.ip_network(network.strip(), strict=False)
+    first = to_ipv6(network.network_address)
+    return int(first), int(first) + network.num_addresses - 1
+
+
+def is_listed(address, path=None):
+    """
+    Return whether an address is in the blocklist at ``path``, which
+    defaults to the ``REGISTRATION_IP_BLOCKLIST_FILE`` setting. Values
+    which are not IP addresses are never listed.
+
+    """
+    if path is None:
+        path = settings.REGISTRATION_IP_BLOCKLIST_FILE
+    try:
+        address = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return to_ipv6(address).packed in datafiles.get_mapped_file(
+        datafiles.RangeFile, path
+    )
@@ -0,0 +1,106 @@
+"""
+Runtime control of whether registration is open, through scheduled
+``RegistrationPeriod`` records in the database.
+
+Checking the schedule must not cost a query on every request, so the
+periods are cached twice: in each process for a few seconds, and in the
+cache selected by the ``REGISTRATION_CACHE_ALIAS`` setting until they
+change. The shared copy is stored under a generation number, which
+saving or deleting a period increments, so every process picks up the
+change within a few seconds, and at most one query is made per change.
+A process which read the old periods just before the change can only
+store them under the old generation, where nothing reads them again.
+
+"""
+
+import threading
+import time
+
+from django.db.models import F
+from django.utils import timezone
+
+from .cache import get_cache, make_key
+from .models import RegistrationPeriod
+
+# The cache key of the current generation of the periods.
+GENERATION_KEY = make_key("registration_periods", "generation")
+
+# How long, in seconds, each process uses its copy of the periods before checking
+# the shared cache for changes.
+CHECK_INTERVAL = 5.0
+
+# How long, in seconds, the shared cache keeps its copy of the periods.
+CACHE_TIMEOUT = 3600
+
+_lock = threading.Lock()
+_periods = None  # pylint: disable=invalid-name
+_next_check = 0.0  # pylint: disable=invalid-name
+
+
+def get_periods():
+    """
+    Return a list of all registration periods, in increasing order of
+    precedence.
+
+    """
+    # pylint: disable=no-member
+    global _periods, _next_check  # pylint: disable=global-statement
+    now = time.monotonic()
+    if _periods is not None and now < _next_check:
+        return _periods
+    with _lock:
+        if _periods is None or now >= _next_check:
+            cache = get_cache()
+            generation = cache.get(GENERATION_KEY)
+            if generation is None:
+                # A generation lost from the cache restarts from the current time,
+                # so that it does not repeat one used before.
+                cache.add(GENERATION_KEY, time.time_ns(), None)
+                generation = cache.get(GENERATION_KEY)
+            key = make_key("registration_periods", generation)
+            periods = cache.get(key)
+            if periods is None:
+                periods = list(
+                    RegistrationPeriod.objects.order_by(
+                        F("site_id").asc(nulls_first=True),
+                        F("starts_at").asc(nulls_first=True),
+                        "pk",
+                    )
+                )
+                cache.set(key, periods, CACHE_TIMEOUT)
+            _periods = periods
+            _next_check = now + CHECK_INTERVAL
+    return _periods
+
+
+def registration_open(site_id=None, now=None):
+    """
+    Return whether the schedule has registration open on the given site
+    at the given time (by default, now), or ``None`` if no scheduled
+    period applies.
+
+    """
+    if now is None:
+        now = timezone.now()
+    for period in reversed(get_periods()):
+        if period.site_id in (None, site_id) and period.is_current(now):
+            return period.is_open
+    return None
+
+
+def clear_cache():
+    """
+    Discard the cached registration periods, in this process and, by
+    starting a new generation of them, in the shared cache.
+
+    """
+    global _periods  # pylint: disable=global-statement
+    with _lock:
+        _periods = None
+        cache = get_cache()
+        try:
+            cache.incr(GENERATION_KEY)
+        except ValueError:
+            # A generation lost from the cache restarts from the current time, so
+            # that it does not repeat one used before.
+            cache.add(GENERATION_KEY, time.time_ns(), None)
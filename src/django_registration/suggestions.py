@@ -0,0 +1,109 @@
+"""
+Suggestions of free usernames, offered when a requested username is
+taken.
+
+Candidates are generated from the requested username, filtered in
+memory by the string-check validators of the username field, and then
+checked for availability all at once, in a single query (or none, if an
+identifier filter shows them all to be free) comparing them as the
+form's uniqueness check does.
+
+"""
+
+import functools
+import itertools
+import operator
+import secrets
+
+from django.core.exceptions import ValidationError
+from django.db.models import Case, IntegerField, Q, Value, When
+
+from . import identifier_filter, validators
+from .availability import normalize
+
+# How many candidates are generated for each suggestion requested, to allow for
+# candidates which are invalid or taken.
+CANDIDATES_PER_SUGGESTION = 3
+
+
+def generate_candidates(username, number, max_length=None):
+    """
+    Return ``number`` distinct variants of a username: the username
+    followed by a random number, with or without an underscore,
+    truncated if necessary to fit ``max_length``. Shorter numbers come
+    first.
+
+    """
+    candidates = {}
+    attempts = itertools.count()
+    while len(candidates) < number:
+        attempt = next(attempts)
+        separator = "_" if attempt % 2 else ""
+        suffix = f"{separator}{secrets.randbelow(10 ** (1 + attempt // 4))}"
+        base = username
+        if max_length is not None:
+            base = username[: max(0, max_length - len(suffix))]
+        candidates.setdefault(normalize(base + suffix), base + suffix)
+    return list(candidates.values())
+
+
+def suggest_usernames(form_class, username, count):
+    """
+    Return up to ``count`` free usernames based on a username, which
+    pass the string-check validators of the username field of a
+    registration form class, and those of the user model's field.
+
+    """
+    # pylint: disable=protected-access
+    form_class.install_validators()
+    user_model = form_class._meta.model
+    field_name = user_model.USERNAME_FIELD
+    model_field = user_model._meta.get_field(field_name)
+    checks = [
+        *model_field.validators,
+        *(
+            validator
+            for validator in form_class.base_fields[field_name].validators
+            if validators.get_cost(validator) == validators.COST_STRING
+        ),
+    ]
+    candidates = {}
+    for candidate in generate_candidates(
+        username, count * CANDIDATES_PER_SUGGESTION, model_field.max_length
+    ):
+        try:
+            for check in checks:
+                check(candidate)
+        except ValidationError:
+            continue
+        candidates[normalize(candidate)] = candidate
+    unknown = [
+        normalized
+        for normalized, candidate in candidates.items()
+        if identifier_filter.might_be_taken(user_model, field_name, candidate)
+    ]
+    taken = set()
+    if unknown:
+        # Each candidate is compared as CaseInsensitiveUnique compares it, so
+        # that no candidate suggested is then rejected by the form as taken, and
+        # each account found is labelled with the candidate it matched.
+        lookups = [Q(**{f"{field_name}__iexact": normalized}) for normalized in unknown]
+        matched = (
+            user_model._default_manager.filter(functools.reduce(operator.or_, lookups))
+            .annotate(
+                candidate=Case(
+                    *(
+                        When(lookup, then=Value(index))
+                        for index, lookup in enumerate(lookups)
+                    ),
+                    output_field=IntegerField(),
+                )
+            )
+            .values_list("candidate", flat=True)
+        )
+        taken = {unknown[index] for index in matched}
+    return [
+        candidate
+        for normalized, candidate in candidates.items()
+        if normalized not in taken
+    ][:count]
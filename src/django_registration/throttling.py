@@ -0,0 +1,106 @@
+"""
+Cache-backed throttling of registration attempts.
+
+Throttles use a sliding-window counter: each request increments a
+counter for the current fixed window, and the request rate is estimated
+as that count plus the previous window's count weighted by how much of
+the previous window still falls within the sliding window. Counters are
+incremented atomically by the cache, so limits hold across every
+process and server sharing the cache.
+
+"""
+
+import hashlib
+import math
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from .cache import get_cache, increment, make_key
+
+RATE_PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(rate):
+    """
+    Parse a rate such as ``"10/h"`` or ``"100/15m"`` into a tuple of
+    (number of requests, window length in seconds).
+
+    """
+    try:
+        limit, period = rate.split("/")
+        multiplier, unit = period[:-1] or "1", period[-1]
+        return int(limit), int(multiplier) * RATE_PERIODS[unit]
+    except (KeyError, ValueError) as error:
+        raise ImproperlyConfigured(
+            f"Invalid registration throttle rate {rate!r}."
+        ) from error
+
+
+class SlidingWindowThrottle:
+    """
+    Throttle limiting each identifier within a scope to a number of
+    requests per sliding window.
+
+    """
+
+    def __init__(self, scope, rate):
+        self.scope = scope
+        self.limit, self.duration = parse_rate(rate)
+
+    def get_key(self, identifier, window):
+        """
+        Return the cache key of the counter for an identifier and window.
+
+        """
+        digest = hashlib.sha256(identifier.encode("utf-8")).hexdigest()
+        return make_key("throttle", self.scope, self.duration, digest, window)
+
+    def hit(self, identifier, now=None):
+        """
+        Record a request for the identifier. Return ``None`` if it is
+        within the limit, or the number of seconds after which to retry
+        if not.
+
+        """
+        if now is None:
+            now = time.time()
+        window, elapsed = divmod(now, self.duration)
+        current = increment(
+            self.get_key(identifier, int(window)), timeout=self.duration * 2
+        )
+        previous = get_cache().get(self.get_key(identifier, int(window) - 1), 0)
+        estimate = previous * (1 - elapsed / self.duration) + current
+        if estimate <= self.limit:
+            return None
+        return max(1, math.ceil(self.duration - elapsed))
+
+
+def get_throttles():
+    """
+    Return the throttles configured by the ``REGISTRATION_THROTTLE_RATES``
+    setting, keyed by scope.
+
+    """
+    rates = getattr(settings, "REGISTRATION_THROTTLE_RATES", {})
+    return {scope: SlidingWindowThrottle(scope, rate) for scope, rate in rates.items()}
+
+
+def check_throttles(identifiers):
+    """
+    Record a request against every configured throttle whose scope
+    appears in ``identifiers`` (a dict mapping scope to identifier).
+    Return ``None`` if the request is within all the limits, or the
+    number of seconds after which to retry if not.
+
+    """
+    retry_after = None
+    for scope, throttle in get_throttles().items():
+        identifier = identifiers.get(scope)
+        if identifier is None:
+            continue
+        wait = throttle.hit(identifier)
+        if wait is not None:
+            retry_after = max(wait, retry_after or 0)
+    return retry_after
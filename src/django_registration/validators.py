@@ -5,24 +5,41 @@ django-registration's various user-registration form classes.
 """
 
 # pylint: disable=implicit-str-concat
+import functools
 import re
 import unicodedata
 
 from confusable_homoglyphs import confusables
+from django.apps import apps
+from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.core.validators import EmailValidator, RegexValidator
 from django.utils.deconstruct import deconstructible
 from django.utils.translation import gettext_lazy as _
 
+from . import datafiles, identifier_filter
+
+BREACHED_PASSWORD = _(
+    "This password has appeared in a data breach and cannot be used. "
+    "Please choose a different password."
+)
 CONFUSABLE = _("This name cannot be registered. " "Please choose a different name.")
 CONFUSABLE_EMAIL = _(
     "This email address cannot be registered. "
     "Please supply a different email address."
 )
+DISPOSABLE_EMAIL = _(
+    "Registration using disposable email addresses is prohibited. "
+    "Please supply a different email address."
+)
 DUPLICATE_EMAIL = _(
     "This email address is already in use. " "Please supply a different email address."
 )
 DUPLICATE_USERNAME = _("A user with that username already exists.")
+EMAIL_DOMAIN_NOT_ALLOWED = _(
+    "Registration using email addresses from this domain is not permitted. "
+    "Please supply a different email address."
+)
 FREE_EMAIL = _(
     "Registration using free email addresses is prohibited. "
     "Please supply a different email address."
@@ -30,6 +47,16 @@ FREE_EMAIL = _(
 RESERVED_NAME = _("This name is reserved and cannot be registered.")
 TOS_REQUIRED = _("You must agree to the terms to register")
 
+
+# The relative cost of a validator can be declared in its "cost" attribute, and
+# registration forms run their validators in increasing order of cost, skipping the
+# more expensive ones once a cheaper one has failed. Validators without a declared
+# cost are assumed to be pure string checks.
+COST_STRING = 0
+COST_DATASET = 1
+COST_DATABASE = 2
+
+
 # WHATWG HTML5 spec, section 4.10.5.1.5.
 HTML5_EMAIL_RE = (
     r"^[a-zA-Z0-9.!#$%&'*+\/=?^_`{|}~-]"
@@ -207,6 +234,66 @@ DEFAULT_RESERVED_NAMES = (
 )
 
 
+# Domains of common free email providers, for use with DomainPolicyValidator.
+FREE_EMAIL_DOMAINS = [
+    "aim.com",
+    "aol.com",
+    "email.com",
+    "gmail.com",
+    "gmx.com",
+    "gmx.net",
+    "googlemail.com",
+    "hotmail.com",
+    "hushmail.com",
+    "icloud.com",
+    "live.com",
+    "mail.com",
+    "mail.ru",
+    "me.com",
+    "msn.com",
+    "outlook.com",
+    "proton.me",
+    "protonmail.com",
+    "yahoo.com",
+    "yandex.com",
+    "yandex.ru",
+    "zoho.com",
+]
+
+
+# Rules for computing the canonical form of email addresses, keyed by domain. Each
+# rule may contain:
+#
+# * "alias_of": another domain, of which this domain is an alias. Addresses are
+#   canonicalized as if they were in that domain, using that domain's rule.
+#
+# * "ignore_dots": whether "." characters in the local-part are insignificant.
+#
+# * "subaddress_separator": a character beginning an insignificant tag in the
+#   local-part, as in "user+tag@example.com".
+#
+# A rule under the key "*", if present, applies to all domains without a rule of
+# their own.
+DEFAULT_CANONICAL_EMAIL_RULES = {
+    "gmail.com": {"ignore_dots": True, "subaddress_separator": "+"},
+    "googlemail.com": {"alias_of": "gmail.com"},
+    "fastmail.com": {"subaddress_separator": "+"},
+    "hotmail.com": {"subaddress_separator": "+"},
+    "icloud.com": {"subaddress_separator": "+"},
+    "mac.com": {"alias_of": "icloud.com"},
+    "me.com": {"alias_of": "icloud.com"},
+    "outlook.com": {"subaddress_separator": "+"},
+}
+
+
+def get_cost(validator):
+    """
+    Return the declared cost of a validator.
+
+    """
+    return getattr(validator, "cost", COST_STRING)
+
+
 @deconstructible
 class ReservedNameValidator:
     """
@@ -237,6 +324,8 @@ class CaseInsensitiveUnique:
 
     """
 
+    cost = COST_DATABASE
+
     def __init__(self, model, field_name, error_message):
         self.model = model
         self.field_name = field_name
@@ -247,6 +336,8 @@ class CaseInsensitiveUnique:
         if not isinstance(value, str):
             return
         value = unicodedata.normalize("NFKC", value).casefold()
+        if not identifier_filter.might_be_taken(self.model, self.field_name, value):
+            return
         if self.model._default_manager.filter(
             **{f"{self.field_name}__iexact": value}
         ).exists():
@@ -260,6 +351,205 @@ class CaseInsensitiveUnique:
         )
 
 
+class _IdentifierIndexUnique:
+    """
+    Base class for validators which check uniqueness against one of
+    django-registration's stored identifier indexes.
+
+    """
+
+    cost = COST_DATABASE
+
+    # Name of the django_registration model holding the index.
+    index_model_name = None
+
+    def __init__(self, error_message):
+        self.error_message = error_message
+
+    def __call__(self, value):
+        if not isinstance(value, str):
+            return
+        # The model is looked up lazily, so that this module can be imported before
+        # the app registry is ready.
+        index_model = apps.get_model("django_registration", self.index_model_name)
+        if index_model._default_manager.filter(
+            **{index_model.value_field: index_model.normalize(value)}
+        ).exists():
+            raise ValidationError(self.error_message, code="unique")
+
+    def __eq__(self, other):
+        return (
+            self.index_model_name == other.index_model_name
+            and self.error_message == other.error_message
+        )
+
+
+@deconstructible
+class ConfusableSkeletonUnique(_IdentifierIndexUnique):
+    """
+    Validator which disallows usernames visually confusable with the
+    username of an existing account, by comparing confusable skeletons.
+
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    index_model_name = "UsernameSkeleton"
+
+    def __init__(self, error_message=CONFUSABLE):
+        super().__init__(error_message)
+
+
+@deconstructible
+class CanonicalEmailUnique(_IdentifierIndexUnique):
+    """
+    Validator which disallows email addresses whose canonical form is
+    the same as that of an existing account's email address.
+
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    index_model_name = "CanonicalEmail"
+
+    def __init__(self, error_message=DUPLICATE_EMAIL):
+        super().__init__(error_message)
+
+
+# Markers stored in the nodes of a DomainPolicyValidator's suffix trie. They are
+# not strings, so can't collide with any label of a domain being checked, which
+# may be empty or "*".
+_EXACT = object()
+_SUBDOMAINS = object()
+
+
+def _domain_labels(domain):
+    """
+    Split a domain into its labels, most-significant first.
+
+    """
+    return domain.lower().rstrip(".").split(".")[::-1]
+
+
+def _compile_domain_trie(patterns):
+    """
+    Compile a list of domain patterns into a suffix trie of nested
+    dicts, keyed by domain label starting from the top-level domain.
+
+    """
+    trie = {}
+    for pattern in patterns:
+        marker = _EXACT
+        if pattern.startswith("*."):
+            marker = _SUBDOMAINS
+            pattern = pattern[2:]
+        node = trie
+        for label in _domain_labels(pattern):
+            node = node.setdefault(label, {})
+        node[marker] = True
+    return trie
+
+
+def _match_domain_trie(trie, domain):
+    """
+    Return whether a domain matches any pattern in a suffix trie.
+
+    """
+    labels = _domain_labels(domain)
+    node = trie
+    for position, label in enumerate(labels, start=1):
+        node = node.get(label)
+        if node is None:
+            return False
+        if position < len(labels) and _SUBDOMAINS in node:
+            return True
+    return _EXACT in node
+
+
+@deconstructible
+class DomainPolicyValidator:
+    """
+    Validator which allows or denies email addresses based on their
+    domain.
+
+    Domain lists are compiled into a suffix trie when the validator is
+    created, so each check costs a number of dictionary lookups
+    proportional to the number of labels in the domain, regardless of
+    the size of the lists.
+
+    """
+
+    def __init__(
+        self,
+        allow=None,
+        deny=None,
+        allow_message=EMAIL_DOMAIN_NOT_ALLOWED,
+        deny_message=FREE_EMAIL,
+    ):
+        self.allow = allow
+        self.deny = deny
+        self.allow_message = allow_message
+        self.deny_message = deny_message
+        self._allow_trie = _compile_domain_trie(allow) if allow is not None else None
+        self._deny_trie = _compile_domain_trie(deny or [])
+
+    def __call__(self, value):
+        # As in validate_confusables_email(), anything not containing exactly one '@'
+        # is not treated as an addr-spec.
+        if not isinstance(value, str) or value.count("@") != 1:
+            return
+        domain = value.split("@")[1]
+        if self._allow_trie is not None and not _match_domain_trie(
+            self._allow_trie, domain
+        ):
+            raise ValidationError(self.allow_message, code="invalid")
+        if _match_domain_trie(self._deny_trie, domain):
+            raise ValidationError(self.deny_message, code="invalid")
+
+    def __eq__(self, other):
+        return (
+            self.allow == other.allow
+            and self.deny == other.deny
+            and self.allow_message == other.allow_message
+            and self.deny_message == other.deny_message
+        )
+
+
+@deconstructible
+class DisposableEmailValidator:
+    """
+    Validator which disallows email addresses in the domains of
+    disposable email services, or subdomains of them, as listed in a
+    compiled domain-list file.
+
+    """
+
+    cost = COST_DATASET
+
+    def __init__(self, path=None, message=DISPOSABLE_EMAIL):
+        self.path = path
+        self.message = message
+
+    def __call__(self, value):
+        # As in validate_confusables_email(), anything not containing exactly one '@'
+        # is not treated as an addr-spec.
+        if not isinstance(value, str) or value.count("@") != 1:
+            return
+        path = self.path
+        if path is None:
+            path = settings.REGISTRATION_DISPOSABLE_EMAIL_DOMAINS_FILE
+        domains = datafiles.get_mapped_file(datafiles.SortedSetFile, path)
+        labels = value.split("@")[1].lower().rstrip(".").split(".")
+        # Check the domain and each of its parent domains, but not the top-level
+        # domain on its own.
+        for position in range(len(labels) - 1):
+            if ".".join(labels[position:]).encode() in domains:
+                raise ValidationError(self.message, code="invalid")
+
+    def __eq__(self, other):
+        return self.path == other.path and self.message == other.message
+
+
 @deconstructible
 class HTML5EmailValidator(RegexValidator):
     """
@@ -337,3 +627,85 @@ def validate_confusables_email(value):
     local_part, domain = value.split("@")
     if confusables.is_dangerous(local_part) or confusables.is_dangerous(domain):
         raise ValidationError(CONFUSABLE_EMAIL, code="invalid")
+
+
+# Directional formatting marks, which appear around some entries of the confusables
+# data but are not part of the visible glyph.
+_BIDI_MARKS = str.maketrans("", "", "\u200e\u200f")
+
+
+@functools.lru_cache(maxsize=None)
+def _prototype(char):
+    """
+    Return the prototype -- the single representative of a set of visually
+    confusable characters -- for a character.
+
+    """
+    homoglyphs = confusables.confusables_data.get(char)
+    # The confusables data records each mapping in both directions, so a character
+    # which maps to exactly one other is the source of a mapping, and the one it maps
+    # to is its prototype. A character mapping to several others is itself a
+    # prototype.
+    if not homoglyphs or len(homoglyphs) != 1:
+        return char
+    target = homoglyphs[0]["c"].translate(_BIDI_MARKS)
+    reverse = confusables.confusables_data.get(target, [])
+    if (
+        len(reverse) == 1
+        and reverse[0]["c"].translate(_BIDI_MARKS) == char
+        and char < target
+    ):
+        # A pair of characters confusable only with each other; pick one of them
+        # consistently.
+        return char
+    return target
+
+
+def confusable_skeleton(value):
+    """
+    Return the 'skeleton' of a string, as defined by Unicode Technical
+    Standard #39.
+
+    Two strings which are visually confusable with each other have the
+    same skeleton, even when each of them, considered on its own, is
+    written in a single script (for example, "paypal" and "pаypаl"
+    containing Cyrillic "а").
+
+    """
+    value = unicodedata.normalize("NFD", value)
+    return unicodedata.normalize("NFD", "".join(_prototype(char) for char in value))
+
+
+def canonical_email(value, rules=None):
+    """
+    Return the canonical form of an email address: the form shared by
+    all addresses which deliver to the same mailbox, according to the
+    rules for the address's domain.
+
+    If ``rules`` is not supplied, the setting
+    ``REGISTRATION_CANONICAL_EMAIL_RULES`` is used if present, otherwise
+    ``DEFAULT_CANONICAL_EMAIL_RULES``.
+
+    """
+    if rules is None:
+        rules = getattr(
+            settings,
+            "REGISTRATION_CANONICAL_EMAIL_RULES",
+            DEFAULT_CANONICAL_EMAIL_RULES,
+        )
+    value = unicodedata.normalize("NFKC", value).casefold()
+    # As in validate_confusables_email(), anything not containing exactly one '@' is
+    # not treated as an addr-spec.
+    if value.count("@") != 1:
+        return value
+    local_part, domain = value.split("@")
+    rule = rules.get(domain, rules.get("*", {}))
+    if "alias_of" in rule:
+        domain = rule["alias_of"]
+        rule = rules.get(domain, {})
+    separator = rule.get("subaddress_separator")
+    if separator:
+        local_part = local_part.split(separator, 1)[0]
+    if rule.get("ignore_dots"):
+        local_part = local_part.replace(".", "")
+    return f"{local_part}@{domain}"
@@ -3,19 +3,48 @@ Base view classes for all registration workflows.
 
 """
 
+import functools
+import hashlib
+import json
+import time
+
+import django
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.core.exceptions import ImproperlyConfigured
-from django.http import HttpResponseRedirect
+from django.contrib.sites.shortcuts import get_current_site
+from django.core import signing
+from django.core.exceptions import (
+    NON_FIELD_ERRORS,
+    ImproperlyConfigured,
+    ValidationError,
+)
+from django.forms.utils import ErrorList
+from django.http import HttpResponse, HttpResponseRedirect, JsonResponse
+from django.middleware.csrf import get_token
 from django.urls import reverse_lazy
+from django.utils import translation
+from django.utils.cache import patch_cache_control
 from django.utils.decorators import method_decorator
 from django.utils.encoding import force_str
+from django.utils.translation import gettext_lazy as _
 from django.views.decorators.debug import sensitive_post_parameters
-from django.views.generic.base import TemplateView
+from django.views.generic.base import TemplateView, View
 from django.views.generic.edit import FormView
 
-from . import signals
-from .exceptions import ActivationError
+from . import (
+    admission,
+    availability,
+    challenges,
+    idempotency,
+    reputation,
+    schedule,
+    signals,
+    suggestions,
+    throttling,
+    validators,
+)
+from .cache import get_cache, make_key
+from .exceptions import ActivationError, RegistrationBusy
 from .forms import RegistrationForm
 
 USER_MODEL_MISMATCH = """
@@ -32,27 +61,307 @@ models for more details.
 """
 
 
+FORM_TOKEN_SALT = "django_registration.views.form_token"
+
+INVALID_ACTIVATION_KEY = _("The request must include an activation key.")
+INVALID_JSON = _("The request body must be a JSON object.")
+REGISTRATION_CLOSED = _("Registration is closed.")
+SUBMISSION_IN_PROGRESS = _(
+    "This registration is already being processed. Please try again shortly."
+)
+SUBMISSION_REJECTED = _(
+    "Your registration could not be processed. Please reload the page and try again."
+)
+THROTTLED = _("Too many registration attempts. Please try again later.")
+UNKNOWN_FIELD = _("The form has no field with that name.")
+
+
+@functools.lru_cache(maxsize=None)
+def form_matches_user_model(form_class, user_model_setting):
+    """
+    Return whether the model of a form class is the user model named by
+    the given value of the ``AUTH_USER_MODEL`` setting.
+
+    """
+    # pylint: disable=protected-access,unused-argument
+    return form_class._meta.model._meta.label == get_user_model()._meta.label
+
+
+def allows_registration(request):
+    """
+    Return whether the registration schedule (or, when no scheduled
+    period applies, the ``REGISTRATION_OPEN`` setting) allows
+    registration, and the admission controller admits the request.
+
+    """
+    is_open = schedule.registration_open(getattr(get_current_site(request), "pk", None))
+    if is_open is None:
+        is_open = getattr(settings, "REGISTRATION_OPEN", True)
+    if not is_open:
+        return False
+    return admission.get_admission_controller().admit(request)
+
+
 class RegistrationView(FormView):
     """
     Base class for user registration views.
 
     """
 
+    # pylint: disable=too-many-public-methods
+
     disallowed_url = reverse_lazy("django_registration_disallowed")
     form_class = RegistrationForm
+    form_token_max_age = 24 * 60 * 60
+    form_token_min_age = None
+    honeypot_field = None
+    idempotency_key = None
+    proof_of_work_baseline_rate = 60
+    proof_of_work_difficulty = None
+    proof_of_work_max_difficulty = 24
     success_url = None
     template_name = "django_registration/registration_form.html"
+    username_suggestions = 0
 
     @method_decorator(sensitive_post_parameters())
     def dispatch(self, *args, **kwargs):
         """
-        Check that user signup is allowed before even bothering to
-        dispatch or do other processing.
+        Check that user signup is allowed and, for a submission, replay
+        the outcome of an earlier submission with the same idempotency
+        key or check the submission, before even bothering to dispatch
+        or do other processing.
 
         """
         if not self.registration_allowed():
-            return HttpResponseRedirect(force_str(self.disallowed_url))
-        return super().dispatch(*args, **kwargs)
+            return self.registration_disallowed()
+        if self.request.method != "POST":
+            return super().dispatch(*args, **kwargs)
+        key = self.get_idempotency_key()
+        if key is None:
+            return self.check_submission() or super().dispatch(*args, **kwargs)
+        if not idempotency.begin(key):
+            # A submission with this key has completed or is in progress. One in
+            # progress is not waited for, since that would hold a worker before
+            # any check was made.
+            url = idempotency.get_outcome(key)
+            if url is not None:
+                return self.registration_completed(url)
+            if not idempotency.begin(key):
+                return self.busy(
+                    RegistrationBusy(SUBMISSION_IN_PROGRESS, code="in_progress")
+                )
+        self.idempotency_key = key
+        try:
+            return self.check_submission() or super().dispatch(*args, **kwargs)
+        finally:
+            if self.idempotency_key is not None:
+                idempotency.abandon(key)
+
+    def check_submission(self):
+        """
+        Check that a submission is not from a blocklisted IP address,
+        solves its proof-of-work challenge and is not throttled. Return
+        the response rejecting it if not, or ``None`` if it passes.
+
+        """
+        if getattr(
+            settings, "REGISTRATION_IP_BLOCKLIST_FILE", None
+        ) and reputation.is_listed(self.get_client_ip()):
+            return self.submission_rejected()
+        if self.proof_of_work_difficulty is not None:
+            if not challenges.verify_solution(
+                self.get_submitted_data().get("proof_of_work_challenge", ""),
+                self.get_submitted_data().get("proof_of_work_solution", ""),
+            ):
+                return self.submission_rejected()
+            challenges.record_submission()
+        retry_after = throttling.check_throttles(self.get_throttle_identifiers())
+        if retry_after is not None:
+            return self.throttled(retry_after)
+        return None
+
+    def get_submitted_data(self):
+        """
+        Return the submitted registration data.
+
+        """
+        return self.request.POST
+
+    def get_idempotency_key(self):
+        """
+        Return the idempotency key submitted with the form, or ``None``
+        if there is no usable key.
+
+        """
+        key = self.get_submitted_data().get("idempotency_key", "")
+        if not key or len(key) > idempotency.MAX_KEY_LENGTH:
+            return None
+        return key
+
+    def post(self, request, *args, **kwargs):
+        """
+        Reject submissions failing the honeypot and form-timing checks
+        before even binding the form.
+
+        """
+        if not self.submission_allowed():
+            return self.submission_rejected()
+        return super().post(request, *args, **kwargs)
+
+    def get(self, request, *args, **kwargs):
+        """
+        Render the page with the unbound registration form and, if the
+        ``REGISTRATION_PAGE_CACHE_TIMEOUT`` setting is configured (and
+        Django is 4.0 or later), a cached rendering of the form as
+        ``form_html``.
+
+        Only the rendering of the form is cached, once per URL, query
+        string, form prefix and language: the rest of the page, including
+        the CSRF token, the values from get_submission_context() and
+        anything from context processors, is rendered for each request.
+
+        """
+        timeout = getattr(settings, "REGISTRATION_PAGE_CACHE_TIMEOUT", None)
+        if timeout is None or django.VERSION < (4, 0):
+            return super().get(request, *args, **kwargs)
+        form = self.get_form()
+        cache = get_cache()
+        key = make_key(
+            "form",
+            hashlib.sha256(request.build_absolute_uri().encode("utf-8")).hexdigest(),
+            self.get_prefix() or "",
+            translation.get_language(),
+        )
+        form_html = cache.get(key)
+        if form_html is None:
+            form_html = form.render()
+            cache.set(key, form_html, timeout)
+        return self.render_to_response(
+            self.get_context_data(form=form, form_html=form_html, **kwargs)
+        )
+
+    def get_context_data(self, **kwargs):
+        """
+        Add the honeypot field name, if that check is enabled, and the
+        values from get_submission_context() to the template context.
+
+        """
+        context = super().get_context_data(**kwargs)
+        if self.honeypot_field is not None:
+            context["honeypot_field"] = self.honeypot_field
+        context.update(self.get_submission_context())
+        return context
+
+    def get_submission_context(self):
+        """
+        Return the template context values which differ for each
+        rendering of the form: a new idempotency key, along with a
+        freshly-issued form token and a proof-of-work challenge, if those
+        checks are enabled.
+
+        """
+        context = {"idempotency_key": idempotency.new_key()}
+        if self.form_token_min_age is not None:
+            context["registration_token"] = self.get_form_token()
+        if self.proof_of_work_difficulty is not None:
+            difficulty = challenges.get_difficulty(
+                self.proof_of_work_difficulty,
+                self.proof_of_work_max_difficulty,
+                self.proof_of_work_baseline_rate,
+            )
+            context["proof_of_work_challenge"] = challenges.issue_challenge(difficulty)
+            context["proof_of_work_difficulty"] = difficulty
+        return context
+
+    def get_form_token(self):
+        """
+        Return a signed token recording the time at which the form was
+        rendered.
+
+        """
+        return signing.Signer(salt=FORM_TOKEN_SALT).sign(str(int(time.time())))
+
+    def submission_allowed(self):
+        """
+        Return whether a submission passes the honeypot check (the
+        honeypot field, if enabled, must be empty) and the form-timing
+        check (the form token, if enabled, must have been issued at least
+        ``form_token_min_age`` and at most ``form_token_max_age`` seconds
+        ago).
+
+        """
+        data = self.get_submitted_data()
+        if self.honeypot_field is not None and data.get(self.honeypot_field):
+            return False
+        if self.form_token_min_age is not None:
+            try:
+                issued = int(
+                    signing.Signer(salt=FORM_TOKEN_SALT).unsign(
+                        data.get("registration_token", "")
+                    )
+                )
+            except (signing.BadSignature, ValueError):
+                return False
+            age = time.time() - issued
+            if not self.form_token_min_age <= age <= self.form_token_max_age:
+                return False
+        return True
+
+    def submission_rejected(self):
+        """
+        Return the response to a submission failing the honeypot,
+        form-timing or proof-of-work check.
+
+        """
+        return HttpResponse(
+            SUBMISSION_REJECTED, content_type="text/plain; charset=utf-8", status=400
+        )
+
+    def get_client_ip(self):
+        """
+        Return the IP address of the client making the request.
+
+        """
+        return self.request.META.get("REMOTE_ADDR")
+
+    def get_throttle_identifiers(self):
+        """
+        Return a dict mapping each throttle scope to the value
+        identifying this request within that scope.
+
+        """
+        identifiers = {"global": "", "ip": self.get_client_ip()}
+        email = self.get_submitted_data().get(
+            get_user_model().get_email_field_name(), ""
+        )
+        if email.count("@") == 1:
+            identifiers["email_domain"] = email.split("@")[1].lower()
+        return identifiers
+
+    def throttled(self, retry_after):
+        """
+        Return the response to a submission rejected by throttling.
+
+        """
+        response = HttpResponse(
+            THROTTLED, content_type="text/plain; charset=utf-8", status=429
+        )
+        response["Retry-After"] = str(retry_after)
+        return response
+
+    def busy(self, error):
+        """
+        Return the response to a registration turned away because too
+        many others were in progress.
+
+        """
+        response = HttpResponse(
+            error.message,
+            content_type="text/plain; charset=utf-8",
+            status=503,
+        )
+        response["Retry-After"] = "1"
+        return response
 
     def get_form(self, form_class=None):
         """
@@ -66,21 +375,21 @@ class RegistrationView(FormView):
         Most often this will be the case because Django has been
         configured to use a custom user model, but the developer has
         forgotten to also configure an appropriate custom registration
-        form to match it.
+        form to match it. The comparison is made once per form class and
+        user model, and routed views are also checked by the system
+        check framework.
 
         """
         # pylint: disable=protected-access
         if form_class is None:
             form_class = self.get_form_class()
-        form_model = form_class._meta.model
-        user_model = get_user_model()
-        if form_model._meta.label != user_model._meta.label:
+        if not form_matches_user_model(form_class, settings.AUTH_USER_MODEL):
             raise ImproperlyConfigured(
                 USER_MODEL_MISMATCH.format(
                     view=self.__class__,
                     form=form_class,
-                    form_model=form_model,
-                    user_model=user_model,
+                    form_model=form_class._meta.model,
+                    user_model=get_user_model(),
                 )
             )
         return form_class(**self.get_form_kwargs())
@@ -100,16 +409,85 @@ class RegistrationView(FormView):
         """
         After successful form processing, redirect to the success URL.
 
+        The time taken to register the account, and whether doing so
+        failed, are reported to the admission controller, and the
+        success URL is stored as the outcome of the submission's
+        idempotency key.
+
+        """
+        controller = admission.get_admission_controller()
+        start = time.monotonic()
+        try:
+            user = self.register(form)
+        except RegistrationBusy as exc:
+            return self.busy(exc)
+        except Exception:
+            controller.record(time.monotonic() - start, failed=True)
+            raise
+        controller.record(time.monotonic() - start)
+        url = force_str(self.get_success_url(user))
+        if self.idempotency_key is not None:
+            idempotency.complete(self.idempotency_key, url)
+            self.idempotency_key = None
+        return self.registration_completed(url)
+
+    def form_invalid(self, form):
+        """
+        Render the form with its errors and, if the requested username is
+        taken, suggestions of free usernames.
+
+        """
+        return self.render_to_response(
+            self.get_context_data(
+                form=form, username_suggestions=self.get_username_suggestions(form)
+            )
+        )
+
+    def get_username_suggestions(self, form):
+        """
+        Return up to ``username_suggestions`` free usernames based on the
+        requested username, if the form rejected it as taken, or an
+        empty list.
+
         """
-        return HttpResponseRedirect(self.get_success_url(self.register(form)))
+        # pylint: disable=protected-access
+        field_name = form._meta.model.USERNAME_FIELD
+        if not self.username_suggestions or not form.has_error(
+            field_name, code="unique"
+        ):
+            return []
+        return suggestions.suggest_usernames(
+            type(form), form[field_name].value(), self.username_suggestions
+        )
 
     def registration_allowed(self):
         """
         Override this to enable/disable user registration, either
         globally or on a per-request basis.
 
+        By default, registration is allowed if the registration schedule
+        (or, when no scheduled period applies, the ``REGISTRATION_OPEN``
+        setting) allows it and the admission controller admits the
+        request.
+
+        """
+        return allows_registration(self.request)
+
+    def registration_completed(self, url):
+        """
+        Return the response to a completed registration, redirecting to
+        the success URL.
+
+        """
+        return HttpResponseRedirect(url)
+
+    def registration_disallowed(self):
         """
-        return getattr(settings, "REGISTRATION_OPEN", True)
+        Return the response to a request made while registration is not
+        allowed, redirecting to ``disallowed_url``.
+
+        """
+        return HttpResponseRedirect(force_str(self.disallowed_url))
 
     def register(self, form):
         """
@@ -126,6 +504,9 @@ class ActivationView(TemplateView):
 
     """
 
+    activate_on_post = False
+    confirm_max_age = 60 * 60
+    confirm_template_name = "django_registration/activation_confirm.html"
     success_url = None
     template_name = "django_registration/activation_failed.html"
 
@@ -137,33 +518,406 @@ class ActivationView(TemplateView):
         return force_str(self.success_url)
 
     def get(self, *args, **kwargs):
+        """
+        Activate the account or, if activation happens on POST, render
+        the page asking the user to confirm activation.
+
+        """
+        if self.activate_on_post:
+            return self.confirm(*args, **kwargs)
+        return self.complete_activation(*args, **kwargs)
+
+    def post(self, *args, **kwargs):
+        """
+        Activate the account, if activation happens on POST.
+
+        """
+        if not self.activate_on_post:
+            return self.http_method_not_allowed(*args, **kwargs)
+        return self.complete_activation(*args, **kwargs)
+
+    def confirm(self, *args, **kwargs):
+        """
+        Render the page asking the user to confirm activation, after
+        checking the activation with check_activation(), which does not
+        touch the database. HEAD requests are handled the same way.
+
+        """
+        try:
+            self.check_activation(*args, **kwargs)
+        except ActivationError as exc:
+            return self.activation_failed(exc)
+        response = self.response_class(
+            request=self.request,
+            template=[self.confirm_template_name],
+            context=self.get_context_data(**kwargs),
+            using=self.template_engine,
+        )
+        patch_cache_control(response, private=True, max_age=self.confirm_max_age)
+        return response
+
+    def complete_activation(self, *args, **kwargs):
         """
         The base activation logic; subclasses should leave this method
         alone and implement activate(), which is called from this
         method.
 
         """
-        extra_context = {}
         try:
             activated_user = self.activate(*args, **kwargs)
         except ActivationError as exc:
-            extra_context["activation_error"] = {
-                "message": exc.message,
-                "code": exc.code,
-                "params": exc.params,
-            }
-        else:
-            signals.user_activated.send(
-                sender=self.__class__, user=activated_user, request=self.request
-            )
-            return HttpResponseRedirect(force_str(self.get_success_url(activated_user)))
+            return self.activation_failed(exc)
+        signals.user_activated.send(
+            sender=self.__class__, user=activated_user, request=self.request
+        )
+        return self.activation_completed(activated_user)
+
+    def activation_completed(self, user):
+        """
+        Return the response to a successful activation, redirecting to
+        the success URL.
+
+        """
+        return HttpResponseRedirect(force_str(self.get_success_url(user)))
+
+    def activation_failed(self, error):
+        """
+        Return the response to a failed activation, rendering the
+        template with details of the error.
+
+        """
         context_data = self.get_context_data()
-        context_data.update(extra_context)
+        context_data["activation_error"] = {
+            "message": error.message,
+            "code": error.code,
+            "params": error.params,
+        }
         return self.render_to_response(context_data)
 
+    def check_activation(self, *args, **kwargs):
+        """
+        Implement any checks of an activation which can be made without
+        touching the database here, raising ``ActivationError`` if one
+        fails. The default implementation makes no checks.
+
+        """
+
     def activate(self, *args, **kwargs):
         """
         Implement account-activation logic here.
 
         """
         raise NotImplementedError
+
+
+class RegistrationLookupView(View):
+    """
+    Base class for views answering questions about a registration being
+    filled in, such as whether a username is available.
+
+    Like RegistrationView, these answer only while registration is
+    allowed, and not to IP addresses in the blocklist. Each client IP
+    address is throttled under the ``lookup`` scope of the
+    ``REGISTRATION_THROTTLE_RATES`` setting, so that the answers cannot
+    be harvested freely.
+
+    """
+
+    form_class = RegistrationForm
+
+    def dispatch(self, request, *args, **kwargs):
+        """
+        Check that registration is allowed and the request is neither
+        from a blocklisted IP address nor throttled, before dispatching.
+
+        """
+        if not self.registration_allowed():
+            return json_error(REGISTRATION_CLOSED, "registration_closed", 403)
+        if getattr(
+            settings, "REGISTRATION_IP_BLOCKLIST_FILE", None
+        ) and reputation.is_listed(self.get_client_ip()):
+            return json_error(SUBMISSION_REJECTED, "rejected", 400)
+        retry_after = throttling.check_throttles({"lookup": self.get_client_ip()})
+        if retry_after is not None:
+            response = json_error(THROTTLED, "throttled", 429)
+            response["Retry-After"] = str(retry_after)
+            return response
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_client_ip(self):
+        """
+        Return the IP address of the client making the request.
+
+        """
+        return self.request.META.get("REMOTE_ADDR")
+
+    def registration_allowed(self):
+        """
+        Return whether registration is allowed, as by
+        RegistrationView.registration_allowed().
+
+        """
+        return allows_registration(self.request)
+
+
+class UsernameAvailabilityView(RegistrationLookupView):
+    """
+    Report whether the username in the ``username`` query parameter is
+    available, as JSON, with suggestions of free usernames if it is
+    taken and ``username_suggestions`` is set.
+
+    The username is checked with the validators of the form class's
+    username field which are pure string checks, in memory, and only
+    if it passes those is whether it is taken looked up, through a
+    short-lived cache.
+
+    """
+
+    http_method_names = ["get", "head", "options"]
+    username_suggestions = 0
+
+    def get(self, request, *args, **kwargs):  # pylint: disable=unused-argument
+        """
+        Return whether the username is available, with any errors.
+
+        """
+        # pylint: disable=protected-access,no-member
+        self.form_class.install_validators()
+        user_model = self.form_class._meta.model
+        field = self.form_class.base_fields[user_model.USERNAME_FIELD]
+        errors = ErrorList()
+        suggested = []
+        try:
+            value = field.to_python(request.GET.get("username", ""))
+            field.validate(value)
+            for validator in field.validators:
+                if validators.get_cost(validator) == validators.COST_STRING:
+                    validator(value)
+        except ValidationError as exc:
+            errors.extend(exc.error_list)
+        else:
+            if availability.is_taken(user_model, value):
+                errors.append(
+                    ValidationError(validators.DUPLICATE_USERNAME, code="unique")
+                )
+                if self.username_suggestions:
+                    suggested = suggestions.suggest_usernames(
+                        self.form_class, value, self.username_suggestions
+                    )
+        data = {"available": not errors, "errors": errors.get_json_data()}
+        if suggested:
+            data["suggestions"] = suggested
+        return JsonResponse(data)
+
+
+class FieldValidationView(RegistrationLookupView):
+    """
+    Validate a single field of the registration form, for feedback as
+    the form is filled in, and report its errors as JSON.
+
+    The submission, form-encoded or a JSON object, names the field in
+    ``field`` and gives its value under the field's own name. Only the
+    field's own validation runs, so checking the email address, say,
+    costs neither password validation nor a username uniqueness query.
+
+    """
+
+    http_method_names = ["post", "options"]
+
+    def post(self, request, *args, **kwargs):  # pylint: disable=unused-argument
+        """
+        Return whether the named field is valid, with any errors.
+
+        """
+        if request.content_type == "application/json":
+            data = parse_json_object(request)
+            if data is None:
+                return json_error(INVALID_JSON, "invalid_json", 400)
+        else:
+            data = request.POST
+        form = self.form_class(data=data)
+        name = data.get("field")
+        if name not in form.fields:
+            return json_error(UNKNOWN_FIELD, "unknown_field", 400)
+        errors = form.validate_field(name)
+        return JsonResponse({"valid": not errors, "errors": errors.get_json_data()})
+
+
+def parse_json_object(request):
+    """
+    Parse the body of a request as a JSON object, returning a dict of
+    its values as strings in the form Django's forms expect, or ``None``
+    if the body is not a JSON object.
+
+    Numbers are converted to strings and booleans to ``"true"`` or
+    ``"false"``; values which are null, arrays or objects are dropped.
+
+    """
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    values = {}
+    for name, value in data.items():
+        if isinstance(value, bool):
+            values[name] = "true" if value else "false"
+        elif isinstance(value, (str, int, float)):
+            values[name] = str(value)
+    return values
+
+
+def json_error(message, code, status, params=None):
+    """
+    Return a JSON response describing a single error which does not
+    belong to a particular field, in the format of a form's
+    ``errors.get_json_data()``.
+
+    """
+    error = {"message": str(message), "code": code}
+    if params:
+        error["params"] = params
+    return JsonResponse({"errors": {NON_FIELD_ERRORS: [error]}}, status=status)
+
+
+class JSONRegistrationMixin:
+    """
+    Mixin for a registration view, accepting the submission as a JSON
+    object and responding with compact JSON instead of rendering
+    templates or redirecting.
+
+    """
+
+    submitted_data = None
+
+    def dispatch(self, request, *args, **kwargs):
+        """
+        Parse the submitted JSON object before any other processing.
+
+        """
+        if request.method == "POST":
+            self.submitted_data = parse_json_object(request)
+            if self.submitted_data is None:
+                return json_error(INVALID_JSON, "invalid_json", 400)
+        return super().dispatch(request, *args, **kwargs)
+
+    def get(self, request, *args, **kwargs):  # pylint: disable=unused-argument
+        """
+        Return the values to include in a submission: a CSRF token, and
+        the values from get_submission_context().
+
+        """
+        return JsonResponse(
+            {"csrf_token": get_token(request), **self.get_submission_context()}
+        )
+
+    def get_submitted_data(self):
+        """
+        Return the submitted JSON object.
+
+        """
+        return self.submitted_data
+
+    def get_form_kwargs(self):
+        """
+        Bind the form to the submitted JSON object.
+
+        """
+        kwargs = super().get_form_kwargs()
+        if self.submitted_data is not None:
+            kwargs["data"] = self.submitted_data
+        return kwargs
+
+    def form_invalid(self, form):
+        """
+        Return the form's errors and any suggestions of free usernames.
+
+        """
+        data = {"errors": form.errors.get_json_data()}
+        username_suggestions = self.get_username_suggestions(form)
+        if username_suggestions:
+            data["username_suggestions"] = username_suggestions
+        return JsonResponse(data, status=400)
+
+    def registration_completed(self, url):
+        """
+        Return the success URL, with HTTP status 201.
+
+        """
+        return JsonResponse({"success_url": url}, status=201)
+
+    def registration_disallowed(self):
+        """
+        Return an error with code ``"registration_closed"``.
+
+        """
+        return json_error(REGISTRATION_CLOSED, "registration_closed", 403)
+
+    def submission_rejected(self):
+        """
+        Return an error with code ``"rejected"``.
+
+        """
+        return json_error(SUBMISSION_REJECTED, "rejected", 400)
+
+    def throttled(self, retry_after):
+        """
+        Return an error with code ``"throttled"`` and a ``Retry-After``
+        header.
+
+        """
+        response = json_error(THROTTLED, "throttled", 429)
+        response["Retry-After"] = str(retry_after)
+        return response
+
+    def busy(self, error):
+        """
+        Return the error explaining why the registration was turned
+        away, with a ``Retry-After`` header.
+
+        """
+        response = json_error(error.message, error.code, 503)
+        response["Retry-After"] = "1"
+        return response
+
+
+class JSONActivationMixin:
+    """
+    Mixin for an activation view, activating on a POST whose body is a
+    JSON object giving the activation key, if the URL does not contain
+    it, and responding with compact JSON instead of rendering templates
+    or redirecting.
+
+    """
+
+    http_method_names = ["post", "options"]
+
+    def post(self, request, *args, **kwargs):
+        """
+        Activate the account.
+
+        """
+        data = parse_json_object(request)
+        if data is None:
+            return json_error(INVALID_JSON, "invalid_json", 400)
+        activation_key = kwargs.get("activation_key", data.get("activation_key"))
+        if not isinstance(activation_key, str) or not activation_key:
+            return json_error(INVALID_ACTIVATION_KEY, "invalid_key", 400)
+        return self.complete_activation(
+            *args, **{**kwargs, "activation_key": activation_key}
+        )
+
+    def activation_completed(self, user):
+        """
+        Return the success URL.
+
+        """
+        return JsonResponse({"success_url": force_str(self.get_success_url(user))})
+
+    def activation_failed(self, error):
+        """
+        Return the activation error, with its code and parameters.
+
+        """
+        return json_error(error.message, error.code, 400, error.params)
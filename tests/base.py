@@ -13,10 +13,21 @@ from django.http import HttpRequest
 from django.test import TestCase, modify_settings, override_settings
 from django.urls import reverse
 
-from django_registration import signals
+from django_registration import schedule, signals
+from django_registration.cache import get_cache
 from django_registration.forms import RegistrationForm
 
 
+def clear_cache():
+    """
+    Clear the cache used by django-registration, along with this
+    process's copy of the registration schedule read from it.
+
+    """
+    get_cache().clear()
+    schedule.clear_cache()
+
+
 class _AssertSignalSentContext:
     """
     Context manager for asserting a signal was sent.
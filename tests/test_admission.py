@@ -0,0 +1,245 @@
+"""
+Tests for admission control of registration.
+
+"""
+
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+
+from django_registration import admission
+from django_registration.backends.activation.views import RegistrationView
+
+from .base import RegistrationTestCase, clear_cache
+
+QUEUE = []
+
+
+def queue_depth():
+    """
+    Return the length of the test queue.
+
+    """
+    return len(QUEUE)
+
+
+class LoadSheddingControllerTests(RegistrationTestCase):
+    """
+    Test the load-shedding admission controller.
+
+    """
+
+    def setUp(self):
+        """
+        Start each test with no recorded registrations, an empty queue and a
+        request to admit.
+
+        """
+        super().setUp()
+        clear_cache()
+        QUEUE.clear()
+        self.request = RequestFactory().get("/")
+
+    def test_default_controller(self):
+        """
+        Without configuration, every request is admitted.
+
+        """
+        # pylint: disable=unidiomatic-typecheck
+        controller = admission.get_admission_controller()
+        assert type(controller) is admission.AdmissionController
+        controller.record(100.0, failed=True)
+        assert controller.admit(self.request)
+
+    def test_queue_depth(self):
+        """
+        Registration closes when the queue grows beyond its threshold, and only
+        reopens when it has shrunk below the lower threshold.
+
+        """
+        controller = admission.LoadSheddingController(
+            queue_depth="tests.test_admission.queue_depth",
+            max_queue_depth=(10, 5),
+            check_interval=0,
+            probes=0,
+        )
+        for length, admitted in ((10, True), (11, False), (6, False), (4, True)):
+            QUEUE[:] = [None] * length
+            assert controller.admit(self.request) is admitted
+
+    def test_check_interval(self):
+        """
+        The decision is only re-evaluated once per check interval.
+
+        """
+        controller = admission.LoadSheddingController(
+            queue_depth=queue_depth, max_queue_depth=(10, 5)
+        )
+        assert controller.admit(self.request)
+        QUEUE[:] = [None] * 20
+        assert controller.admit(self.request)
+
+    def test_latency_and_error_rate(self):
+        """
+        Registration closes when signups are slow or failing, once enough have been
+        recorded to judge, and stays closed when they are no longer being recorded,
+        until those recorded show that they have recovered.
+
+        """
+        controller = admission.LoadSheddingController(
+            max_latency=(2.0, 0.5),
+            max_error_rate=(0.5, 0.1),
+            min_samples=4,
+            check_interval=0,
+            probes=0,
+        )
+        with mock.patch.object(admission.time, "time", return_value=1000.0) as now:
+            for _ in range(3):
+                controller.record(5.0)
+            assert controller.admit(self.request)
+            controller.record(5.0)
+            assert controller.get_signals()["latency"] == 5.0
+            assert not controller.admit(self.request)
+
+            # Two windows later, nothing has been recorded, so the last latency
+            # measured still applies.
+            now.return_value += 120
+            assert controller.get_signals()["latency"] is None
+            assert not controller.admit(self.request)
+
+            # Latency between the thresholds keeps registration closed.
+            for _ in range(4):
+                controller.record(1.0)
+            assert not controller.admit(self.request)
+
+            now.return_value += 120
+            for _ in range(4):
+                controller.record(0.1)
+            assert controller.admit(self.request)
+
+            for failed in (True, True, True, False):
+                controller.record(0.1, failed=failed)
+            assert controller.get_signals()["error_rate"] == 0.375
+            assert controller.admit(self.request)
+            now.return_value += 120
+            for failed in (True, True, True, False):
+                controller.record(0.1, failed=failed)
+            assert controller.get_signals()["error_rate"] == 0.75
+            assert not controller.admit(self.request)
+
+    def test_probes(self):
+        """
+        While registration is closed, a few clients in each window are admitted,
+        and remain admitted, so that their registrations can show recovery.
+
+        """
+        controller = admission.LoadSheddingController(
+            max_latency=(2.0, 0.5), min_samples=2, check_interval=0
+        )
+        clients = [
+            RequestFactory().get("/", REMOTE_ADDR=f"10.0.0.{number}")
+            for number in range(4)
+        ]
+        with mock.patch.object(admission.time, "time", return_value=1000.0) as now:
+            controller.record(5.0)
+            controller.record(5.0)
+            assert [controller.admit(client) for client in clients] == [
+                True,
+                True,
+                False,
+                False,
+            ]
+            assert controller.admit(clients[0])
+
+            # The probes' registrations are slow, so registration stays closed,
+            # and only the probes are admitted until the next window.
+            controller.record(3.0)
+            controller.record(3.0)
+            assert not controller.admit(clients[3])
+            assert controller.admit(clients[1])
+            now.return_value += 60
+            assert controller.admit(clients[3])
+
+            now.return_value += 120
+            controller.record(0.1)
+            controller.record(0.1)
+            assert all(controller.admit(client) for client in clients)
+
+    def test_shared_decision(self):
+        """
+        A decision to close registration is shared between processes.
+
+        """
+        options = {
+            "max_latency": (2.0, 0.5),
+            "min_samples": 1,
+            "check_interval": 0,
+            "probes": 0,
+        }
+        controller = admission.LoadSheddingController(**options)
+        controller.record(1.0)
+        assert controller.admit(self.request)
+        controller.record(10.0)
+        assert not controller.admit(self.request)
+        controller.record(0.1)
+        assert not admission.LoadSheddingController(**options).admit(self.request)
+
+
+@override_settings(
+    REGISTRATION_ADMISSION_CONTROLLER={
+        "BACKEND": "django_registration.admission.LoadSheddingController",
+        "OPTIONS": {
+            "max_error_rate": (0.5, 0.1),
+            "min_samples": 1,
+            "check_interval": 0,
+            "probes": 0,
+        },
+    }
+)
+class AdmissionViewTests(RegistrationTestCase):
+    """
+    Test admission control in the registration view.
+
+    """
+
+    def setUp(self):
+        """
+        Start each test with registration open and nothing recorded.
+
+        """
+        super().setUp()
+        clear_cache()
+
+    def test_registration_closed(self):
+        """
+        Failing registrations close registration, redirecting to the disallowed
+        page.
+
+        """
+        with mock.patch.object(
+            RegistrationView, "register", side_effect=RuntimeError
+        ), self.assertRaises(RuntimeError):
+            self.client.post(
+                reverse("django_registration_register"), data=self.valid_data
+            )
+        resp = self.client.get(reverse("django_registration_register"))
+        self.assertRedirects(resp, reverse("django_registration_disallowed"))
+
+    def test_registration_open(self):
+        """
+        Successful registrations keep registration open.
+
+        """
+        resp = self.client.post(
+            reverse("django_registration_register"), data=self.valid_data
+        )
+        assert resp.status_code == 302
+        assert (
+            get_user_model()
+            .objects.filter(username=self.valid_data[get_user_model().USERNAME_FIELD])
+            .exists()
+        )
+        resp = self.client.get(reverse("django_registration_register"))
+        assert resp.status_code == 200
@@ -0,0 +1,166 @@
+"""
+Tests for the username availability endpoint.
+
+"""
+
+import pathlib
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+
+from django_registration import availability, datafiles, reputation, schedule
+
+from .base import RegistrationTestCase, clear_cache
+
+
+class UsernameAvailabilityTests(RegistrationTestCase):
+    """
+    Test the username availability endpoint.
+
+    """
+
+    def setUp(self):
+        """
+        Start each test with no availability cached, and the registration
+        schedule already loaded, so that the query counts include only the
+        availability checks.
+
+        """
+        super().setUp()
+        clear_cache()
+        # The schedule is loaded first, since that takes a query.
+        schedule.get_periods()
+
+    def check(self, username):
+        """
+        Check the availability of a username, and return the decoded response.
+
+        """
+        resp = self.client.get(
+            reverse("django_registration_username_available"), {"username": username}
+        )
+        assert resp.status_code == 200
+        return resp.json()
+
+    def test_available(self):
+        """
+        A free username is reported available.
+
+        """
+        assert self.check("alice") == {"available": True, "errors": []}
+
+    def test_string_checks(self):
+        """
+        Missing, overlong, reserved and confusable usernames are reported without
+        querying the database.
+
+        """
+        for username, code in (
+            ("", "required"),
+            ("a" * 151, "max_length"),
+            ("admin", "invalid"),
+            ("pаypal", "invalid"),
+        ):
+            with self.subTest(username=username), self.assertNumQueries(0):
+                result = self.check(username)
+                assert not result["available"]
+                assert [error["code"] for error in result["errors"]] == [code]
+
+    def test_taken(self):
+        """
+        Whether a username is taken is compared case-insensitively, and looked up
+        for each check unless caching is configured.
+
+        """
+        user_model = get_user_model()
+        user_model.objects.create(username="alice")
+        for _ in range(2):
+            with self.assertNumQueries(1):
+                result = self.check("ALICE")
+            assert not result["available"]
+            assert [error["code"] for error in result["errors"]] == ["unique"]
+
+    @override_settings(REGISTRATION_AVAILABILITY_CACHE_TIMEOUT=30)
+    def test_cached(self):
+        """
+        With caching configured, whether a username is taken is answered from the
+        cache when checked again.
+
+        """
+        get_user_model().objects.create(username="alice")
+        with self.assertNumQueries(1):
+            assert not self.check("ALICE")["available"]
+        with self.assertNumQueries(0):
+            assert not self.check("Alice")["available"]
+
+    @override_settings(REGISTRATION_AVAILABILITY_CACHE_TIMEOUT=30)
+    def test_forgotten_on_save(self):
+        """
+        Saving a user account forgets the cached availability of its username,
+        once the transaction commits, except when loading fixtures.
+
+        """
+        user_model = get_user_model()
+        assert self.check("alice")["available"]
+        with self.captureOnCommitCallbacks(execute=True):
+            user_model.objects.create(username="alice")
+        assert not self.check("alice")["available"]
+
+        assert self.check("bob")["available"]
+        user_model(username="bob").save_base(raw=True)
+        assert availability.is_taken(user_model, "carol") is False
+        assert self.check("bob")["available"]
+
+    def test_registration_closed(self):
+        """
+        Nothing is reported while registration is closed.
+
+        """
+        with override_settings(REGISTRATION_OPEN=False):
+            resp = self.client.get(
+                reverse("django_registration_username_available"),
+                {"username": "alice"},
+            )
+        assert resp.status_code == 403
+        assert resp.json()["errors"]["__all__"][0]["code"] == "registration_closed"
+
+    def test_ip_blocklist(self):
+        """
+        Nothing is reported to IP addresses in the configured blocklist.
+
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = pathlib.Path(temp_dir) / "blocklist.bin"
+            datafiles.RangeFile.write(
+                path, [reputation.network_range("127.0.0.0/8")], 16
+            )
+            with override_settings(REGISTRATION_IP_BLOCKLIST_FILE=path):
+                resp = self.client.get(
+                    reverse("django_registration_username_available"),
+                    {"username": "alice"},
+                )
+        assert resp.status_code == 400
+        assert resp.json()["errors"]["__all__"][0]["code"] == "rejected"
+
+    @override_settings(REGISTRATION_THROTTLE_RATES={"lookup": "2/m"})
+    def test_throttled(self):
+        """
+        Each client IP address is throttled under the lookup scope.
+
+        """
+        for username in ("alice", "bob"):
+            self.check(username)
+        resp = self.client.get(
+            reverse("django_registration_username_available"), {"username": "carol"}
+        )
+        assert resp.status_code == 429
+        assert int(resp["Retry-After"]) > 0
+        assert resp.json()["errors"]["__all__"][0]["code"] == "throttled"
+        resp = self.client.get(
+            reverse("django_registration_username_available"),
+            {"username": "carol"},
+            REMOTE_ADDR="192.0.2.1",
+        )
+        assert resp.status_code == 200
@@ -0,0 +1,167 @@
+"""
+Tests for proof-of-work challenges on registration submissions.
+
+"""
+
+import hashlib
+import itertools
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.test import override_settings
+from django.urls import reverse
+
+from django_registration import challenges
+
+from .base import RegistrationTestCase, clear_cache
+
+
+def solve(challenge, solved=True):
+    """
+    Return a solution to the given challenge, or, if ``solved`` is false,
+    a string which does not solve it.
+
+    """
+    difficulty = int(
+        signing.Signer(salt=challenges.CHALLENGE_SALT).unsign(challenge).split(":")[1]
+    )
+    return next(
+        str(attempt)
+        for attempt in itertools.count()
+        if (
+            challenges.leading_zero_bits(
+                hashlib.sha256(f"{challenge}:{attempt}".encode()).digest()
+            )
+            >= difficulty
+        )
+        is solved
+    )
+
+
+class ChallengeTests(RegistrationTestCase):
+    """
+    Test issuing and verifying challenges.
+
+    """
+
+    def setUp(self):
+        """
+        Start each test with no challenge recorded as used.
+
+        """
+        super().setUp()
+        clear_cache()
+
+    def test_leading_zero_bits(self):
+        """
+        Leading zero bits are counted across the whole digest.
+
+        """
+        assert challenges.leading_zero_bits(b"\x80\x00") == 0
+        assert challenges.leading_zero_bits(b"\x00\x10") == 11
+        assert challenges.leading_zero_bits(b"\x00\x00") == 16
+
+    def test_verify(self):
+        """
+        A correct solution to a genuine, unexpired challenge is accepted once.
+
+        """
+        challenge = challenges.issue_challenge(8)
+        solution = solve(challenge)
+        wrong = next(
+            str(attempt)
+            for attempt in itertools.count()
+            if challenges.leading_zero_bits(
+                hashlib.sha256(f"{challenge}:{attempt}".encode()).digest()
+            )
+            < 8
+        )
+        assert not challenges.verify_solution(challenge, wrong)
+        assert challenges.verify_solution(challenge, solution)
+        assert not challenges.verify_solution(challenge, solution)
+
+        forged = signing.Signer(salt=challenges.CHALLENGE_SALT).sign("nonce:zero:0")
+        for challenge in ("", "not-a-challenge", forged):
+            assert not challenges.verify_solution(challenge, "0")
+
+        challenge = challenges.issue_challenge(0)
+        with mock.patch(
+            "time.time", return_value=time.time() + challenges.CHALLENGE_MAX_AGE + 1
+        ):
+            assert not challenges.verify_solution(challenge, "0")
+
+    def test_difficulty(self):
+        """
+        Difficulty rises by one for each doubling of the submission rate beyond the
+        baseline, up to the maximum.
+
+        """
+        assert challenges.get_difficulty(4, 6, 2) == 4
+        for _ in range(2):
+            challenges.record_submission()
+        assert challenges.get_difficulty(4, 6, 2) == 4
+        challenges.record_submission()
+        assert challenges.get_difficulty(4, 6, 2) == 5
+        for _ in range(20):
+            challenges.record_submission()
+        assert challenges.get_difficulty(4, 6, 2) == 6
+
+
+@override_settings(ROOT_URLCONF="tests.urls.view_tests")
+class ChallengedViewTests(RegistrationTestCase):
+    """
+    Test proof-of-work challenges in the registration view.
+
+    """
+
+    def setUp(self):
+        """
+        Start each test with no challenge recorded as used, so that solutions
+        replayed across tests are not rejected.
+
+        """
+        super().setUp()
+        clear_cache()
+
+    def post(self, challenge, solution):
+        """
+        Submit a registration with the given challenge and solution.
+
+        """
+        data = self.valid_data.copy()
+        data.update(proof_of_work_challenge=challenge, proof_of_work_solution=solution)
+        return self.client.post(reverse("challenged_register"), data=data)
+
+    def test_challenge(self):
+        """
+        The form is rendered with a challenge, and a submission must solve it.
+
+        """
+        resp = self.client.get(reverse("challenged_register"))
+        assert resp.context["proof_of_work_difficulty"] == 4
+        challenge = resp.context["proof_of_work_challenge"]
+
+        with self.assertNumQueries(0):
+            assert (
+                self.post(challenge, solve(challenge, solved=False)).status_code == 400
+            )
+        assert self.post(challenge, solve(challenge)).status_code == 302
+        assert get_user_model().objects.count() == 1
+
+        resp = self.client.get(reverse("django_registration_register"))
+        assert "proof_of_work_challenge" not in resp.context
+
+    def test_difficulty_scales(self):
+        """
+        Challenges become harder as the rate of submissions rises.
+
+        """
+        for _ in range(3):
+            challenge = self.client.get(reverse("challenged_register")).context[
+                "proof_of_work_challenge"
+            ]
+            self.post(challenge, solve(challenge))
+        resp = self.client.get(reverse("challenged_register"))
+        assert resp.context["proof_of_work_difficulty"] == 5
@@ -0,0 +1,96 @@
+"""
+Tests for django-registration's system checks.
+
+"""
+
+from unittest import mock
+
+from django.test import override_settings
+from django.urls import include, path
+
+from django_registration import checks, forms
+from django_registration.backends.activation import views as activation_views
+from django_registration.backends.one_step import views as one_step_views
+from django_registration.views import FieldValidationView, UsernameAvailabilityView
+
+from .base import RegistrationTestCase
+
+
+class RegistrationViewCheckTests(RegistrationTestCase):
+    """
+    Test the check of registration views' form classes.
+
+    """
+
+    def test_matching_form(self):
+        """
+        Registration views whose forms match the user model pass.
+
+        """
+        assert not checks.check_registration_views(None)
+        with override_settings(
+            AUTH_USER_MODEL="tests.CustomUser",
+            ROOT_URLCONF="tests.urls.custom_user_one_step",
+        ):
+            assert not checks.check_registration_views(None)
+        with override_settings(ROOT_URLCONF=None):
+            assert not checks.check_registration_views(None)
+
+    @override_settings(AUTH_USER_MODEL="tests.CustomUser")
+    def test_mismatched_form(self):
+        """
+        Each routed registration, username availability or field validation view
+        whose form is not for the user model is reported.
+
+        """
+        errors = checks.check_registration_views(None)
+        assert [error.id for error in errors] == ["django_registration.E001"] * 3
+        assert "auth.User" in errors[0].msg
+        assert [error.obj for error in errors] == [
+            activation_views.RegistrationView,
+            UsernameAvailabilityView,
+            FieldValidationView,
+        ]
+
+    def test_unmaintained_indexes(self):
+        """
+        A routed view whose form checks the stored identifier indexes is reported
+        unless they are maintained.
+
+        """
+        patterns = [
+            path(
+                "register/",
+                activation_views.RegistrationView.as_view(
+                    form_class=forms.RegistrationFormUniqueSkeleton
+                ),
+            ),
+            path(
+                "validate/",
+                FieldValidationView.as_view(
+                    form_class=forms.RegistrationFormUniqueCanonicalEmail
+                ),
+            ),
+        ]
+        with mock.patch.object(checks, "get_resolver") as get_resolver:
+            get_resolver.return_value.url_patterns = patterns
+            errors = checks.check_registration_views(None)
+            assert [error.id for error in errors] == ["django_registration.E002"] * 2
+            assert [error.obj for error in errors] == [
+                activation_views.RegistrationView,
+                FieldValidationView,
+            ]
+            with override_settings(REGISTRATION_IDENTIFIER_INDEXES=True):
+                assert not checks.check_registration_views(None)
+
+    def test_included_views(self):
+        """
+        Views in included URLconfs are found.
+
+        """
+        patterns = [
+            path("accounts/", include("django_registration.backends.one_step.urls"))
+        ]
+        assert one_step_views.RegistrationView in [
+            view_class for view_class, initkwargs in checks.iter_views(patterns)
+        ]
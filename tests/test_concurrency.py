@@ -0,0 +1,175 @@
+"""
+Tests for bounded concurrency of password hashing during registration.
+
+"""
+
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+
+from django_registration import concurrency
+from django_registration.cache import get_cache, make_key
+from django_registration.concurrency import hashing_slot
+from django_registration.exceptions import RegistrationBusy
+
+from .base import RegistrationTestCase, clear_cache
+
+
+class HashingSlotTests(RegistrationTestCase):
+    """
+    Test taking password-hashing slots.
+
+    """
+
+    def setUp(self):
+        """
+        Start each test with every cluster slot free.
+
+        """
+        super().setUp()
+        clear_cache()
+
+    def test_unlimited(self):
+        """
+        Without configuration, hashing slots are unlimited.
+
+        """
+        with hashing_slot(), hashing_slot():
+            pass
+
+    @override_settings(REGISTRATION_HASHING_CONCURRENCY={"process": 1, "timeout": 0})
+    def test_process_limit(self):
+        """
+        Slots are limited per process, and released at the end of the block.
+
+        """
+        with hashing_slot():
+            with self.assertRaises(RegistrationBusy) as context, hashing_slot():
+                pass
+            assert context.exception.code == "busy"
+        with hashing_slot():
+            pass
+
+    @override_settings(
+        REGISTRATION_HASHING_CONCURRENCY={"process": 2, "cluster": 1, "timeout": 0.1}
+    )
+    def test_cluster_limit(self):
+        """
+        Slots are limited across processes through the cache, and a process slot
+        taken while waiting for a cluster slot is released on failure.
+
+        """
+        with hashing_slot():
+            with self.assertRaises(RegistrationBusy), hashing_slot():
+                pass
+            with self.assertRaises(RegistrationBusy), hashing_slot():
+                pass
+        with hashing_slot():
+            pass
+
+    @override_settings(REGISTRATION_HASHING_CONCURRENCY={"cluster": 1, "timeout": 0})
+    def test_expired_cluster_slot(self):
+        """
+        A cluster slot which expired and was taken by another process is not
+        released by the process which held it before.
+
+        """
+        key = make_key("hashing_slot", 1, 0)
+        with hashing_slot():
+            # The slot expires, and another process takes it.
+            get_cache().set(key, "another process")
+        assert get_cache().get(key) == "another process"
+        with self.assertRaises(RegistrationBusy), hashing_slot():
+            pass
+
+    def test_cluster_polling(self):
+        """
+        While waiting for a cluster slot, one slot is tried after each wait, and
+        the waits grow until one is taken or the deadline passes.
+
+        """
+        cache = get_cache()
+        for slot in range(4):
+            cache.set(make_key("hashing_slot", 4, slot), "another process")
+        clock = [0.0]
+
+        def sleep(seconds):
+            """
+            Advance the clock instead of sleeping, freeing a slot after one second.
+
+            """
+            clock[0] += seconds
+            if clock[0] > 1.0:
+                cache.delete(make_key("hashing_slot", 4, 2))
+
+        with mock.patch.object(
+            concurrency.time, "monotonic", side_effect=lambda: clock[0]
+        ), mock.patch.object(
+            concurrency.time, "sleep", side_effect=sleep
+        ) as sleep_mock, mock.patch.object(
+            concurrency.random, "uniform", return_value=1
+        ), mock.patch.object(
+            cache, "add", wraps=cache.add
+        ) as add:
+            assert concurrency.acquire_cluster_slot(4, 0.75, "token") is None
+            assert add.call_count == 4 + sleep_mock.call_count
+            assert [round(call.args[0], 2) for call in sleep_mock.call_args_list] == [
+                0.05,
+                0.1,
+                0.2,
+                0.4,
+            ]
+
+            add.reset_mock()
+            sleep_mock.reset_mock()
+            clock[0] = 0.9
+            with mock.patch.object(concurrency.random, "randrange", return_value=2):
+                key = concurrency.acquire_cluster_slot(4, 10.0, "token")
+            assert key == make_key("hashing_slot", 4, 2)
+            assert cache.get(key) == "token"
+            assert [round(call.args[0], 2) for call in sleep_mock.call_args_list] == [
+                0.05,
+                0.1,
+            ]
+
+
+@override_settings(REGISTRATION_HASHING_CONCURRENCY={"process": 1, "timeout": 0})
+class BusyViewTests(RegistrationTestCase):
+    """
+    Test turning away registrations when no hashing slot is free.
+
+    """
+
+    def test_busy(self):
+        """
+        A registration which cannot get a hashing slot receives a quick response
+        asking the client to try again, and creates no account.
+
+        """
+        with hashing_slot():
+            resp = self.client.post(
+                reverse("django_registration_register"), data=self.valid_data
+            )
+        assert resp.status_code == 503
+        assert resp["Retry-After"] == "1"
+        assert not get_user_model().objects.exists()
+
+        resp = self.client.post(
+            reverse("django_registration_register"), data=self.valid_data
+        )
+        assert resp.status_code == 302
+
+    @override_settings(ROOT_URLCONF="django_registration.backends.one_step.urls")
+    def test_busy_one_step(self):
+        """
+        The one-step workflow also hashes passwords within a slot.
+
+        """
+        with hashing_slot():
+            resp = self.client.post(
+                reverse("django_registration_register"), data=self.valid_data
+            )
+        assert resp.status_code == 503
+        assert not get_user_model().objects.exists()
@@ -0,0 +1,356 @@
+"""
+Tests for django-registration's memory-mapped data files.
+
+"""
+
+import hashlib
+import os
+import pathlib
+import tempfile
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, override_settings
+
+from django_registration import datafiles, reputation
+
+
+class SortedSetFileTests(SimpleTestCase):
+    """
+    Test the sorted set file format.
+
+    """
+
+    def setUp(self):
+        """
+        Give each test the path of a set file in a temporary directory.
+
+        """
+        super().setUp()
+        temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(temp_dir.cleanup)
+        self.path = pathlib.Path(temp_dir.name) / "set.bin"
+
+    def test_membership(self):
+        """
+        Membership is determined by binary search over the sorted items.
+
+        """
+        items = [b"example.com", b"a.example", b"zzz.example", b"m.example"]
+        datafiles.SortedSetFile.write(self.path, items)
+        assert self.path.stat().st_mode & 0o777 == 0o644
+        sorted_set = datafiles.SortedSetFile(self.path)
+        for item in items:
+            assert item in sorted_set
+        for item in (b"", b"a", b"example.co", b"example.comm", b"zzzz"):
+            assert item not in sorted_set
+
+        datafiles.SortedSetFile.write(self.path, [])
+        assert b"example.com" not in datafiles.SortedSetFile(self.path)
+
+    def test_reload(self):
+        """
+        A file replaced on disk is reloaded, and the old data is kept if the file
+        goes missing.
+
+        """
+        datafiles.SortedSetFile.write(self.path, [b"old.example"])
+        sorted_set = datafiles.SortedSetFile(self.path)
+        sorted_set.check_interval = 0
+        assert b"old.example" in sorted_set
+
+        datafiles.SortedSetFile.write(self.path, [b"new.example"])
+        assert b"old.example" not in sorted_set
+        assert b"new.example" in sorted_set
+
+        os.unlink(self.path)
+        assert b"new.example" in sorted_set
+
+    def test_corrupt_replacement(self):
+        """
+        If a replacement file is corrupt, the old data is kept and the error logged,
+        and the file is not checked again until the check interval passes.
+
+        """
+        datafiles.SortedSetFile.write(self.path, [b"old.example"])
+        sorted_set = datafiles.SortedSetFile(self.path)
+        sorted_set.check_interval = 0
+        assert b"old.example" in sorted_set
+
+        sorted_set.check_interval = 60
+        for contents in (b"", b"corrupt"):
+            sorted_set._next_check = 0  # pylint: disable=protected-access
+            datafiles.write_atomic(self.path, [contents])
+            with self.assertLogs("django_registration.datafiles", "ERROR"):
+                assert b"old.example" in sorted_set
+
+        datafiles.SortedSetFile.write(self.path, [b"new.example"])
+        assert b"old.example" in sorted_set
+        sorted_set._next_check = 0  # pylint: disable=protected-access
+        assert b"new.example" in sorted_set
+
+    def test_check_interval(self):
+        """
+        The file on disk is not checked again until the check interval passes.
+
+        """
+        datafiles.SortedSetFile.write(self.path, [b"old.example"])
+        sorted_set = datafiles.SortedSetFile(self.path)
+        assert b"old.example" in sorted_set
+        datafiles.SortedSetFile.write(self.path, [b"new.example"])
+        assert b"old.example" in sorted_set
+
+    def test_invalid_files(self):
+        """
+        Missing files and files of the wrong format raise exceptions.
+
+        """
+        sorted_set = datafiles.SortedSetFile(self.path)
+        with self.assertRaises(FileNotFoundError):
+            sorted_set.get_data()
+        self.path.write_bytes(b"not a sorted set file")
+        with self.assertRaises(ValueError):
+            sorted_set.get_data()
+
+    def test_write_failure(self):
+        """
+        A failed write leaves no temporary file behind.
+
+        """
+        with self.assertRaises(TypeError):
+            datafiles.write_atomic(self.path, [b"ok", "not bytes"])
+        assert not list(self.path.parent.iterdir())
+
+    def test_shared_instances(self):
+        """
+        Each file is mapped once per process.
+
+        """
+        assert datafiles.get_mapped_file(
+            datafiles.SortedSetFile, self.path
+        ) is datafiles.get_mapped_file(datafiles.SortedSetFile, str(self.path))
+
+    def test_compile_command(self):
+        """
+        The compile command converts a plain-text domain list.
+
+        """
+        source = self.path.parent / "domains.txt"
+        source.write_text(
+            "# Disposable domains\nMailinator.com\n\nguerrillamail.com.  # comment\n"
+        )
+        stdout = StringIO()
+        call_command("compile_email_domain_list", source, self.path, stdout=stdout)
+        assert "Compiled 2 domains" in stdout.getvalue()
+        sorted_set = datafiles.SortedSetFile(self.path)
+        assert b"mailinator.com" in sorted_set
+        assert b"guerrillamail.com" in sorted_set
+
+
+class DigestFileTests(SimpleTestCase):
+    """
+    Test the digest file format.
+
+    """
+
+    def setUp(self):
+        """
+        Give each test the path of a digest file in a temporary directory.
+
+        """
+        super().setUp()
+        temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(temp_dir.cleanup)
+        self.path = pathlib.Path(temp_dir.name) / "digests.bin"
+
+    def test_membership(self):
+        """
+        Membership is determined by binary search within the digest's prefix.
+
+        """
+        digests = sorted(
+            hashlib.sha1(str(i).encode()).digest()  # nosec: B303,B324
+            for i in range(1000)
+        )
+        datafiles.DigestFile.write(self.path, digests + digests[-1:], 20)
+        digest_file = datafiles.DigestFile(self.path)
+        for digest in digests:
+            assert digest in digest_file
+        for i in range(1000, 1100):
+            assert (
+                hashlib.sha1(str(i).encode()).digest()  # nosec: B303,B324
+                not in digest_file
+            )
+        assert b"\xff" * 20 not in digest_file
+        assert b"short" not in digest_file
+
+    def test_invalid_input(self):
+        """
+        Unsorted or wrongly-sized digests are rejected.
+
+        """
+        with self.assertRaises(ValueError):
+            datafiles.DigestFile.write(self.path, [b"b" * 20, b"a" * 20], 20)
+        with self.assertRaises(ValueError):
+            datafiles.DigestFile.write(self.path, [b"a" * 19], 20)
+        assert not list(self.path.parent.iterdir())
+
+    def test_compile_command(self):
+        """
+        The compile command converts a text file of hexadecimal hashes.
+
+        """
+        source = self.path.parent / "hashes.txt"
+        hashes = sorted(
+            hashlib.sha1(password).hexdigest().upper()  # nosec: B303,B324
+            for password in (b"password", b"swordfish", b"123456")
+        )
+        source.write_text(f"{hashes[0]}:100\n\n{hashes[1]}:5\n{hashes[2]}\n")
+        stdout = StringIO()
+        call_command("compile_breached_passwords", source, self.path, stdout=stdout)
+        assert "Compiled" in stdout.getvalue()
+        digest_file = datafiles.DigestFile(self.path)
+        for value in hashes:
+            assert bytes.fromhex(value) in digest_file
+
+        source.write_text(f"{hashes[1]}\n{hashes[0]}\n")
+        with self.assertRaises(CommandError):
+            call_command("compile_breached_passwords", source, self.path)
+        source.write_text("not hexadecimal\n")
+        with self.assertRaises(CommandError):
+            call_command("compile_breached_passwords", source, self.path)
+
+
+class RangeFileTests(SimpleTestCase):
+    """
+    Test the range file format.
+
+    """
+
+    def setUp(self):
+        """
+        Give each test the path of a range file in a temporary directory.
+
+        """
+        super().setUp()
+        temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(temp_dir.cleanup)
+        self.path = pathlib.Path(temp_dir.name) / "ranges.bin"
+
+    def test_membership(self):
+        """
+        Membership is determined by binary search for the range starting at or
+        before the value, and overlapping and adjacent ranges are merged.
+
+        """
+        datafiles.RangeFile.write(
+            self.path, [(50, 60), (10, 20), (15, 30), (31, 35), (40, 40)], 2
+        )
+        range_file = datafiles.RangeFile(self.path)
+        members = {*range(10, 36), 40, *range(50, 61)}
+        for value in range(100):
+            assert (value.to_bytes(2, "big") in range_file) is (value in members)
+        assert b"\x00" not in range_file
+        assert os.path.getsize(self.path) == 20 + 3 * 4
+
+        datafiles.RangeFile.write(self.path, [], 2)
+        range_file = datafiles.RangeFile(self.path)
+        assert b"\x00\x00" not in range_file
+
+    def test_invalid_input(self):
+        """
+        Empty ranges, and ranges too large for the integer width, are rejected.
+
+        """
+        for ranges in ([(2, 1)], [(-1, 1)], [(0, 256)]):
+            with self.assertRaises(ValueError):
+                datafiles.RangeFile.write(self.path, ranges, 1)
+
+    def test_ip_blocklist(self):
+        """
+        The compile command converts text files of IPv4 and IPv6 networks, which
+        are then matched against addresses.
+
+        """
+        first = self.path.parent / "first.txt"
+        first.write_text("# Feed one\n192.0.2.0/24\n\n198.51.100.7  # one host\n")
+        second = self.path.parent / "second.txt"
+        second.write_text("2001:db8::/32\n192.0.2.128/25\n")
+        stdout = StringIO()
+        call_command("compile_ip_blocklist", first, second, self.path, stdout=stdout)
+        assert "Compiled" in stdout.getvalue()
+        for address, listed in (
+            ("192.0.2.0", True),
+            ("192.0.2.255", True),
+            ("::ffff:192.0.2.1", True),
+            ("192.0.3.0", False),
+            ("198.51.100.7", True),
+            ("198.51.100.8", False),
+            ("2001:db8:1234::1", True),
+            ("2001:db9::", False),
+            ("not-an-address", False),
+            (None, False),
+        ):
+            assert reputation.is_listed(address, self.path) is listed
+        with override_settings(REGISTRATION_IP_BLOCKLIST_FILE=self.path):
+            assert reputation.is_listed("192.0.2.1")
+
+        first.write_text("192.0.2.0/24\n192.0.2.300\n")
+        with self.assertRaisesMessage(CommandError, "line 2"):
+            call_command("compile_ip_blocklist", first, self.path)
+
+
+class BloomFilterFileTests(SimpleTestCase):
+    """
+    Test the Bloom filter file format.
+
+    """
+
+    def setUp(self):
+        """
+        Give each test the path of a Bloom filter file in a temporary directory.
+
+        """
+        super().setUp()
+        temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(temp_dir.cleanup)
+        self.path = pathlib.Path(temp_dir.name) / "filter.bin"
+
+    def test_membership(self):
+        """
+        Every digest added is found, and digests not added are mostly not found,
+        at about the false-positive rate the filter was sized for.
+
+        """
+        digests = [
+            hashlib.blake2b(str(i).encode(), digest_size=16).digest()
+            for i in range(1000)
+        ]
+        datafiles.BloomFilterFile.write(self.path, digests, 1000, 0.01, generation=7)
+        bloom_filter = datafiles.BloomFilterFile(self.path)
+        assert bloom_filter.generation == 7
+        for digest in digests:
+            assert digest in bloom_filter
+        false_positives = sum(
+            hashlib.blake2b(str(i).encode(), digest_size=16).digest() in bloom_filter
+            for i in range(1000, 11000)
+        )
+        assert false_positives < 200
+        assert b"short" not in bloom_filter
+        # About 1.2 bytes per digest.
+        assert 1100 < os.path.getsize(self.path) < 1300
+
+        datafiles.BloomFilterFile.write(self.path, [], 0, 0.01)
+        assert digests[0] not in datafiles.BloomFilterFile(self.path)
+
+    def test_invalid_input(self):
+        """
+        Wrongly-sized digests and invalid false-positive rates are rejected.
+
+        """
+        with self.assertRaises(ValueError):
+            datafiles.BloomFilterFile.write(self.path, [b"a" * 15], 1, 0.01)
+        for rate in (0, 1):
+            with self.assertRaises(ValueError):
+                datafiles.BloomFilterFile.write(self.path, [], 1, rate)
+        assert not list(self.path.parent.iterdir())
@@ -0,0 +1,138 @@
+"""
+Tests for the single-field validation endpoint.
+
+"""
+
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+
+from django_registration import schedule
+
+from .base import RegistrationTestCase, clear_cache
+
+
+class FieldValidationTests(RegistrationTestCase):
+    """
+    Test the single-field validation endpoint.
+
+    """
+
+    def setUp(self):
+        """
+        Start each test with nothing cached, and the registration schedule
+        already loaded, so that the query counts include only validation.
+
+        """
+        super().setUp()
+        clear_cache()
+        # The schedule is loaded first, since that takes a query.
+        schedule.get_periods()
+
+    def validate(self, data, **kwargs):
+        """
+        Submit a field for validation, and return the response.
+
+        """
+        return self.client.post(
+            reverse("django_registration_validate_field"), data=data, **kwargs
+        )
+
+    def test_valid(self):
+        """
+        A valid field is reported valid, and other fields are not validated.
+
+        """
+        with self.assertNumQueries(0):
+            resp = self.validate(
+                {"field": "email", "email": "alice@example.com", "username": "admin"}
+            )
+        assert resp.status_code == 200
+        assert resp.json() == {"valid": True, "errors": []}
+
+    def test_invalid(self):
+        """
+        An invalid field is reported with its errors, running only that field's
+        checks.
+
+        """
+        get_user_model().objects.create(username="alice")
+        for data, code, queries in (
+            ({"field": "email", "email": "alice"}, "invalid", 0),
+            ({"field": "username", "username": "admin"}, "invalid", 0),
+            ({"field": "username", "username": "ALICE"}, "unique", 1),
+            ({"field": "password1"}, "required", 0),
+        ):
+            with self.subTest(data=data), self.assertNumQueries(queries):
+                result = self.validate(data).json()
+                assert not result["valid"]
+                assert [error["code"] for error in result["errors"]] == [code]
+
+    @override_settings(
+        AUTH_PASSWORD_VALIDATORS=[
+            {
+                "NAME": (
+                    "django.contrib.auth.password_validation.MinimumLengthValidator"
+                ),
+                "OPTIONS": {"min_length": 12},
+            }
+        ]
+    )
+    def test_password(self):
+        """
+        The password confirmation is checked by the password validators, but not
+        against the password, which is not submitted.
+
+        """
+        result = self.validate({"field": "password2", "password2": "short"}).json()
+        assert [error["code"] for error in result["errors"]] == ["password_too_short"]
+        result = self.validate(
+            {"field": "password2", "password2": "long enough, surely"}
+        ).json()
+        assert result["valid"]
+
+    def test_json(self):
+        """
+        The submission may be a JSON object.
+
+        """
+        resp = self.validate(
+            json.dumps({"field": "username", "username": "admin"}),
+            content_type="application/json",
+        )
+        assert resp.json()["errors"][0]["code"] == "invalid"
+
+    def test_bad_requests(self):
+        """
+        Invalid JSON, unknown fields and other methods are rejected.
+
+        """
+        resp = self.validate("[]", content_type="application/json")
+        assert resp.status_code == 400
+        assert resp.json()["errors"]["__all__"][0]["code"] == "invalid_json"
+        for data in ({}, {"field": "is_superuser"}):
+            resp = self.validate(data)
+            assert resp.status_code == 400
+            assert resp.json()["errors"]["__all__"][0]["code"] == "unknown_field"
+        resp = self.client.get(reverse("django_registration_validate_field"))
+        assert resp.status_code == 405
+
+    def test_checks(self):
+        """
+        Nothing is validated while registration is closed, or beyond the
+        throttle's limit for the client IP address.
+
+        """
+        data = {"field": "username", "username": "admin"}
+        with override_settings(REGISTRATION_OPEN=False):
+            resp = self.validate(data)
+        assert resp.status_code == 403
+        assert resp.json()["errors"]["__all__"][0]["code"] == "registration_closed"
+
+        with override_settings(REGISTRATION_THROTTLE_RATES={"lookup": "1/m"}):
+            assert self.validate(data).status_code == 200
+            resp = self.validate(data)
+        assert resp.status_code == 429
+        assert resp.json()["errors"]["__all__"][0]["code"] == "throttled"
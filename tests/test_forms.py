@@ -4,15 +4,27 @@ Exercise django-registration's built-in form classes.
 
 """
 
+import hashlib
+import pathlib
+import tempfile
 import uuid
+from unittest import mock
 
+from django import forms as django_forms
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
-from django.test import modify_settings
+from django.test import modify_settings, override_settings
 
-from django_registration import forms, validators
+from django_registration import (
+    base_forms,
+    datafiles,
+    forms,
+    password_validation,
+    validators,
+)
 
 from .base import RegistrationTestCase
+from .models import CustomUser
 
 
 @modify_settings(INSTALLED_APPS={"remove": "registration"})
@@ -22,6 +34,8 @@ class RegistrationFormTests(RegistrationTestCase):
 
     """
 
+    # pylint: disable=too-many-public-methods
+
     def test_email_required(self):
         """
         The email address field is required.
@@ -181,6 +195,86 @@ class RegistrationFormTests(RegistrationTestCase):
                 str(validators.RESERVED_NAME) in form.errors[user_model.USERNAME_FIELD]
             )
 
+    def test_validators_shared(self):
+        """
+        Validators are built once for each form class and shared by its
+        instances, without affecting the fields of parent classes.
+
+        """
+        user_model = get_user_model()
+
+        class ExtraValidatorForm(forms.RegistrationFormCaseInsensitive):
+            """
+            Registration form adding a validator to the username field.
+
+            """
+
+            @classmethod
+            def configure_fields(cls, fields):
+                """
+                Add the extra validator to the username field.
+
+                """
+                super().configure_fields(fields)
+                fields[user_model.USERNAME_FIELD].validators.append(str.strip)
+
+        first, second = ExtraValidatorForm(), ExtraValidatorForm()
+        first_validators = first.fields[user_model.USERNAME_FIELD].validators
+        second_validators = second.fields[user_model.USERNAME_FIELD].validators
+        assert first_validators is not second_validators
+        assert all(
+            mine is theirs for mine, theirs in zip(first_validators, second_validators)
+        )
+        assert first_validators[-1] is str.strip
+        parent = forms.RegistrationFormCaseInsensitive()
+        assert (
+            len(first_validators)
+            == len(parent.fields[user_model.USERNAME_FIELD].validators) + 1
+        )
+
+    def test_form_factory(self):
+        """
+        Form classes built for another user model use it throughout, and are
+        built once for each user model.
+
+        """
+        # pylint: disable=no-member,protected-access
+        form_class = forms.registration_form_factory(
+            CustomUser, "RegistrationFormCaseInsensitive"
+        )
+        assert form_class is forms.registration_form_factory(
+            CustomUser, "RegistrationFormCaseInsensitive"
+        )
+        assert issubclass(form_class, base_forms.RegistrationFormCaseInsensitive)
+        assert issubclass(form_class, forms.registration_form_factory(CustomUser))
+        assert forms.registration_form_factory(
+            CustomUser
+        ) is forms.registration_form_factory(CustomUser, name="RegistrationForm")
+        assert form_class._meta.model is CustomUser
+        assert forms.RegistrationFormCaseInsensitive._meta.model is not CustomUser
+        unique_validator = form_class().fields["username"].validators[-1]
+        assert unique_validator.model is CustomUser
+
+        CustomUser.objects.create(username="Alice", email="alice@example.com")
+        form = form_class(data=self.valid_data)
+        assert not form.is_valid()
+        assert form.has_error("username")
+
+        with self.assertRaises(AttributeError):
+            forms.NoSuchForm  # pylint: disable=pointless-statement
+
+    def test_form_hierarchy(self):
+        """
+        Every form class is a subclass of RegistrationForm.
+
+        """
+        for name in forms.FORM_CLASSES:
+            with self.subTest(name=name):
+                assert issubclass(getattr(forms, name), forms.RegistrationForm)
+        assert forms.RegistrationFormUniqueEmail.__mro__.index(
+            base_forms.RegistrationFormUniqueEmail
+        ) < forms.RegistrationFormUniqueEmail.__mro__.index(forms.RegistrationForm)
+
     def test_reserved_name_non_string(self):
         """
         GitHub issue #82: reserved-name validator should not attempt to validate a
@@ -396,3 +490,417 @@ class RegistrationFormTests(RegistrationTestCase):
             "username",
         ):
             validators.validate_confusables_email(safe_value)
+
+    def test_confusable_skeleton(self):
+        """
+        Visually-confusable strings have the same skeleton, regardless of whether
+        each is single-script.
+
+        """
+        for value, confusable in (
+            ("paypal", "pаypаl"),
+            ("google", "gооgle"),
+            ("paypal", "ρayρal"),
+            ("paypal", "paypaI"),
+            ("modern", "rnodern"),
+            # Two Hebrew accents confusable only with each other.
+            ("\u0596", "\u05ad"),
+        ):
+            assert validators.confusable_skeleton(
+                value
+            ) == validators.confusable_skeleton(confusable)
+        assert validators.confusable_skeleton(
+            "alice"
+        ) != validators.confusable_skeleton("bob")
+
+    @override_settings(REGISTRATION_IDENTIFIER_INDEXES=True)
+    def test_confusable_skeleton_validator(self):
+        """
+        Test the confusable-skeleton uniqueness validator.
+
+        """
+        user_model = get_user_model()
+        validator = validators.ConfusableSkeletonUnique()
+        for value in (123456, 1.7, uuid.uuid4()):
+            assert validator(value) is None
+
+        user_model.objects.create(
+            username="paypal",
+            email="paypal@example.com",
+            password=self.valid_data["password1"],
+        )
+        for confusable in ("pаypаl", "ρayρal", "paypaI"):
+            with self.assertRaisesMessage(ValidationError, str(validators.CONFUSABLE)):
+                validator(confusable)
+        assert validator("alice") is None
+
+    def test_confusable_skeleton_validator_eq(self):
+        """
+        Test ConfusableSkeletonUnique's __eq__() method.
+
+        """
+        assert (
+            validators.ConfusableSkeletonUnique()
+            == validators.ConfusableSkeletonUnique()
+        )
+        assert validators.ConfusableSkeletonUnique() != (
+            validators.ConfusableSkeletonUnique(
+                error_message=validators.DUPLICATE_USERNAME
+            )
+        )
+
+    @override_settings(REGISTRATION_IDENTIFIER_INDEXES=True)
+    def test_unique_skeleton_form(self):
+        """
+        Usernames confusable with an existing username are disallowed by
+        RegistrationFormUniqueSkeleton.
+
+        """
+        user_model = get_user_model()
+        user_model.objects.create(
+            username="paypal",
+            email="paypal@example.com",
+            password=self.valid_data["password1"],
+        )
+        data = self.valid_data.copy()
+        data[user_model.USERNAME_FIELD] = "paypaI"
+        form = forms.RegistrationFormUniqueSkeleton(data=data)
+        assert not form.is_valid()
+        assert form.errors[user_model.USERNAME_FIELD] == [str(validators.CONFUSABLE)]
+
+        form = forms.RegistrationFormUniqueSkeleton(data=self.valid_data.copy())
+        assert form.is_valid()
+
+    def test_canonical_email(self):
+        """
+        Email addresses are canonicalized according to the rules for their domain.
+
+        """
+        for value, canonical in (
+            ("Alice@Example.com", "alice@example.com"),
+            ("alice+tag@example.com", "alice+tag@example.com"),
+            ("a.l.i.c.e+tag@gmail.com", "alice@gmail.com"),
+            ("alice.smith@googlemail.com", "alicesmith@gmail.com"),
+            ("alice.smith+tag@outlook.com", "alice.smith@outlook.com"),
+            ("alice+tag@me.com", "alice@icloud.com"),
+            ("not-an-email-address", "not-an-email-address"),
+        ):
+            assert validators.canonical_email(value) == canonical
+
+        rules = {"*": {"subaddress_separator": "-"}}
+        assert validators.canonical_email("alice-tag@example.com", rules) == (
+            "alice@example.com"
+        )
+        with override_settings(REGISTRATION_CANONICAL_EMAIL_RULES=rules):
+            assert validators.canonical_email("a.lice-tag@gmail.com") == (
+                "a.lice@gmail.com"
+            )
+
+    @override_settings(REGISTRATION_IDENTIFIER_INDEXES=True)
+    def test_canonical_email_validator(self):
+        """
+        Test the canonical-email uniqueness validator.
+
+        """
+        user_model = get_user_model()
+        validator = validators.CanonicalEmailUnique()
+        for value in (123456, 1.7, uuid.uuid4()):
+            assert validator(value) is None
+
+        user_model.objects.create(
+            username="bob",
+            email="bob.smith@gmail.com",
+            password=self.valid_data["password1"],
+        )
+        for duplicate in ("bobsmith@gmail.com", "Bob.Smith+x@googlemail.com"):
+            with self.assertRaisesMessage(
+                ValidationError, str(validators.DUPLICATE_EMAIL)
+            ):
+                validator(duplicate)
+        assert validator("bob.smith@example.com") is None
+
+        assert validator == validators.CanonicalEmailUnique()
+        assert validator != validators.ConfusableSkeletonUnique(
+            error_message=validators.DUPLICATE_EMAIL
+        )
+
+    @override_settings(REGISTRATION_IDENTIFIER_INDEXES=True)
+    def test_unique_canonical_email_form(self):
+        """
+        Email addresses with the same canonical form as an existing address are
+        disallowed by RegistrationFormUniqueCanonicalEmail.
+
+        """
+        user_model = get_user_model()
+        user_model.objects.create(
+            username="bob",
+            email="john.doe@gmail.com",
+            password=self.valid_data["password1"],
+        )
+        data = self.valid_data.copy()
+        data["email"] = "johndoe+x@gmail.com"
+        form = forms.RegistrationFormUniqueCanonicalEmail(data=data)
+        assert not form.is_valid()
+        assert form.errors["email"] == [str(validators.DUPLICATE_EMAIL)]
+
+        form = forms.RegistrationFormUniqueCanonicalEmail(data=self.valid_data.copy())
+        assert form.is_valid()
+
+    def test_domain_policy_validator(self):
+        """
+        Test the email domain policy validator, including subdomain wildcards.
+
+        """
+        validator = validators.DomainPolicyValidator(
+            deny=["example.com", "*.spam.example", "Mixed.Case.example"]
+        )
+        for value in (
+            "user@example.com",
+            "user@EXAMPLE.com.",
+            "user@mail.spam.example",
+            "user@a.b.spam.example",
+            "user@mixed.case.example",
+        ):
+            with self.assertRaisesMessage(ValidationError, str(validators.FREE_EMAIL)):
+                validator(value)
+        for value in (
+            "user@sub.example.com",
+            "user@spam.example",
+            "user@example.org",
+            "user@com",
+            "user@.example.com",
+            "user@x..example.com",
+            "user@*.example.com",
+            "not-an-email-address",
+            12345,
+        ):
+            assert validator(value) is None
+
+        validator = validators.DomainPolicyValidator(
+            allow=["example.com", "*.example.com"], deny=["bad.example.com"]
+        )
+        for value in ("user@example.com", "user@mail.example.com"):
+            assert validator(value) is None
+        with self.assertRaisesMessage(
+            ValidationError, str(validators.EMAIL_DOMAIN_NOT_ALLOWED)
+        ):
+            validator("user@example.org")
+        with self.assertRaisesMessage(ValidationError, str(validators.FREE_EMAIL)):
+            validator("user@bad.example.com")
+
+    def test_domain_policy_validator_eq(self):
+        """
+        Test DomainPolicyValidator's __eq__() method.
+
+        """
+        assert validators.DomainPolicyValidator(
+            deny=["example.com"]
+        ) == validators.DomainPolicyValidator(deny=["example.com"])
+        assert validators.DomainPolicyValidator(
+            deny=["example.com"]
+        ) != validators.DomainPolicyValidator(allow=["example.com"])
+
+    def test_no_free_email_form(self):
+        """
+        RegistrationFormNoFreeEmail disallows free email providers.
+
+        """
+        for domain in validators.FREE_EMAIL_DOMAINS:
+            data = self.valid_data.copy()
+            data["email"] = f"alice@{domain}"
+            form = forms.RegistrationFormNoFreeEmail(data=data)
+            assert not form.is_valid()
+            assert form.errors["email"] == [str(validators.FREE_EMAIL)]
+
+        # Domains with empty labels are invalid, not matched against the list.
+        for email in ("a@.gmail.com", "a@x..gmail.com"):
+            data = self.valid_data.copy()
+            data["email"] = email
+            form = forms.RegistrationFormNoFreeEmail(data=data)
+            assert not form.is_valid()
+            assert "email" in form.errors
+
+        form = forms.RegistrationFormNoFreeEmail(data=self.valid_data.copy())
+        assert form.is_valid()
+
+    def test_disposable_email_validator(self):
+        """
+        Test the disposable email domain validator, and its use by RegistrationForm
+        when a domain list is configured.
+
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = pathlib.Path(temp_dir) / "disposable.bin"
+            datafiles.SortedSetFile.write(path, [b"mailinator.com", b"com.example"])
+            validator = validators.DisposableEmailValidator(path)
+            for value in ("user@mailinator.com", "user@A.B.Mailinator.com."):
+                with self.assertRaisesMessage(
+                    ValidationError, str(validators.DISPOSABLE_EMAIL)
+                ):
+                    validator(value)
+            for value in (
+                "user@example.com",
+                "user@com",
+                "user@notmailinator.com",
+                "not-an-email-address",
+                12345,
+            ):
+                assert validator(value) is None
+
+            assert validator == validators.DisposableEmailValidator(path)
+            assert validator != validators.DisposableEmailValidator()
+
+            data = self.valid_data.copy()
+            data["email"] = "alice@mailinator.com"
+            assert forms.RegistrationForm(data=data).is_valid()
+            with override_settings(REGISTRATION_DISPOSABLE_EMAIL_DOMAINS_FILE=path):
+                form = forms.RegistrationForm(data=data)
+                assert not form.is_valid()
+                assert form.errors["email"] == [str(validators.DISPOSABLE_EMAIL)]
+                assert forms.RegistrationForm(data=self.valid_data.copy()).is_valid()
+
+    def test_breached_password_validator(self):
+        """
+        Test the breached-password validator, and its use by RegistrationForm when a
+        corpus is configured.
+
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = pathlib.Path(temp_dir) / "breached.bin"
+            datafiles.DigestFile.write(
+                path,
+                sorted(
+                    hashlib.sha1(password).digest()  # nosec: B303,B324
+                    for password in (b"swordfish", b"password")
+                ),
+                20,
+            )
+            validator = password_validation.BreachedPasswordValidator(path)
+            with self.assertRaisesMessage(
+                ValidationError, str(validators.BREACHED_PASSWORD)
+            ):
+                validator.validate("swordfish")
+            assert validator.validate("correct horse battery staple") is None
+            assert validator.get_help_text()
+
+            assert forms.RegistrationForm(data=self.valid_data.copy()).is_valid()
+            with override_settings(REGISTRATION_BREACHED_PASSWORDS_FILE=path):
+                form = forms.RegistrationForm(data=self.valid_data.copy())
+                assert not form.is_valid()
+                assert form.errors["password2"] == [str(validators.BREACHED_PASSWORD)]
+                data = self.valid_data.copy()
+                data.update(password1="x7!unbreached", password2="x7!unbreached")
+                assert forms.RegistrationForm(data=data).is_valid()
+                assert (
+                    password_validation.BreachedPasswordValidator().validate(
+                        "x7!unbreached"
+                    )
+                    is None
+                )
+
+    @override_settings(
+        AUTH_PASSWORD_VALIDATORS=[
+            {
+                "NAME": "django.contrib.auth.password_validation."
+                "MinimumLengthValidator",
+                "OPTIONS": {"min_length": 20},
+            }
+        ]
+    )
+    def test_validation_stages(self):
+        """
+        Validation runs in stages of increasing cost, and stops at the first stage
+        to find an error.
+
+        """
+        user_model = get_user_model()
+        user_model.objects.create(username="alice", email="alice@example.com")
+
+        # A reserved name fails the cheap checks, so neither the case-insensitive
+        # uniqueness check, nor the model's uniqueness check, nor the password
+        # validators run.
+        data = self.valid_data.copy()
+        data[user_model.USERNAME_FIELD] = "admin"
+        form = forms.RegistrationFormCaseInsensitive(data=data)
+        with self.assertNumQueries(0):
+            assert not form.is_valid()
+        assert form.errors == {
+            user_model.USERNAME_FIELD: [str(validators.RESERVED_NAME)]
+        }
+
+        # A duplicate username fails the database checks, so the password validators
+        # do not run.
+        data[user_model.USERNAME_FIELD] = "ALICE"
+        form = forms.RegistrationFormCaseInsensitive(data=data)
+        assert not form.is_valid()
+        assert form.errors == {
+            user_model.USERNAME_FIELD: [str(validators.DUPLICATE_USERNAME)]
+        }
+
+        data[user_model.USERNAME_FIELD] = "bob"
+        form = forms.RegistrationFormCaseInsensitive(data=data)
+        assert not form.is_valid()
+        assert list(form.errors) == ["password2"]
+
+        data.update(
+            password1="a sufficiently long password",
+            password2="a sufficiently long password",
+        )
+        assert forms.RegistrationFormCaseInsensitive(data=data).is_valid()
+
+    def test_username_uniqueness_stage(self):
+        """
+        The username uniqueness checks run only in the database stage, once a
+        submission has passed the cheap checks, and each runs at most once.
+
+        """
+        user_model = get_user_model()
+        user_model.objects.create(username="Straße", email="strasse@example.com")
+
+        # A bad email address fails the cheap checks, so the username is not
+        # looked up.
+        data = dict(self.valid_data, email="not-an-email")
+        for form_class in (
+            forms.RegistrationForm,
+            forms.RegistrationFormCaseInsensitive,
+        ):
+            form = form_class(data=data)
+            with self.assertNumQueries(0):
+                assert not form.is_valid()
+            assert list(form.errors) == ["email"]
+
+        # One case-insensitive check and the model's exact check.
+        form = forms.RegistrationFormCaseInsensitive(data=self.valid_data)
+        with self.assertNumQueries(2):
+            assert form.is_valid()
+
+        # The model's exact check catches a duplicate which the case-insensitive
+        # check does not match on every database.
+        data = dict(self.valid_data, **{user_model.USERNAME_FIELD: "Straße"})
+        form = forms.RegistrationFormCaseInsensitive(data=data)
+        assert not form.is_valid()
+        assert form.errors == {
+            user_model.USERNAME_FIELD: [str(validators.DUPLICATE_USERNAME)]
+        }
+
+    def test_deferred_validators_skip_empty(self):
+        """
+        Like the field's own validators, deferred validators do not run on empty
+        values.
+
+        """
+        validator = mock.Mock(cost=validators.COST_DATABASE)
+
+        class NicknameForm(forms.RegistrationForm):
+            """
+            A registration form with an optional field checked by a deferred
+            validator.
+
+            """
+
+            nickname = django_forms.CharField(required=False, validators=[validator])
+
+        assert NicknameForm(data=self.valid_data).is_valid()
+        validator.assert_not_called()
+        assert NicknameForm(data=dict(self.valid_data, nickname="al")).is_valid()
+        validator.assert_called_once_with("al")
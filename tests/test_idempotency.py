@@ -0,0 +1,136 @@
+"""
+Tests for idempotency keys on registration submissions.
+
+"""
+
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from django_registration import idempotency
+
+from .base import RegistrationTestCase, clear_cache
+
+
+class IdempotencyTests(RegistrationTestCase):
+    """
+    Test replaying the outcome of registration submissions.
+
+    """
+
+    def setUp(self):
+        """
+        Start each test with no submissions in progress or completed.
+
+        """
+        super().setUp()
+        clear_cache()
+
+    def test_key_in_context(self):
+        """
+        Each rendering of the registration form carries a new idempotency key.
+
+        """
+        first = self.client.get(reverse("django_registration_register"))
+        second = self.client.get(reverse("django_registration_register"))
+        assert first.context["idempotency_key"]
+        assert first.context["idempotency_key"] != second.context["idempotency_key"]
+
+    def test_replay(self):
+        """
+        A repeated submission with the same key receives the stored redirect,
+        without registering again or touching the database.
+
+        """
+        data = dict(self.valid_data, idempotency_key=idempotency.new_key())
+        resp = self.client.post(reverse("django_registration_register"), data=data)
+        self.assertRedirects(resp, reverse("django_registration_complete"))
+
+        with self.assertNumQueries(0):
+            resp = self.client.post(reverse("django_registration_register"), data=data)
+        self.assertRedirects(resp, reverse("django_registration_complete"))
+        assert get_user_model().objects.count() == 1
+
+    def test_in_progress(self):
+        """
+        A submission arriving while another with the same key is in progress is
+        turned away at once, without waiting for its outcome.
+
+        """
+        key = idempotency.new_key()
+        assert idempotency.begin(key)
+        with mock.patch("time.sleep") as sleep:
+            resp = self.client.post(
+                reverse("django_registration_register"),
+                data=dict(self.valid_data, idempotency_key=key),
+            )
+        assert resp.status_code == 503
+        assert resp["Retry-After"] == "1"
+        sleep.assert_not_called()
+        assert not get_user_model().objects.exists()
+
+    def test_abandoned_meanwhile(self):
+        """
+        A submission finding another with the same key in progress, which is then
+        abandoned, proceeds to register.
+
+        """
+        key = idempotency.new_key()
+        assert idempotency.begin(key)
+
+        def abandon(key):
+            """
+            Abandon the other submission while this one is waiting for its outcome.
+
+            """
+            idempotency.abandon(key)
+
+        with mock.patch(
+            "django_registration.idempotency.get_outcome", side_effect=abandon
+        ):
+            resp = self.client.post(
+                reverse("django_registration_register"),
+                data=dict(self.valid_data, idempotency_key=key),
+            )
+        self.assertRedirects(resp, reverse("django_registration_complete"))
+
+    def test_get_outcome(self):
+        """
+        Only the outcome of a completed submission is returned.
+
+        """
+        key = idempotency.new_key()
+        assert idempotency.get_outcome(key) is None
+        assert idempotency.begin(key)
+        assert idempotency.get_outcome(key) is None
+        idempotency.complete(key, "/complete/")
+        assert idempotency.get_outcome(key) == "/complete/"
+
+    def test_failed_submission_released(self):
+        """
+        A submission which fails validation releases its key, so a corrected
+        submission with the same key can register.
+
+        """
+        key = idempotency.new_key()
+        data = dict(self.valid_data, idempotency_key=key, password2="mismatch")
+        resp = self.client.post(reverse("django_registration_register"), data=data)
+        assert resp.status_code == 200
+
+        data["password2"] = data["password1"]
+        resp = self.client.post(reverse("django_registration_register"), data=data)
+        self.assertRedirects(resp, reverse("django_registration_complete"))
+
+    def test_unusable_key(self):
+        """
+        An overlong key is ignored.
+
+        """
+        key = "k" * (idempotency.MAX_KEY_LENGTH + 1)
+        resp = self.client.post(
+            reverse("django_registration_register"),
+            data=dict(self.valid_data, idempotency_key=key),
+        )
+        self.assertRedirects(resp, reverse("django_registration_complete"))
+        assert idempotency.begin(key)
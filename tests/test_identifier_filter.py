@@ -0,0 +1,188 @@
+"""
+Tests for the probabilistic pre-filter of taken identifiers.
+
+"""
+
+import pathlib
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import override_settings
+
+from django_registration import (
+    availability,
+    datafiles,
+    forms,
+    identifier_filter,
+    validators,
+)
+from django_registration.cache import get_cache
+
+from .base import RegistrationTestCase, clear_cache
+
+
+class IdentifierFilterTests(RegistrationTestCase):
+    """
+    Test the identifier filter.
+
+    """
+
+    def setUp(self):
+        """
+        Point the identifier filter setting at a temporary file, with a cache
+        large enough for the recorded identifiers, and create one account.
+
+        """
+        super().setUp()
+        temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(temp_dir.cleanup)
+        self.path = pathlib.Path(temp_dir.name) / "filter.bin"
+        settings_override = override_settings(
+            # The default limit of 300 entries cannot hold a generation's shards.
+            CACHES={
+                "default": {
+                    "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                    "OPTIONS": {"MAX_ENTRIES": 10000},
+                }
+            },
+            REGISTRATION_IDENTIFIER_FILTER_FILE=self.path,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        clear_cache()
+        self.user_model = get_user_model()
+        self.user_model.objects.create(username="alice", email="alice@example.com")
+
+    def compile(self):
+        """
+        Compile the identifier filter.
+
+        """
+        stdout = StringIO()
+        call_command("compile_identifier_filter", self.path, stdout=stdout)
+        assert "1 user accounts" in stdout.getvalue()
+
+    def might_be_taken(self, field_name, value):
+        """
+        Return whether the filter says an identifier might be taken.
+
+        """
+        return identifier_filter.might_be_taken(self.user_model, field_name, value)
+
+    def test_without_filter(self):
+        """
+        Without a filter, or before it is built, every identifier might be taken,
+        and nothing is recorded, or scheduled to be recorded, without one.
+
+        """
+        assert self.might_be_taken("username", "bob")
+        with override_settings(REGISTRATION_IDENTIFIER_FILTER_FILE=None):
+            assert self.might_be_taken("username", "bob")
+            identifier_filter.record(self.user_model, "username", "bob")
+            with self.captureOnCommitCallbacks() as callbacks:
+                self.user_model.objects.create(username="bob")
+            assert not callbacks
+        assert not get_cache().get(identifier_filter.LATEST_KEY)
+
+    def test_filter(self):
+        """
+        Stored identifiers, normalized, might be taken, and others are certainly
+        free, so uniqueness checks skip the database for them.
+
+        """
+        self.compile()
+        assert self.might_be_taken("username", "ALICE")
+        assert self.might_be_taken("email", "Alice@Example.com")
+        assert not self.might_be_taken("username", "bob")
+        assert not self.might_be_taken("email", "alice")
+        unique = validators.CaseInsensitiveUnique(
+            self.user_model, "username", validators.DUPLICATE_USERNAME
+        )
+        with self.assertNumQueries(0):
+            unique("bob")
+            assert availability.is_taken(self.user_model, "bob") is False
+        with self.assertRaises(validators.ValidationError), self.assertNumQueries(1):
+            unique("Alice")
+
+    def test_form(self):
+        """
+        A registration form checks a username the filter shows to be free without
+        querying the database, with either of its uniqueness checks.
+
+        """
+        self.compile()
+        for form_class in (
+            forms.RegistrationForm,
+            forms.RegistrationFormCaseInsensitive,
+        ):
+            data = dict(self.valid_data, **{self.user_model.USERNAME_FIELD: "bob"})
+            form = form_class(data=data)
+            with self.assertNumQueries(0):
+                assert form.is_valid()
+            data = dict(self.valid_data, **{self.user_model.USERNAME_FIELD: "ALICE"})
+            form = form_class(data=data)
+            assert not form.is_valid()
+            assert form.errors == {
+                self.user_model.USERNAME_FIELD: [str(validators.DUPLICATE_USERNAME)]
+            }
+
+    def test_recorded(self):
+        """
+        Identifiers stored after the filter is built, including while it is being
+        built, are recorded once the transaction commits, except for fields not
+        updated.
+
+        """
+        # A filter built from accounts read before bob's was stored.
+        generation = identifier_filter.start_generation()
+        with self.captureOnCommitCallbacks(execute=True):
+            bob = self.user_model.objects.create(username="bob", email="")
+        datafiles.BloomFilterFile.write(
+            self.path,
+            [identifier_filter.get_digest(self.user_model, "username", "alice")],
+            1,
+            0.01,
+            generation,
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user_model.objects.create(username="carol")
+            bob.username = "dave"
+            bob.email = "dave@example.com"
+            bob.save(update_fields=["email"])
+        assert self.might_be_taken("username", "bob")
+        assert self.might_be_taken("username", "carol")
+        assert self.might_be_taken("email", "dave@example.com")
+        assert not self.might_be_taken("username", "dave")
+        assert not self.might_be_taken("email", "")
+
+    def test_missing_records(self):
+        """
+        If the records of identifiers stored since the filter was built are missing
+        from the cache, every identifier in their shard might be taken.
+
+        """
+        self.compile()
+        generation = identifier_filter.get_filter().generation
+        digest = identifier_filter.get_digest(self.user_model, "username", "bob")
+        shard_key = identifier_filter.get_shard_key(generation, digest)
+        identifier_filter.record(self.user_model, "username", "carol")
+        assert not self.might_be_taken("username", "bob")
+
+        get_cache().incr(shard_key)
+        assert self.might_be_taken("username", "bob")
+        get_cache().delete(shard_key)
+        assert self.might_be_taken("username", "bob")
+        identifier_filter.record(self.user_model, "username", "bob")
+        assert get_cache().get(shard_key) is None
+
+    def test_invalid_rate(self):
+        """
+        The compile command rejects invalid false-positive rates.
+
+        """
+        with self.assertRaises(CommandError):
+            call_command(
+                "compile_identifier_filter", self.path, "--false-positive-rate", "1"
+            )
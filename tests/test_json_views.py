@@ -0,0 +1,184 @@
+"""
+Tests for the JSON variants of the registration and activation views.
+
+"""
+
+import json
+
+from django.contrib.auth import SESSION_KEY, get_user_model
+from django.core import signing
+from django.test import override_settings
+from django.urls import reverse
+
+from django_registration.backends.activation.views import REGISTRATION_SALT
+from django_registration.concurrency import hashing_slot
+
+from .base import RegistrationTestCase, clear_cache
+
+
+@override_settings(ROOT_URLCONF="tests.urls.view_tests")
+class JSONRegistrationViewTests(RegistrationTestCase):
+    """
+    Test the JSON registration views.
+
+    """
+
+    def setUp(self):
+        """
+        Start each test with nothing cached from earlier submissions.
+
+        """
+        super().setUp()
+        clear_cache()
+
+    def post(self, data, name="json_register"):
+        """
+        Submit a JSON body to the named view.
+
+        """
+        if not isinstance(data, str):
+            data = json.dumps(data)
+        return self.client.post(reverse(name), data, content_type="application/json")
+
+    def assertError(self, resp, status, code):  # pylint: disable=invalid-name
+        """
+        Assert that the response is a single error with the given status and
+        code.
+
+        """
+        assert resp.status_code == status
+        assert [error["code"] for error in resp.json()["errors"]["__all__"]] == [code]
+
+    def test_get(self):
+        """
+        GET returns the values to include in a submission, without rendering a
+        template.
+
+        """
+        resp = self.client.get(reverse("json_register"))
+        assert not resp.templates
+        assert set(resp.json()) == {"csrf_token", "idempotency_key"}
+
+    def test_register(self):
+        """
+        A valid submission registers the account and returns the success URL.
+
+        """
+        data = dict(self.valid_data, age=42, subscribe=True, nickname=None)
+        resp = self.post(data)
+        assert resp.status_code == 201
+        assert resp.json() == {"success_url": reverse("django_registration_complete")}
+        assert not get_user_model().objects.get(**self.user_lookup_kwargs).is_active
+
+    def test_one_step(self):
+        """
+        The one-step JSON view registers and logs in the account.
+
+        """
+        resp = self.post(self.valid_data, name="json_one_step_register")
+        assert resp.status_code == 201
+        assert SESSION_KEY in self.client.session
+
+    def test_invalid(self):
+        """
+        Invalid submissions are rejected with the codes of their errors.
+
+        """
+        self.assertError(self.post("not json"), 400, "invalid_json")
+        self.assertError(self.post([self.valid_data]), 400, "invalid_json")
+        resp = self.post(dict(self.valid_data, password2="mismatch"))
+        assert resp.status_code == 400
+        assert resp.json()["errors"]["password2"][0]["code"] == "password_mismatch"
+        assert not get_user_model().objects.exists()
+
+    def test_rejections(self):
+        """
+        Closed registration, rejected, throttled and turned-away submissions are
+        reported as JSON errors.
+
+        """
+        with override_settings(REGISTRATION_OPEN=False):
+            self.assertError(self.post(self.valid_data), 403, "registration_closed")
+        self.assertError(
+            self.post(dict(self.valid_data, website="spam"), "json_protected_register"),
+            400,
+            "rejected",
+        )
+        with override_settings(
+            REGISTRATION_HASHING_CONCURRENCY={"process": 1, "timeout": 0}
+        ), hashing_slot():
+            resp = self.post(self.valid_data)
+        self.assertError(resp, 503, "busy")
+        with override_settings(REGISTRATION_THROTTLE_RATES={"ip": "0/h"}):
+            resp = self.post(self.valid_data)
+        self.assertError(resp, 429, "throttled")
+        assert resp["Retry-After"]
+
+    def test_replay(self):
+        """
+        A repeated submission with the same idempotency key returns the stored
+        outcome.
+
+        """
+        data = dict(self.valid_data, idempotency_key="key")
+        first, second = self.post(data), self.post(data)
+        assert first.status_code == second.status_code == 201
+        assert first.json() == second.json()
+
+
+@override_settings(ROOT_URLCONF="tests.urls.view_tests")
+class JSONActivationViewTests(RegistrationTestCase):
+    """
+    Test the JSON activation view.
+
+    """
+
+    def test_activation(self):
+        """
+        POSTing a valid activation key activates the account, ignoring any other
+        keys, an invalid one returns the error's code and parameters, and a body
+        without an activation key is rejected.
+
+        """
+        user_model = get_user_model()
+        self.client.post(reverse("django_registration_register"), data=self.valid_data)
+        activation_key = signing.dumps(
+            obj=self.valid_data[user_model.USERNAME_FIELD], salt=REGISTRATION_SALT
+        )
+
+        assert self.client.get(reverse("json_activate")).status_code == 405
+        resp = self.client.post(
+            reverse("json_activate"), "[]", content_type="application/json"
+        )
+        assert resp.status_code == 400
+
+        for data in ({}, {"activation_key": ""}, {"activation_key": ["bad"]}):
+            resp = self.client.post(
+                reverse("json_activate"), data, content_type="application/json"
+            )
+            assert resp.status_code == 400
+            assert resp.json()["errors"]["__all__"][0]["code"] == "invalid_key"
+
+        resp = self.client.post(
+            reverse("json_activate"),
+            {"activation_key": "bad"},
+            content_type="application/json",
+        )
+        assert resp.status_code == 400
+        assert resp.json()["errors"]["__all__"] == [
+            {
+                "message": "The activation key you provided is invalid.",
+                "code": "invalid_key",
+                "params": {"activation_key": "bad"},
+            }
+        ]
+
+        resp = self.client.post(
+            reverse("json_activate"),
+            {"activation_key": activation_key, "self": 1, "request": None},
+            content_type="application/json",
+        )
+        assert resp.json() == {
+            "success_url": reverse("django_registration_activation_complete")
+        }
+        assert user_model.objects.get(**self.user_lookup_kwargs).is_active
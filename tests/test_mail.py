@@ -0,0 +1,238 @@
+"""
+Tests for delivery of registration email through a circuit breaker.
+
+"""
+
+import json
+import os
+import smtplib
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import CommandError, call_command
+from django.test import override_settings
+from django.urls import reverse
+
+from django_registration import mail as registration_mail
+
+from .base import RegistrationTestCase
+
+
+class CircuitBreakerTests(RegistrationTestCase):
+    """
+    Test the circuit breaker.
+
+    """
+
+    def test_circuit_breaker(self):
+        """
+        The circuit opens after consecutive failures, then allows a single probe
+        at a time once the reset timeout has passed, abandoning a probe whose
+        outcome is not recorded within another reset timeout.
+
+        """
+        breaker = registration_mail.CircuitBreaker(
+            failure_threshold=2, reset_timeout=30
+        )
+        with mock.patch.object(
+            registration_mail.time, "monotonic", return_value=100.0
+        ) as monotonic:
+            breaker.failed()
+            breaker.succeeded()
+            breaker.failed()
+            assert breaker.allow()
+            breaker.failed()
+            assert not breaker.allow()
+
+            monotonic.return_value = 130.0
+            assert breaker.allow()
+            assert not breaker.allow()
+            breaker.failed()
+            assert not breaker.allow()
+
+            monotonic.return_value = 160.0
+            assert breaker.allow()
+            monotonic.return_value = 189.0
+            assert not breaker.allow()
+            monotonic.return_value = 190.0
+            assert breaker.allow()
+            breaker.succeeded()
+            assert breaker.allow()
+            assert breaker.allow()
+
+
+class SpoolTests(RegistrationTestCase):
+    """
+    Test spooling of email while the mail server is failing.
+
+    """
+
+    def setUp(self):
+        """
+        Give each test an empty spool directory, a new circuit breaker which opens
+        after two failures, and an unsaved user account to email.
+
+        """
+        super().setUp()
+        spool_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(spool_dir.cleanup)
+        self.spool_dir = spool_dir.name
+        # Overriding the circuit breaker's settings for each test gives each test a
+        # new circuit breaker.
+        settings_override = override_settings(
+            REGISTRATION_EMAIL_CIRCUIT_BREAKER={"failure_threshold": 2},
+            REGISTRATION_EMAIL_SPOOL_DIR=spool_dir.name,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = get_user_model()(username="alice", email="alice@example.com")
+
+    def spooled(self):
+        """
+        Return the names of the spooled messages.
+
+        """
+        return sorted(
+            name
+            for name in os.listdir(self.spool_dir)
+            if name.endswith(registration_mail.SPOOL_SUFFIX)
+        )
+
+    def test_without_spool(self):
+        """
+        Without a spool directory, email is sent directly and failures are raised.
+
+        """
+        with override_settings(REGISTRATION_EMAIL_SPOOL_DIR=None):
+            registration_mail.email_user(self.user, "Subject", "Body")
+            assert len(mail.outbox) == 1
+            with mock.patch.object(
+                self.user, "email_user", side_effect=smtplib.SMTPException
+            ), self.assertRaises(smtplib.SMTPException):
+                registration_mail.email_user(self.user, "Subject", "Body")
+
+    def test_spool(self):
+        """
+        Messages which fail, or are sent while the circuit is open, are spooled,
+        and sent later by the send_spooled_email command.
+
+        """
+        registration_mail.email_user(self.user, "Subject", "Body")
+        assert len(mail.outbox) == 1
+        assert not self.spooled()
+
+        with mock.patch.object(
+            self.user, "email_user", side_effect=OSError
+        ) as email_user:
+            for _ in range(3):
+                registration_mail.email_user(self.user, "Subject", "Body")
+        assert email_user.call_count == 2
+        assert len(self.spooled()) == 3
+        for name in self.spooled():
+            assert os.stat(os.path.join(self.spool_dir, name)).st_mode & 0o777 == 0o600
+
+        stdout = StringIO()
+        call_command("send_spooled_email", stdout=stdout)
+        assert "Sent 3" in stdout.getvalue()
+        assert not self.spooled()
+        assert len(mail.outbox) == 4
+        assert mail.outbox[-1].to == ["alice@example.com"]
+        assert mail.outbox[-1].subject == "Subject"
+
+    def test_send_spooled_failure(self):
+        """
+        A failure while sending spooled messages leaves the unsent messages in the
+        spool.
+
+        """
+        for subject in ("First", "Second"):
+            registration_mail.spool_message(
+                self.spool_dir, subject, "Body", None, ["alice@example.com"]
+            )
+        with mock.patch(
+            "django_registration.mail.send_mail",
+            side_effect=[1, smtplib.SMTPException("Unavailable")],
+        ), self.assertRaisesMessage(CommandError, "Unavailable"):
+            call_command("send_spooled_email")
+        assert len(self.spooled()) == 1
+
+        with override_settings(REGISTRATION_EMAIL_SPOOL_DIR=None):
+            with self.assertRaisesMessage(CommandError, "is not set"):
+                call_command("send_spooled_email")
+
+    def test_send_spooled_rejected(self):
+        """
+        A message the mail server rejects does not hold up later messages, and is
+        moved aside once it has been rejected too many times.
+
+        """
+        for subject in ("First", "Second"):
+            registration_mail.spool_message(
+                self.spool_dir, subject, "Body", None, ["alice@example.com"]
+            )
+        first = self.spooled()[0]
+
+        def send_mail(subject, **kwargs):  # pylint: disable=unused-argument
+            """
+            Reject the first message and send any other.
+
+            """
+            if subject == "First":
+                raise smtplib.SMTPRecipientsRefused({})
+            return 1
+
+        with mock.patch("django_registration.mail.send_mail", side_effect=send_mail):
+            stdout = StringIO()
+            with self.assertLogs("django_registration.mail", "ERROR"):
+                call_command("send_spooled_email", stdout=stdout)
+            assert "Sent 1" in stdout.getvalue()
+            assert "1 spooled messages were rejected" in stdout.getvalue()
+            assert self.spooled() == [first]
+            path = os.path.join(self.spool_dir, first)
+            assert os.stat(path).st_mode & 0o777 == 0o600
+            with open(path, encoding="utf-8") as spooled:
+                assert json.load(spooled)["attempts"] == 1
+
+            with self.assertLogs("django_registration.mail", "ERROR"):
+                for _ in range(registration_mail.MAX_ATTEMPTS - 1):
+                    call_command("send_spooled_email", stdout=StringIO())
+        assert not self.spooled()
+        assert os.listdir(
+            os.path.join(self.spool_dir, registration_mail.FAILED_DIR)
+        ) == [first]
+
+    def test_send_spooled_locked(self):
+        """
+        Only one run sends spooled messages at a time.
+
+        """
+        registration_mail.spool_message(
+            self.spool_dir, "Subject", "Body", None, ["alice@example.com"]
+        )
+        with registration_mail.lock_spool(self.spool_dir):
+            with self.assertRaisesMessage(CommandError, "already being sent"):
+                call_command("send_spooled_email")
+        assert len(self.spooled()) == 1
+        call_command("send_spooled_email", stdout=StringIO())
+        assert not self.spooled()
+        assert not os.path.exists(
+            os.path.join(self.spool_dir, registration_mail.SPOOL_LOCK)
+        )
+
+    def test_activation_email_spooled(self):
+        """
+        The activation workflow spools its activation email when delivery fails,
+        and registration succeeds.
+
+        """
+        with mock.patch(
+            "django.contrib.auth.models.send_mail", side_effect=smtplib.SMTPException
+        ):
+            resp = self.client.post(
+                reverse("django_registration_register"), data=self.valid_data
+            )
+        self.assertRedirects(resp, reverse("django_registration_complete"))
+        assert len(self.spooled()) == 1
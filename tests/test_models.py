@@ -0,0 +1,160 @@
+"""
+Tests for django-registration's precomputed identifier indexes.
+
+"""
+
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import override_settings
+
+from django_registration import validators
+from django_registration.models import CanonicalEmail, UsernameSkeleton
+
+from .base import RegistrationTestCase
+
+
+@override_settings(REGISTRATION_IDENTIFIER_INDEXES=True)
+class UsernameSkeletonTests(RegistrationTestCase):
+    """
+    Test maintenance of stored username skeletons.
+
+    """
+
+    def test_skeleton_stored_on_save(self):
+        """
+        Saving a user stores the skeleton of its username, and updates it when the
+        username changes.
+
+        """
+        # pylint: disable=no-member
+        user_model = get_user_model()
+        user = user_model.objects.create(username="paypal", email="a@example.com")
+        skeleton = UsernameSkeleton.objects.get(user=user)
+        assert skeleton.skeleton == validators.confusable_skeleton("paypal")
+        assert str(skeleton) == skeleton.skeleton
+
+        user.username = "google"
+        user.save()
+        skeleton.refresh_from_db()
+        assert skeleton.skeleton == validators.confusable_skeleton("google")
+
+    def test_indexes_disabled(self):
+        """
+        Unless the indexes are enabled, saving a user stores nothing in them.
+
+        """
+        # pylint: disable=no-member
+        with override_settings(REGISTRATION_IDENTIFIER_INDEXES=False):
+            get_user_model().objects.create(username="paypal", email="a@example.com")
+        assert not UsernameSkeleton.objects.exists()
+        assert not CanonicalEmail.objects.exists()
+
+    def test_skeleton_unchanged_fields(self):
+        """
+        Saves which don't touch the username field don't update the skeleton.
+
+        """
+        # pylint: disable=no-member
+        user_model = get_user_model()
+        user = user_model.objects.create(username="paypal", email="a@example.com")
+        UsernameSkeleton.objects.all().delete()
+        user.save(update_fields=["email"])
+        assert not UsernameSkeleton.objects.exists()
+
+    def test_skeleton_non_string_username(self):
+        """
+        Skeletons are only computed for string usernames.
+
+        """
+
+        class NonStringUser:  # pylint: disable=too-few-public-methods
+            """
+            Stand-in for a user model with a non-string username.
+
+            """
+
+            USERNAME_FIELD = "username"
+            username = 12345
+
+        assert UsernameSkeleton.from_user(NonStringUser()) is None
+
+    def test_skeleton_raw_save(self):
+        """
+        Raw saves, as done when loading fixtures, don't store a skeleton.
+
+        """
+        # pylint: disable=no-member
+        user_model = get_user_model()
+        user = user_model(username="paypal", email="a@example.com")
+        user.save_base(raw=True)
+        assert not UsernameSkeleton.objects.exists()
+
+
+@override_settings(REGISTRATION_IDENTIFIER_INDEXES=True)
+class CanonicalEmailTests(RegistrationTestCase):
+    """
+    Test maintenance of stored canonical email addresses.
+
+    """
+
+    def test_canonical_email_stored_on_save(self):
+        """
+        Saving a user stores the canonical form of its email address, updates it
+        when the address changes, and removes it when the address is cleared.
+
+        """
+        # pylint: disable=no-member
+        user_model = get_user_model()
+        user = user_model.objects.create(
+            username="alice", email="Alice.Smith+news@GoogleMail.com"
+        )
+        canonical = CanonicalEmail.objects.get(user=user)
+        assert canonical.email == "alicesmith@gmail.com"
+        assert str(canonical) == canonical.email
+
+        user.email = "alice@example.com"
+        user.save(update_fields=["email"])
+        canonical.refresh_from_db()
+        assert canonical.email == "alice@example.com"
+
+        user.email = ""
+        user.save()
+        assert not CanonicalEmail.objects.filter(user=user).exists()
+
+
+class BackfillCommandTests(RegistrationTestCase):
+    """
+    Test the command which backfills identifier indexes.
+
+    """
+
+    def test_backfill(self):
+        """
+        The backfill command stores index values for every existing user, in
+        batches.
+
+        """
+        # pylint: disable=no-member
+        user_model = get_user_model()
+        usernames = [f"user{i}" for i in range(5)]
+        for username in usernames:
+            user_model.objects.create(username=username, email=f"{username}@a.com")
+        UsernameSkeleton.objects.all().delete()
+        CanonicalEmail.objects.all().delete()
+        UsernameSkeleton.objects.create(
+            user=user_model.objects.get(username="user0"), skeleton="stale"
+        )
+
+        stdout = StringIO()
+        call_command(
+            "backfill_registration_indexes", batch_size=2, verbosity=2, stdout=stdout
+        )
+        assert "Backfilled indexes for 5 user accounts." in stdout.getvalue()
+        assert sorted(
+            UsernameSkeleton.objects.values_list("skeleton", flat=True)
+        ) == sorted(validators.confusable_skeleton(name) for name in usernames)
+        assert sorted(CanonicalEmail.objects.values_list("email", flat=True)) == sorted(
+            f"{name}@a.com" for name in usernames
+        )
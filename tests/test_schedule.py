@@ -0,0 +1,181 @@
+"""
+Tests for the runtime registration schedule.
+
+"""
+
+import datetime
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from django_registration import schedule
+from django_registration.cache import get_cache
+from django_registration.models import RegistrationPeriod
+
+from .base import RegistrationTestCase
+
+
+class RegistrationScheduleTests(RegistrationTestCase):
+    """
+    Test opening and closing registration through the schedule.
+
+    """
+
+    def setUp(self):
+        """
+        Start and end each test with no schedule cached in this process or the
+        shared cache.
+
+        """
+        super().setUp()
+        schedule.clear_cache()
+        self.addCleanup(schedule.clear_cache)
+
+    def create_period(self, **kwargs):
+        """
+        Create a registration period, clearing the cached schedule as committing
+        the change would.
+
+        """
+        # pylint: disable=no-member
+        with self.captureOnCommitCallbacks(execute=True):
+            return RegistrationPeriod.objects.create(**kwargs)
+
+    def test_no_periods(self):
+        """
+        Without any applicable period, the schedule does not decide.
+
+        """
+        assert schedule.registration_open(1) is None
+
+    def test_precedence(self):
+        """
+        Only current periods apply; among them, a period for the site beats one for
+        all sites, and a later-starting period beats an earlier one.
+
+        """
+        now = timezone.now()
+        hour = datetime.timedelta(hours=1)
+        self.create_period(is_open=False)
+        assert schedule.registration_open(1) is False
+        self.create_period(is_open=True, starts_at=now - hour)
+        assert schedule.registration_open(1) is True
+        self.create_period(is_open=False, starts_at=now + hour)
+        self.create_period(is_open=False, ends_at=now - hour)
+        assert schedule.registration_open(1) is True
+        assert schedule.registration_open(1, now=now + 2 * hour) is False
+        self.create_period(site_id=2, is_open=False, starts_at=now - 2 * hour)
+        assert schedule.registration_open(1) is True
+        assert schedule.registration_open(2) is False
+
+    def test_cached(self):
+        """
+        The schedule is cached, both in-process and in the shared cache, until it
+        changes.
+
+        """
+        # pylint: disable=no-member
+        self.create_period(is_open=False)
+        assert schedule.registration_open(1) is False
+        with self.assertNumQueries(0):
+            assert schedule.registration_open(1) is False
+            schedule._periods = None  # pylint: disable=protected-access
+            assert schedule.registration_open(1) is False
+
+        period = RegistrationPeriod.objects.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            period.delete()
+        assert schedule.registration_open(1) is None
+
+    def test_change_while_loading(self):
+        """
+        A schedule changed by another process after this one read it from the
+        database is not left in the shared cache.
+
+        """
+        self.create_period(is_open=False)
+        cache = get_cache()
+        cache_set = cache.set
+
+        def set_after_change(*args):
+            """
+            Change the schedule, as another process would, just before the one
+            read from the database is cached.
+
+            """
+            # pylint: disable=no-member
+            RegistrationPeriod.objects.update(is_open=True)
+            cache.incr(schedule.GENERATION_KEY)
+            cache_set(*args)
+
+        with mock.patch.object(cache, "set", set_after_change):
+            assert schedule.registration_open(1) is False
+        schedule._periods = None  # pylint: disable=protected-access
+        assert schedule.registration_open(1) is True
+
+        # A generation lost from the cache is restarted.
+        cache.delete(schedule.GENERATION_KEY)
+        schedule.clear_cache()
+        assert schedule.registration_open(1) is True
+
+    def test_view(self):
+        """
+        The registration view follows the schedule, in preference to the
+        ``REGISTRATION_OPEN`` setting.
+
+        """
+        self.create_period(is_open=False)
+        resp = self.client.get(reverse("django_registration_register"))
+        self.assertRedirects(resp, reverse("django_registration_disallowed"))
+
+        self.create_period(is_open=True)
+        with override_settings(REGISTRATION_OPEN=False):
+            resp = self.client.get(reverse("django_registration_register"))
+        assert resp.status_code == 200
+
+    def test_command(self):
+        """
+        The schedule_registration command creates registration periods.
+
+        """
+        # pylint: disable=no-member
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("schedule_registration", "close", stdout=StringIO())
+        assert schedule.registration_open(1) is False
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command(
+                "schedule_registration",
+                "open",
+                "--site-id=1",
+                "--start=2000-01-01 00:00",
+                "--end=2100-01-01T00:00:00Z",
+                stdout=StringIO(),
+            )
+        period = RegistrationPeriod.objects.get(site_id=1)
+        assert period.is_open
+        assert timezone.is_aware(period.starts_at)
+        assert period.ends_at.year == 2100
+        # The site-wide closure started later, but the period for the site takes
+        # precedence.
+        assert schedule.registration_open(1) is True
+        assert schedule.registration_open(2) is False
+
+    def test_command_invalid(self):
+        """
+        The schedule_registration command rejects invalid times.
+
+        """
+        # pylint: disable=no-member
+        for arguments in (
+            ["--start=tomorrow"],
+            ["--end=2000-13-01 00:00"],
+            ["--start=2001-01-01 00:00", "--end=2000-01-01 00:00"],
+        ):
+            with self.assertRaises(CommandError):
+                call_command("schedule_registration", "close", *arguments)
+        assert not RegistrationPeriod.objects.exists()
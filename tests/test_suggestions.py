@@ -0,0 +1,163 @@
+"""
+Tests for suggestions of free usernames.
+
+"""
+
+import json
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+
+from django_registration import suggestions
+from django_registration.forms import RegistrationForm
+
+from .base import RegistrationTestCase
+
+
+class ReservingForm(RegistrationForm):
+    """
+    A registration form reserving one of the candidates the tests generate.
+
+    """
+
+    reserved_names = ["alice2"]
+
+
+# The random numbers drawn for the candidates alice1, alice_1, alice2, alice_3,
+# alice42 and alice_7.
+NUMBERS = [1, 1, 2, 3, 42, 7]
+
+
+class SuggestionTests(RegistrationTestCase):
+    """
+    Test generating username suggestions.
+
+    """
+
+    def setUp(self):
+        """
+        Create accounts taking some of the candidates, and make the random
+        numbers in candidates predictable.
+
+        """
+        super().setUp()
+        user_model = get_user_model()
+        user_model.objects.create(username="alice", email="alice@example.com")
+        user_model.objects.create(username="Alice1")
+        user_model.objects.create(username="alice_3")
+        patcher = mock.patch(
+            "django_registration.suggestions.secrets.randbelow", side_effect=NUMBERS
+        )
+        self.randbelow = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_candidates(self):
+        """
+        Candidates are distinct, with longer numbers on later attempts, and
+        truncated to fit the maximum length.
+
+        """
+        self.randbelow.side_effect = [5, 5, 5, 5, 61]
+        assert suggestions.generate_candidates("alice", 3) == [
+            "alice5",
+            "alice_5",
+            "alice61",
+        ]
+        assert self.randbelow.call_args_list[-1] == mock.call(100)
+        self.randbelow.side_effect = [5, 61]
+        assert suggestions.generate_candidates("alice", 2, max_length=6) == [
+            "alice5",
+            "ali_61",
+        ]
+
+    def test_suggestions(self):
+        """
+        Candidates failing the username field's string checks are dropped, and
+        those taken, compared case-insensitively, are found in a single query.
+
+        """
+        with self.assertNumQueries(1):
+            assert suggestions.suggest_usernames(ReservingForm, "alice", 2) == [
+                "alice_1",
+                "alice42",
+            ]
+
+    def test_normalized_collisions(self):
+        """
+        Candidates are compared with existing usernames after the same
+        normalization as the form's uniqueness check, so a candidate differing
+        from a taken username only by case folding or compatibility characters is
+        not suggested.
+
+        """
+        user_model = get_user_model()
+        user_model.objects.create(username="strasse1")
+        user_model.objects.create(username="BOB_1")
+        self.randbelow.side_effect = [1, 1, 2, 3, 4, 5]
+        assert suggestions.suggest_usernames(RegistrationForm, "Straße", 2) == [
+            "Straße_1",
+            "Straße2",
+        ]
+        self.randbelow.side_effect = [1, 1, 2, 3, 4, 5]
+        assert suggestions.suggest_usernames(RegistrationForm, "ｂｏｂ", 2) == [
+            "ｂｏｂ1",
+            "ｂｏｂ2",
+        ]
+        for username in ("Straße_1", "ｂｏｂ2"):
+            form = RegistrationForm(data=dict(self.valid_data, username=username))
+            assert not form.has_error("username")
+
+    @override_settings(ROOT_URLCONF="tests.urls.view_tests")
+    def test_registration_view(self):
+        """
+        A registration view configured to suggest usernames does so when the
+        requested username is taken, and not otherwise.
+
+        """
+        data = dict(self.valid_data, username="ALICE")
+        resp = self.client.post(reverse("suggesting_register"), data=data)
+        assert resp.context["username_suggestions"] == ["ALICE_1", "ALICE2"]
+
+        data.update(username="bob", email="invalid")
+        resp = self.client.post(reverse("suggesting_register"), data=data)
+        assert resp.context["username_suggestions"] == []
+        resp = self.client.post(
+            reverse("django_registration_register"), data=self.valid_data
+        )
+        assert resp.context["username_suggestions"] == []
+
+    @override_settings(ROOT_URLCONF="tests.urls.view_tests")
+    def test_json_registration_view(self):
+        """
+        The JSON registration view returns suggestions with its errors.
+
+        """
+        resp = self.client.post(
+            reverse("json_suggesting_register"),
+            data=json.dumps(dict(self.valid_data, username="alice")),
+            content_type="application/json",
+        )
+        assert resp.status_code == 400
+        assert resp.json()["username_suggestions"] == ["alice_1", "alice2"]
+
+        resp = self.client.post(
+            reverse("json_suggesting_register"),
+            data=json.dumps(dict(self.valid_data, username="bob", email="invalid")),
+            content_type="application/json",
+        )
+        assert "username_suggestions" not in resp.json()
+
+    @override_settings(ROOT_URLCONF="tests.urls.view_tests")
+    def test_availability_view(self):
+        """
+        An availability view configured to suggest usernames does so when the
+        username is taken.
+
+        """
+        url = reverse("suggesting_username_available")
+        result = self.client.get(url, {"username": "alice"}).json()
+        assert not result["available"]
+        assert result["suggestions"] == ["alice_1", "alice2"]
+        assert "suggestions" not in self.client.get(url, {"username": "bob"}).json()
@@ -0,0 +1,147 @@
+"""
+Tests for throttling of registration attempts.
+
+"""
+
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.test import override_settings
+from django.urls import reverse
+
+from django_registration import throttling
+from django_registration.cache import get_cache
+
+from .base import RegistrationTestCase, clear_cache
+
+
+class ThrottleTests(RegistrationTestCase):
+    """
+    Test the sliding-window throttle.
+
+    """
+
+    def setUp(self):
+        """
+        Start each test with no request counts.
+
+        """
+        super().setUp()
+        clear_cache()
+
+    def test_parse_rate(self):
+        """
+        Rates are parsed into a request count and a window length.
+
+        """
+        assert throttling.parse_rate("10/s") == (10, 1)
+        assert throttling.parse_rate("10/h") == (10, 3600)
+        assert throttling.parse_rate("100/15m") == (100, 900)
+        for rate in ("10", "ten/h", "10/y", "10/xh"):
+            with self.assertRaises(ImproperlyConfigured):
+                throttling.parse_rate(rate)
+
+    def test_sliding_window(self):
+        """
+        Requests in the previous window count towards the limit in proportion to
+        how much of the sliding window they still fall within.
+
+        """
+        throttle = throttling.SlidingWindowThrottle("test", "4/m")
+        for _ in range(4):
+            assert throttle.hit("alice", now=6000.0) is None
+        assert throttle.hit("alice", now=6030.0) == 30
+        assert throttle.hit("bob", now=6030.0) is None
+
+        # 45 seconds into the next window, a quarter of the previous window's five
+        # requests still count.
+        assert throttle.hit("alice", now=6105.0) is None
+        assert throttle.hit("alice", now=6105.0) is None
+        assert throttle.hit("alice", now=6105.0) == 15
+
+    def test_expired_counter(self):
+        """
+        A counter expiring between being checked and incremented is recreated.
+
+        """
+        throttle = throttling.SlidingWindowThrottle("test", "4/m")
+        assert throttle.hit("alice") is None
+        with mock.patch.object(get_cache(), "incr", side_effect=ValueError):
+            assert throttle.hit("alice") is None
+
+
+@override_settings(
+    REGISTRATION_THROTTLE_RATES={"ip": "2/h", "email_domain": "3/h", "global": "5/h"}
+)
+class ThrottledViewTests(RegistrationTestCase):
+    """
+    Test throttling in the registration view.
+
+    """
+
+    def setUp(self):
+        """
+        Start each test with no request counts, so that earlier tests' submissions
+        are not throttled against this one's.
+
+        """
+        super().setUp()
+        clear_cache()
+
+    def post(self, username, email, ip="10.0.0.1"):
+        """
+        Submit a registration with the given username, email address and client IP
+        address.
+
+        """
+        data = self.valid_data.copy()
+        data.update({get_user_model().USERNAME_FIELD: username, "email": email})
+        return self.client.post(
+            reverse("django_registration_register"), data=data, REMOTE_ADDR=ip
+        )
+
+    def test_throttled_by_ip(self):
+        """
+        Submissions are throttled per client IP address.
+
+        """
+        assert self.post("alice", "alice@example.com").status_code == 302
+        assert self.post("bob", "bob@example.org").status_code == 302
+        with self.assertNumQueries(0):
+            resp = self.post("carol", "carol@example.net")
+        assert resp.status_code == 429
+        assert resp["Retry-After"]
+        assert self.post("carol", "carol@example.net", ip="10.0.0.2").status_code == 302
+
+    def test_throttled_by_email_domain(self):
+        """
+        Submissions are throttled per email domain.
+
+        """
+        for i in range(3):
+            resp = self.post(f"user{i}", f"user{i}@Example.com", ip=f"10.0.0.{i}")
+            assert resp.status_code == 302
+        assert self.post("user3", "user3@example.com", ip="10.0.1.1").status_code == 429
+        assert self.post("user3", "user3@example.org", ip="10.0.1.1").status_code == 302
+
+    def test_throttled_globally(self):
+        """
+        Submissions are throttled across all clients, and GET requests are not
+        throttled.
+
+        """
+        for i in range(5):
+            resp = self.post(f"user{i}", f"user{i}@{i}.example.com", ip=f"10.0.0.{i}")
+            assert resp.status_code == 302
+        assert self.post("user5", "user5@example.com", ip="10.0.1.1").status_code == 429
+        resp = self.client.get(reverse("django_registration_register"))
+        assert resp.status_code == 200
+
+    def test_invalid_email(self):
+        """
+        Submissions without a usable email domain are throttled only by the other
+        scopes.
+
+        """
+        assert self.post("alice", "not-an-email-address").status_code == 200
@@ -4,21 +4,26 @@ Tests for django-registration's built-in views.
 """
 
 import logging
+import pathlib
+import re
 import sys
+import tempfile
+import time
+from unittest import mock
 
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AnonymousUser
 from django.core import mail, signing
 from django.core.exceptions import ImproperlyConfigured
-from django.test import RequestFactory, override_settings
+from django.test import Client, RequestFactory, override_settings
 from django.urls import reverse
 
-from django_registration import forms
+from django_registration import datafiles, forms, reputation, schedule
 from django_registration import views as base_views
 from django_registration.backends.activation import views as activation_views
 from django_registration.backends.one_step import views as one_step_views
 
-from .base import RegistrationTestCase
+from .base import RegistrationTestCase, clear_cache
 
 
 @override_settings(ROOT_URLCONF="tests.urls.view_tests")
@@ -55,6 +60,255 @@ class ActivationViewTests(RegistrationTestCase):
         )
         self.assertRedirects(resp, "/activate/complete/")
 
+    @override_settings(ACCOUNT_ACTIVATION_DAYS=7)
+    def test_activate_on_post(self):
+        """
+        When activation happens on POST, GET and HEAD check the activation key
+        without touching the database and render a cacheable confirmation page,
+        and POST activates the account.
+
+        """
+        user_model = get_user_model()
+        self.client.post(reverse("django_registration_register"), data=self.valid_data)
+        activation_key = signing.dumps(
+            obj=self.valid_data[user_model.USERNAME_FIELD],
+            salt=activation_views.REGISTRATION_SALT,
+        )
+        url = reverse("confirm_activation", kwargs={"activation_key": activation_key})
+
+        with self.assertNumQueries(0):
+            resp = self.client.get(url)
+            self.client.head(url)
+        self.assertTemplateUsed(resp, "django_registration/activation_confirm.html")
+        assert resp.context["activation_key"] == activation_key
+        assert "private" in resp["Cache-Control"]
+        assert not user_model.objects.get(**self.user_lookup_kwargs).is_active
+
+        with self.assertNumQueries(0):
+            resp = self.client.get(
+                reverse("confirm_activation", kwargs={"activation_key": "bad"})
+            )
+        self.assertTemplateUsed(resp, "django_registration/activation_failed.html")
+        assert resp.context["activation_error"]["code"] == "invalid_key"
+
+        # The confirmation form is protected against cross-site requests.
+        client = Client(enforce_csrf_checks=True)
+        assert client.post(url).status_code == 403
+        csrf_token = re.search(
+            r'name="csrfmiddlewaretoken" value="([^"]+)"',
+            client.get(url).content.decode(),
+        ).group(1)
+        resp = client.post(url, data={"csrfmiddlewaretoken": csrf_token})
+        self.assertRedirects(resp, "/activate/complete/")
+        assert user_model.objects.get(**self.user_lookup_kwargs).is_active
+
+    def test_post_not_allowed(self):
+        """
+        Unless activation happens on POST, the activation view does not accept
+        POST.
+
+        """
+        resp = self.client.post(
+            reverse("django_registration_activate", kwargs={"activation_key": "key"})
+        )
+        assert resp.status_code == 405
+
+
+@override_settings(REGISTRATION_PAGE_CACHE_TIMEOUT=60)
+class PageCacheTests(RegistrationTestCase):
+    """
+    Tests for cached rendering of the registration pages.
+
+    """
+
+    def setUp(self):
+        """
+        Start each test with no rendered form cached.
+
+        """
+        super().setUp()
+        clear_cache()
+
+    def test_form_page(self):
+        """
+        The unbound registration form is rendered once, and the rest of the page,
+        including the CSRF token, idempotency key and anything specific to the
+        user, is rendered for each request. The form itself remains in the
+        context.
+
+        """
+        user = get_user_model().objects.create(username="carol")
+        first_client = Client(enforce_csrf_checks=True)
+        first_client.force_login(user)
+        first = first_client.get(reverse("django_registration_register"))
+        assert "<p>carol</p>" in first.content.decode()
+
+        client = Client(enforce_csrf_checks=True)
+        with mock.patch.object(
+            forms.RegistrationForm,
+            "render",
+            side_effect=AssertionError("Form not cached"),
+        ):
+            second = client.get(reverse("django_registration_register"))
+        assert second.status_code == 200
+        assert second["Content-Type"] == "text/html; charset=utf-8"
+        self.assertTemplateUsed(second, "django_registration/registration_form.html")
+        assert "carol" not in second.content.decode()
+        assert 'name="username"' in second.content.decode()
+        assert isinstance(second.context["form"], forms.RegistrationForm)
+        assert second.context["form_html"] == first.context["form_html"]
+        first_key, second_key = (
+            re.search(r'name="idempotency_key" value="([^"]+)"', resp.content.decode())[
+                1
+            ]
+            for resp in (first, second)
+        )
+        assert first_key != second_key
+
+        csrf_token = re.search(
+            r'name="csrfmiddlewaretoken" value="([^"]+)"', second.content.decode()
+        )[1]
+        resp = client.post(
+            reverse("django_registration_register"),
+            data=dict(self.valid_data, csrfmiddlewaretoken=csrf_token),
+        )
+        self.assertRedirects(resp, reverse("django_registration_complete"))
+
+    def test_form_page_key(self):
+        """
+        The form is rendered separately for each query string and form prefix.
+
+        """
+        url = reverse("django_registration_register")
+        self.client.get(url)
+        with mock.patch.object(
+            forms.RegistrationForm, "render", return_value="<p>other</p>"
+        ) as render:
+            resp = self.client.get(url, {"next": "/"})
+            assert resp.context["form_html"] == "<p>other</p>"
+            with mock.patch.object(
+                activation_views.RegistrationView, "prefix", "signup"
+            ):
+                self.client.get(url)
+        assert render.call_count == 2
+
+    @mock.patch("django.VERSION", (3, 2, 0, "final", 0))
+    def test_form_page_old_django(self):
+        """
+        Before Django 4.0, which added Form.render(), the form is not cached.
+
+        """
+        resp = self.client.get(reverse("django_registration_register"))
+        assert "form_html" not in resp.context
+        assert 'name="username"' in resp.content.decode()
+
+    def test_static_pages(self):
+        """
+        The static pages of the registration workflow are not cached whole, so
+        that a page rendered for one user is not shown to another.
+
+        """
+        user = get_user_model().objects.create(username="mallory")
+        logged_in = Client()
+        logged_in.force_login(user)
+        resp = logged_in.get(reverse("django_registration_complete"))
+        assert "mallory" in resp.content.decode()
+        resp = self.client.get(reverse("django_registration_complete"))
+        assert "mallory" not in resp.content.decode()
+
+
+@override_settings(ROOT_URLCONF="tests.urls.view_tests")
+class SubmissionCheckTests(RegistrationTestCase):
+    """
+    Tests for the honeypot and form-timing checks of the registration view.
+
+    """
+
+    def post(self, token=None, **extra):
+        """
+        Submit a registration with the given form token and extra data.
+
+        """
+        data = self.valid_data.copy()
+        data.update(extra)
+        if token is not None:
+            data["registration_token"] = token
+        return self.client.post(reverse("protected_register"), data=data)
+
+    def make_token(self, age):
+        """
+        Return a form token issued the given number of seconds ago.
+
+        """
+        return signing.Signer(salt=base_views.FORM_TOKEN_SALT).sign(
+            str(int(time.time() - age))
+        )
+
+    def test_context(self):
+        """
+        The honeypot field name and a form token are provided to the template when
+        the checks are enabled.
+
+        """
+        resp = self.client.get(reverse("protected_register"))
+        assert resp.context["honeypot_field"] == "website"
+        assert resp.context["registration_token"]
+        resp = self.client.get(reverse("django_registration_register"))
+        assert "honeypot_field" not in resp.context
+        assert "registration_token" not in resp.context
+
+    def test_rejected(self):
+        """
+        Submissions filling in the honeypot, or with a missing, forged, too-new or
+        expired form token, are rejected without touching the database.
+
+        """
+        for resp in (
+            self.post(self.make_token(10), website="http://spam.example.com/"),
+            self.post(),
+            self.post("not-a-token"),
+            self.post(signing.Signer(salt=base_views.FORM_TOKEN_SALT).sign("x")),
+            self.post(self.make_token(0)),
+            self.post(self.make_token(2 * 24 * 60 * 60)),
+        ):
+            assert resp.status_code == 400
+        assert not get_user_model().objects.exists()
+
+        with self.assertNumQueries(0):
+            self.post(self.make_token(0))
+
+    def test_ip_blocklist(self):
+        """
+        Submissions from IP addresses in the configured blocklist are rejected.
+
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = pathlib.Path(temp_dir) / "blocklist.bin"
+            datafiles.RangeFile.write(
+                path, [reputation.network_range("127.0.0.0/8")], 16
+            )
+            with override_settings(REGISTRATION_IP_BLOCKLIST_FILE=path):
+                # The cached schedule is loaded first, since that takes a query.
+                schedule.get_periods()
+                with self.assertNumQueries(0):
+                    resp = self.post(self.make_token(10))
+                assert resp.status_code == 400
+                resp = self.client.post(
+                    reverse("protected_register"),
+                    data={"registration_token": self.make_token(10), **self.valid_data},
+                    REMOTE_ADDR="192.0.2.1",
+                )
+                assert resp.status_code == 302
+
+    def test_allowed(self):
+        """
+        A submission with an empty honeypot and a valid form token is processed.
+
+        """
+        resp = self.post(self.make_token(10), website="")
+        self.assertRedirects(resp, reverse("django_registration_complete"))
+        assert get_user_model().objects.exists()
+
 
 @override_settings(AUTH_USER_MODEL="tests.CustomUser")
 class CustomUserTests(RegistrationTestCase):
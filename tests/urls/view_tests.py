@@ -9,7 +9,14 @@ development environment.
 from django.urls import path
 from django.views.generic.base import TemplateView
 
-from django_registration.backends.activation.views import RegistrationView
+from django_registration.backends.activation.views import (
+    ActivationView,
+    JSONActivationView,
+    JSONRegistrationView,
+    RegistrationView,
+)
+from django_registration.backends.one_step import views as one_step_views
+from django_registration.views import UsernameAvailabilityView
 
 from ..views import ActivateWithComplexRedirect
 
@@ -28,12 +35,58 @@ urlpatterns = [
         ),
         name="django_registration_activation_complete",
     ),
+    path(
+        "activate/confirm/<str:activation_key>/",
+        ActivationView.as_view(activate_on_post=True),
+        name="confirm_activation",
+    ),
     path(
         "activate/<str:activation_key>/",
         ActivateWithComplexRedirect.as_view(),
         name="django_registration_activate",
     ),
     path("register/", RegistrationView.as_view(), name="django_registration_register"),
+    path(
+        "register/protected/",
+        RegistrationView.as_view(honeypot_field="website", form_token_min_age=2),
+        name="protected_register",
+    ),
+    path(
+        "register/challenged/",
+        RegistrationView.as_view(
+            proof_of_work_difficulty=4,
+            proof_of_work_max_difficulty=8,
+            proof_of_work_baseline_rate=2,
+        ),
+        name="challenged_register",
+    ),
+    path(
+        "register/suggesting/",
+        RegistrationView.as_view(username_suggestions=2),
+        name="suggesting_register",
+    ),
+    path(
+        "register/available/",
+        UsernameAvailabilityView.as_view(username_suggestions=2),
+        name="suggesting_username_available",
+    ),
+    path("api/register/", JSONRegistrationView.as_view(), name="json_register"),
+    path(
+        "api/register/suggesting/",
+        JSONRegistrationView.as_view(username_suggestions=2),
+        name="json_suggesting_register",
+    ),
+    path(
+        "api/register/protected/",
+        JSONRegistrationView.as_view(honeypot_field="website"),
+        name="json_protected_register",
+    ),
+    path(
+        "api/register/one-step/",
+        one_step_views.JSONRegistrationView.as_view(),
+        name="json_one_step_register",
+    ),
+    path("api/activate/", JSONActivationView.as_view(), name="json_activate"),
     path(
         "register/complete/",
         TemplateView.as_view(